@@ -1,8 +1,14 @@
+import base64
+import logging
 import os
 import queue
+import random
 import secrets
-from collections import defaultdict
-from json import dumps
+import time
+import zlib
+from datetime import datetime
+from json import dumps, loads
+from types import SimpleNamespace
 from urllib.parse import urlparse
 
 from flask import (
@@ -11,6 +17,7 @@ from flask import (
     abort,
     flash,
     g,
+    has_app_context,
     jsonify,
     redirect,
     render_template,
@@ -19,11 +26,29 @@ from flask import (
     stream_with_context,
     url_for,
 )
-from sqlalchemy import and_, inspect, or_, text
+from sqlalchemy import and_, case, column, event, inspect, or_, table, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.sql.expression import func
 from werkzeug.security import check_password_hash, generate_password_hash
 
-from models import ChatMessage, Comment, Enrollment, Study, User, db
+from chat_broadcast import CHAT_SUBSCRIBER_EVICTED, create_chat_broadcast
+from group_commit import GroupCommitQueue
+from models import (
+    ChatArchive,
+    ChatMessage,
+    Comment,
+    Enrollment,
+    Study,
+    StudyCategoryCount,
+    User,
+    comment_likes,
+    db,
+)
+from query_stats import QueryStats
 
 STUDY_CATEGORIES = [
     ("취업 / 커리어", ["취업 준비", "자소서 / 포트폴리오", "면접 준비", "공기업 / 공시"]),
@@ -76,6 +101,137 @@ HOME_SHOWCASE_VISUALS = [
     },
 ]
 
+STUDY_SEARCH_MIN_FTS_LENGTH = 3
+STUDY_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS study_fts USING fts5(
+        title,
+        content,
+        content='study',
+        content_rowid='id',
+        tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS study_fts_after_insert AFTER INSERT ON study BEGIN
+        INSERT INTO study_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS study_fts_after_delete AFTER DELETE ON study BEGIN
+        INSERT INTO study_fts (study_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS study_fts_after_update AFTER UPDATE OF title, content ON study BEGIN
+        INSERT INTO study_fts (study_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO study_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+]
+STUDY_SEARCH_TRIGGERS = {"study_fts_after_insert", "study_fts_after_delete", "study_fts_after_update"}
+study_fts = table("study_fts", column("rowid"), column("rank"))
+COMMENT_LIKE_DDL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS comment_likes_after_insert AFTER INSERT ON comment_likes BEGIN
+        UPDATE comment SET like_count = like_count + 1 WHERE id = new.comment_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS comment_likes_after_delete AFTER DELETE ON comment_likes BEGIN
+        UPDATE comment SET like_count = like_count - 1 WHERE id = old.comment_id;
+    END
+    """,
+]
+COMMENT_LIKE_TRIGGERS = {"comment_likes_after_insert", "comment_likes_after_delete"}
+STUDY_CATEGORY_COUNT_DDL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS study_category_after_insert AFTER INSERT ON study BEGIN
+        INSERT INTO study_category_count (category, total) VALUES (new.category, 1)
+        ON CONFLICT (category) DO UPDATE SET total = total + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS study_category_after_update AFTER UPDATE OF category ON study
+    WHEN old.category IS NOT new.category BEGIN
+        UPDATE study_category_count SET total = total - 1 WHERE category = old.category;
+        INSERT INTO study_category_count (category, total) VALUES (new.category, 1)
+        ON CONFLICT (category) DO UPDATE SET total = total + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS study_category_after_delete AFTER DELETE ON study BEGIN
+        UPDATE study_category_count SET total = total - 1 WHERE category = old.category;
+    END
+    """,
+]
+STUDY_CATEGORY_COUNT_TRIGGERS = {
+    "study_category_after_insert",
+    "study_category_after_update",
+    "study_category_after_delete",
+}
+STUDY_MEMBER_COUNT_DDL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS enrollment_after_insert AFTER INSERT ON enrollment BEGIN
+        UPDATE study
+        SET approved_count = approved_count + (new.status = 1),
+            pending_count = pending_count + (new.status = 0)
+        WHERE id = new.study_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS enrollment_after_update AFTER UPDATE OF status, study_id ON enrollment BEGIN
+        UPDATE study
+        SET approved_count = approved_count - (old.status = 1),
+            pending_count = pending_count - (old.status = 0)
+        WHERE id = old.study_id;
+        UPDATE study
+        SET approved_count = approved_count + (new.status = 1),
+            pending_count = pending_count + (new.status = 0)
+        WHERE id = new.study_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS enrollment_after_delete AFTER DELETE ON enrollment BEGIN
+        UPDATE study
+        SET approved_count = approved_count - (old.status = 1),
+            pending_count = pending_count - (old.status = 0)
+        WHERE id = old.study_id;
+    END
+    """,
+]
+STUDY_MEMBER_COUNT_TRIGGERS = {"enrollment_after_insert", "enrollment_after_update", "enrollment_after_delete"}
+CHAT_ACTIVITY_DDL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS chat_message_after_insert AFTER INSERT ON chat_message BEGIN
+        UPDATE study
+        SET message_count = message_count + 1,
+            last_message_at = CASE WHEN COALESCE(last_message_id, 0) < new.id THEN new.date ELSE last_message_at END,
+            last_activity_at = MAX(last_activity_at, new.date),
+            last_message_id = MAX(COALESCE(last_message_id, 0), new.id)
+        WHERE id = new.study_id;
+    END
+    """,
+]
+CHAT_ACTIVITY_TRIGGERS = {"chat_message_after_insert"}
+
+CONFLICT_INSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+STUDY_PAGE_SIZE = 9
+STUDY_TOTAL_CACHE_SECONDS = 30
+STUDY_TOTAL_CACHE_SIZE = 256
+
+HOME_PICK_COUNT = 4
+HOME_SAMPLE_DRAWS = 16
+HOME_SAMPLE_ROUNDS = 3
+CHAT_STREAM_KEEPALIVE_SECONDS = 20
+CHAT_STREAM_KEEPALIVE = ": keepalive\n\n"
+CHAT_REPLAY_LIMIT = 200
+CHAT_REPLAY_MAX_PAGES = 5
+CHAT_REPLAY_RESYNC = object()
+CHAT_STREAM_RESYNC = "event: resync\ndata: {}\n\n"
+CHAT_HISTORY_PAGE_SIZE = 80
+
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 INSTANCE_DIR = os.path.join(BASE_DIR, "instance")
 os.makedirs(INSTANCE_DIR, exist_ok=True)
@@ -89,9 +245,21 @@ app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get(
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 app.config["SESSION_COOKIE_HTTPONLY"] = True
 app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
+app.config["CHAT_BROADCAST_BACKEND"] = os.environ.get("STUDYMATE_CHAT_BROADCAST", "local")
+app.config["CHAT_BROADCAST_PATH"] = os.environ.get(
+    "STUDYMATE_CHAT_BROADCAST_PATH",
+    os.path.join(INSTANCE_DIR, "chat_broadcast.db"),
+)
+app.config["CHAT_SUBSCRIBER_QUEUE_SIZE"] = int(os.environ.get("STUDYMATE_CHAT_QUEUE_SIZE", "100"))
+app.config["CHAT_SUBSCRIBER_OVERFLOW"] = os.environ.get("STUDYMATE_CHAT_OVERFLOW", "evict")
+app.config["CHAT_GROUP_COMMIT"] = os.environ.get("STUDYMATE_CHAT_GROUP_COMMIT") == "1"
+app.config["CHAT_GROUP_COMMIT_MS"] = float(os.environ.get("STUDYMATE_CHAT_GROUP_COMMIT_MS", "5"))
+app.config["SERVER_TIMING"] = os.environ.get("STUDYMATE_SERVER_TIMING", "1") == "1"
 
 db.init_app(app)
-chat_subscribers = defaultdict(list)
+chat_broadcast = create_chat_broadcast(app.config)
+study_total_cache = {}
+request_logger = logging.getLogger("studymate.requests")
 
 
 def get_current_user():
@@ -196,12 +364,60 @@ def get_author_studies_query(user):
 
 
 def approved_member_count(study):
-    return sum(1 for enrollment in study.enrollments if enrollment.status == 1)
+    return study.approved_count
 
 
 def sync_closed_state(study):
-    if approved_member_count(study) >= study.member_count:
-        study.is_closed = True
+    db.session.flush()
+    study.is_closed = case((Study.approved_count >= Study.member_count, True), else_=Study.is_closed)
+
+
+def get_liked_comment_ids(study_id, user=None):
+    if not user:
+        return set()
+    rows = (
+        db.session.query(comment_likes.c.comment_id)
+        .join(Comment, Comment.id == comment_likes.c.comment_id)
+        .filter(comment_likes.c.user_id == user.id, Comment.study_id == study_id)
+    )
+    return {comment_id for comment_id, in rows}
+
+
+def insert_comment_like(comment, user):
+    values = {"user_id": user.id, "comment_id": comment.id}
+    conflict_insert = CONFLICT_INSERTS.get(db.engine.dialect.name)
+    if conflict_insert is not None:
+        return db.session.execute(conflict_insert(comment_likes).values(**values).on_conflict_do_nothing()).rowcount
+    try:
+        with db.session.begin_nested():
+            db.session.execute(comment_likes.insert().values(**values))
+    except IntegrityError:
+        return 0
+    return 1
+
+
+def toggle_comment_like(comment, user):
+    inserted = insert_comment_like(comment, user)
+    if not inserted:
+        db.session.execute(
+            comment_likes.delete().where(comment_likes.c.user_id == user.id, comment_likes.c.comment_id == comment.id)
+        )
+    db.session.commit()
+    return bool(inserted)
+
+
+def load_comment_tree(study, user=None):
+    comments = Comment.query.filter_by(study_id=study.id).order_by(Comment.date.asc(), Comment.id.asc()).all()
+    liked_ids = get_liked_comment_ids(study.id, user)
+    replies_by_parent = {}
+    for comment in comments:
+        comment.liked = comment.id in liked_ids
+        if comment.parent_id is not None:
+            replies_by_parent.setdefault(comment.parent_id, []).append(comment)
+    for comment in comments:
+        set_committed_value(comment, "replies", replies_by_parent.get(comment.id, []))
+    set_committed_value(study, "comments", comments)
+    return [comment for comment in comments if comment.parent_id is None]
 
 
 def serialize_chat_message(message):
@@ -215,17 +431,140 @@ def serialize_chat_message(message):
 
 
 def broadcast_chat_message(study_id, payload):
-    stale_queues = []
-    for subscriber in chat_subscribers.get(study_id, []):
-        try:
-            subscriber.put_nowait(payload)
-        except Exception:
-            stale_queues.append(subscriber)
+    chat_broadcast.publish(study_id, payload)
 
-    if stale_queues:
-        chat_subscribers[study_id] = [
-            subscriber for subscriber in chat_subscribers[study_id] if subscriber not in stale_queues
-        ]
+
+def format_chat_event(payload):
+    return f"id: {payload['id']}\ndata: {dumps(payload, ensure_ascii=False)}\n\n"
+
+
+def parse_message_id(value):
+    value = (value or "").strip()
+    return int(value) if value.isdigit() else None
+
+
+def chat_message_query(study_id):
+    return ChatMessage.query.options(joinedload(ChatMessage.user)).filter(ChatMessage.study_id == study_id)
+
+
+def get_chat_anchor_date(study_id, message_id):
+    return (
+        db.session.query(ChatMessage.date)
+        .filter(ChatMessage.id == message_id, ChatMessage.study_id == study_id)
+        .scalar()
+    )
+
+
+def replay_chat_messages(study_id, after_id, limit=CHAT_REPLAY_LIMIT):
+    query = chat_message_query(study_id)
+    anchor_date = get_chat_anchor_date(study_id, after_id) if after_id else None
+    if anchor_date is not None:
+        query = query.filter(tuple_(ChatMessage.date, ChatMessage.id) > tuple_(anchor_date, after_id))
+    elif after_id:
+        query = query.filter(ChatMessage.id > after_id)
+    return query.order_by(ChatMessage.date, ChatMessage.id).limit(limit).all()
+
+
+def decode_chat_archive(archive):
+    rows = loads(zlib.decompress(base64.b64decode(archive.payload)).decode("utf-8"))
+    return [
+        SimpleNamespace(
+            id=message_id,
+            date=datetime.fromisoformat(date),
+            user_id=user_id,
+            content=content,
+            study_id=archive.study_id,
+        )
+        for message_id, date, user_id, content in rows
+    ]
+
+
+def get_archived_anchor_date(study_id, message_id):
+    archives = ChatArchive.query.filter(
+        ChatArchive.study_id == study_id,
+        ChatArchive.first_message_id <= message_id,
+        ChatArchive.last_message_id >= message_id,
+    )
+    for archive in archives:
+        for message in decode_chat_archive(archive):
+            if message.id == message_id:
+                return message.date
+    return None
+
+
+def get_archived_chat_history(study_id, anchor, limit):
+    chunk_query = ChatArchive.query.filter(ChatArchive.study_id == study_id)
+    if anchor:
+        chunk_query = chunk_query.filter(ChatArchive.first_date <= anchor[0])
+    collected = []
+    chunk_cursor = None
+    while len(collected) <= limit:
+        query = chunk_query
+        if chunk_cursor:
+            query = query.filter(tuple_(ChatArchive.first_date, ChatArchive.id) < tuple_(*chunk_cursor))
+        archive = query.order_by(ChatArchive.first_date.desc(), ChatArchive.id.desc()).first()
+        if archive is None:
+            break
+        chunk_cursor = (archive.first_date, archive.id)
+        messages = decode_chat_archive(archive)
+        if anchor:
+            messages = [message for message in messages if (message.date, message.id) < anchor]
+        collected = messages + collected
+
+    page = collected[-limit:] if limit else []
+    users = {user.id: user for user in User.query.filter(User.id.in_({message.user_id for message in page}))}
+    for message in page:
+        message.user = users.get(message.user_id)
+    return page, len(collected) > limit
+
+
+def get_chat_history(study_id, before_id=None, limit=CHAT_HISTORY_PAGE_SIZE):
+    query = chat_message_query(study_id)
+    if before_id:
+        anchor_date = get_chat_anchor_date(study_id, before_id)
+        if anchor_date is None:
+            anchor_date = get_archived_anchor_date(study_id, before_id)
+            if anchor_date is None:
+                return [], False
+            return get_archived_chat_history(study_id, (anchor_date, before_id), limit)
+        query = query.filter(tuple_(ChatMessage.date, ChatMessage.id) < tuple_(anchor_date, before_id))
+    messages = query.order_by(ChatMessage.date.desc(), ChatMessage.id.desc()).limit(limit + 1).all()
+    if len(messages) > limit:
+        return messages[:limit][::-1], True
+
+    messages.reverse()
+    if messages:
+        anchor = (messages[0].date, messages[0].id)
+    else:
+        anchor = (anchor_date, before_id) if before_id else None
+    archived, has_more = get_archived_chat_history(study_id, anchor, limit - len(messages))
+    return archived + messages, has_more
+
+
+def chat_replay_payloads(study_id, after_id):
+    return [serialize_chat_message(message) for message in replay_chat_messages(study_id, after_id)]
+
+
+def iter_chat_replay(study_id, after_id):
+    for _ in range(CHAT_REPLAY_MAX_PAGES):
+        payloads = chat_replay_payloads(study_id, after_id)
+        yield from payloads
+        if len(payloads) < CHAT_REPLAY_LIMIT:
+            return
+        after_id = payloads[-1]["id"]
+    yield CHAT_REPLAY_RESYNC
+
+
+def chat_access_denial(study_id):
+    user = get_current_user()
+    if not user:
+        return 401
+    study = db.session.get(Study, study_id)
+    if study is None:
+        return 404
+    if not can_access_study_chat(study, user):
+        return 403
+    return None
 
 
 def can_access_study_chat(study, user):
@@ -238,27 +577,219 @@ def can_access_study_chat(study, user):
     return enrollment is not None
 
 
+def commit_chat_messages(items):
+    with app.app_context():
+        messages = [
+            ChatMessage(content=item["content"], study_id=item["study_id"], user_id=item["user_id"])
+            for item in items
+        ]
+        db.session.add_all(messages)
+        db.session.flush()
+
+        payloads = [serialize_chat_message(message) for message in messages]
+        db.session.commit()
+        return payloads
+
+
+chat_group_commit = (
+    GroupCommitQueue(commit_chat_messages, window_seconds=app.config["CHAT_GROUP_COMMIT_MS"] / 1000)
+    if app.config["CHAT_GROUP_COMMIT"]
+    else None
+)
+
+
 def get_accessible_chat_studies(user):
     if not user:
         return []
 
-    owned_studies = get_author_studies_query(user).all()
-    approved_enrollments = (
-        Enrollment.query.filter_by(user_id=user.id, status=1)
-        .order_by(Enrollment.date.desc())
+    approved_study_ids = db.select(Enrollment.study_id).where(
+        Enrollment.user_id == user.id, Enrollment.status == 1
+    )
+    return (
+        db.session.execute(
+            db.select(Study)
+            .options(joinedload(Study.last_message).joinedload(ChatMessage.user))
+            .where(
+                or_(
+                    Study.author_id == user.id,
+                    and_(Study.author_id.is_(None), Study.writer == user.nickname),
+                    Study.id.in_(approved_study_ids),
+                )
+            )
+            .order_by(Study.last_activity_at.desc(), Study.id.desc())
+        )
+        .scalars()
         .all()
     )
 
-    studies_by_id = {study.id: study for study in owned_studies}
-    for enrollment in approved_enrollments:
-        studies_by_id.setdefault(enrollment.study.id, enrollment.study)
 
-    studies = list(studies_by_id.values())
-    studies.sort(
-        key=lambda study: study.chat_messages[-1].date if study.chat_messages else study.date,
-        reverse=True,
+def build_random_probe_sql(draw_values):
+    return f"""
+        WITH bounds AS (SELECT MIN(id) AS low, MAX(id) AS high FROM study),
+             draws(fraction) AS (VALUES {draw_values})
+        SELECT *
+        FROM study
+        WHERE id IN (
+            SELECT bounds.low + CAST((bounds.high - bounds.low + 1) * draws.fraction AS INTEGER)
+            FROM bounds, draws
+        )
+    """
+
+
+def sample_random_studies(limit=HOME_PICK_COUNT, draws=HOME_SAMPLE_DRAWS, rounds=HOME_SAMPLE_ROUNDS):
+    picked = {}
+    for _ in range(rounds):
+        fractions = {f"draw_{index}": random.random() for index in range(draws)}
+        draw_values = ", ".join(f"(:{name})" for name in fractions)
+        sample_sql = text(build_random_probe_sql(draw_values))
+        for study in db.session.execute(db.select(Study).from_statement(sample_sql), fractions).scalars():
+            picked.setdefault(study.id, study)
+        if len(picked) >= limit:
+            break
+
+    if len(picked) < limit:
+        available = Study.query.filter(Study.id.notin_(list(picked))).count()
+        for _ in range(min(available, limit - len(picked))):
+            study = (
+                Study.query.filter(Study.id.notin_(list(picked)))
+                .order_by(Study.id)
+                .offset(random.randrange(available))
+                .first()
+            )
+            picked[study.id] = study
+            available -= 1
+
+    studies = list(picked.values())
+    random.shuffle(studies)
+    return studies[:limit]
+
+
+def build_fts_phrase(keyword):
+    return '"' + keyword.replace('"', '""') + '"'
+
+
+def get_study_category_counts():
+    return dict(db.session.execute(db.select(StudyCategoryCount.category, StudyCategoryCount.total)).all())
+
+
+def reconcile_study_category_counts():
+    db.session.execute(text("DELETE FROM study_category_count"))
+    db.session.execute(
+        text(
+            """
+            INSERT INTO study_category_count (category, total)
+            SELECT category, COUNT(*) FROM study GROUP BY category
+            """
+        )
     )
-    return studies
+
+
+def reconcile_study_member_counts():
+    db.session.execute(
+        text(
+            """
+            UPDATE study
+            SET approved_count = (
+                    SELECT COUNT(*) FROM enrollment WHERE enrollment.study_id = study.id AND enrollment.status = 1
+                ),
+                pending_count = (
+                    SELECT COUNT(*) FROM enrollment WHERE enrollment.study_id = study.id AND enrollment.status = 0
+                )
+            """
+        )
+    )
+
+
+def reconcile_study_chat_activity():
+    db.session.execute(
+        text(
+            """
+            UPDATE study
+            SET last_message_id = COALESCE(
+                    (SELECT MAX(chat_message.id) FROM chat_message WHERE chat_message.study_id = study.id),
+                    last_message_id
+                ),
+                last_message_at = COALESCE(
+                    (
+                        SELECT chat_message.date
+                        FROM chat_message
+                        WHERE chat_message.study_id = study.id
+                        ORDER BY chat_message.id DESC
+                        LIMIT 1
+                    ),
+                    last_message_at
+                ),
+                message_count = (
+                    SELECT COUNT(*) FROM chat_message WHERE chat_message.study_id = study.id
+                ) + (
+                    SELECT COALESCE(SUM(chat_archive.message_count), 0)
+                    FROM chat_archive
+                    WHERE chat_archive.study_id = study.id
+                )
+            """
+        )
+    )
+    db.session.execute(text("UPDATE study SET last_activity_at = MAX(date, COALESCE(last_message_at, date))"))
+
+
+def search_studies(query, keyword, ranked=True):
+    if not app.config.get("STUDY_SEARCH_FTS") or len(keyword) < STUDY_SEARCH_MIN_FTS_LENGTH:
+        return query.filter(or_(Study.title.contains(keyword), Study.content.contains(keyword)))
+
+    matches = (
+        db.select(study_fts.c.rowid.label("study_id"), study_fts.c.rank.label("rank"))
+        .where(text("study_fts MATCH :study_match").bindparams(study_match=build_fts_phrase(keyword)))
+        .subquery()
+    )
+    query = query.join(matches, matches.c.study_id == Study.id)
+    if ranked:
+        query = query.order_by(matches.c.rank)
+    return query
+
+
+def encode_study_cursor(date_value, study_id):
+    raw = f"{date_value}|{study_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_study_cursor(token):
+    padding = "=" * (-len(token) % 4)
+    try:
+        date_text, study_id = base64.urlsafe_b64decode(token + padding).decode("utf-8").rsplit("|", 1)
+        return date_text, int(study_id)
+    except ValueError as error:
+        raise ValueError("잘못된 커서입니다.") from error
+
+
+def serialize_study(study):
+    return {
+        "id": study.id,
+        "title": study.title,
+        "category": study.category,
+        "member_count": study.member_count,
+        "content": study.content[:90],
+        "date": study.date.strftime("%Y-%m-%d"),
+        "writer": study.writer,
+        "is_closed": study.is_closed,
+        "url": url_for("study_detail", study_id=study.id),
+    }
+
+
+def get_cached_study_total(cache_key, count):
+    now = time.monotonic()
+    cached = study_total_cache.get(cache_key)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    total = count()
+    if len(study_total_cache) >= STUDY_TOTAL_CACHE_SIZE:
+        study_total_cache.pop(next(iter(study_total_cache)))
+    study_total_cache[cache_key] = (now + STUDY_TOTAL_CACHE_SECONDS, total)
+    return total
+
+
+def invalidate_study_totals():
+    study_total_cache.clear()
 
 
 def get_or_404(model, object_id):
@@ -308,6 +839,98 @@ def create_compound_unique_index_if_safe(index_name, table_name, columns):
     )
 
 
+def ensure_comment_like_counts():
+    if db.engine.dialect.name != "sqlite":
+        return
+
+    existing_triggers = set(
+        db.session.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'comment_likes_%'")
+        ).scalars()
+    )
+    for statement in COMMENT_LIKE_DDL:
+        db.session.execute(text(statement))
+    if existing_triggers != COMMENT_LIKE_TRIGGERS:
+        db.session.execute(
+            text(
+                """
+                UPDATE comment
+                SET like_count = (
+                    SELECT COUNT(*) FROM comment_likes WHERE comment_likes.comment_id = comment.id
+                )
+                """
+            )
+        )
+
+
+def ensure_study_category_counts():
+    if db.engine.dialect.name != "sqlite":
+        return
+
+    existing_triggers = set(
+        db.session.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'study_category_after_%'")
+        ).scalars()
+    )
+    for statement in STUDY_CATEGORY_COUNT_DDL:
+        db.session.execute(text(statement))
+    if existing_triggers != STUDY_CATEGORY_COUNT_TRIGGERS:
+        reconcile_study_category_counts()
+
+
+def ensure_study_member_counts():
+    if db.engine.dialect.name != "sqlite":
+        return
+
+    existing_triggers = set(
+        db.session.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'enrollment_after_%'")
+        ).scalars()
+    )
+    for statement in STUDY_MEMBER_COUNT_DDL:
+        db.session.execute(text(statement))
+    if existing_triggers != STUDY_MEMBER_COUNT_TRIGGERS:
+        reconcile_study_member_counts()
+
+
+def ensure_study_chat_activity():
+    if db.engine.dialect.name != "sqlite":
+        return
+
+    existing_triggers = set(
+        db.session.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'chat_message_after_%'")
+        ).scalars()
+    )
+    for statement in CHAT_ACTIVITY_DDL:
+        db.session.execute(text(statement))
+    if existing_triggers != CHAT_ACTIVITY_TRIGGERS:
+        reconcile_study_chat_activity()
+
+
+def ensure_study_search_index():
+    app.config["STUDY_SEARCH_FTS"] = False
+    if db.engine.dialect.name != "sqlite":
+        return
+
+    existing_triggers = set(
+        db.session.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'study_fts_%'")
+        ).scalars()
+    )
+    try:
+        for statement in STUDY_SEARCH_DDL:
+            db.session.execute(text(statement))
+        if existing_triggers != STUDY_SEARCH_TRIGGERS:
+            db.session.execute(text("INSERT INTO study_fts (study_fts) VALUES ('rebuild')"))
+        db.session.commit()
+    except OperationalError:
+        db.session.rollback()
+        return
+
+    app.config["STUDY_SEARCH_FTS"] = True
+
+
 def run_schema_migrations():
     inspector = inspect(db.engine)
     table_names = set(inspector.get_table_names())
@@ -316,11 +939,27 @@ def run_schema_migrations():
         study_columns = {column["name"] for column in inspector.get_columns("study")}
         if "author_id" not in study_columns:
             db.session.execute(text("ALTER TABLE study ADD COLUMN author_id INTEGER"))
+        if "last_message_id" not in study_columns:
+            db.session.execute(text("ALTER TABLE study ADD COLUMN last_message_id INTEGER"))
+        if "last_message_at" not in study_columns:
+            db.session.execute(text("ALTER TABLE study ADD COLUMN last_message_at DATETIME"))
+        if "message_count" not in study_columns:
+            db.session.execute(
+                text("ALTER TABLE study ADD COLUMN message_count INTEGER NOT NULL DEFAULT 0")
+            )
+        if "last_activity_at" not in study_columns:
+            db.session.execute(text("ALTER TABLE study ADD COLUMN last_activity_at DATETIME NOT NULL DEFAULT ''"))
+        if "approved_count" not in study_columns:
+            db.session.execute(text("ALTER TABLE study ADD COLUMN approved_count INTEGER NOT NULL DEFAULT 0"))
+        if "pending_count" not in study_columns:
+            db.session.execute(text("ALTER TABLE study ADD COLUMN pending_count INTEGER NOT NULL DEFAULT 0"))
 
     if "comment" in table_names:
         comment_columns = {column["name"] for column in inspector.get_columns("comment")}
         if "author_id" not in comment_columns:
             db.session.execute(text("ALTER TABLE comment ADD COLUMN author_id INTEGER"))
+        if "like_count" not in comment_columns:
+            db.session.execute(text("ALTER TABLE comment ADD COLUMN like_count INTEGER NOT NULL DEFAULT 0"))
 
     db.session.commit()
 
@@ -354,18 +993,96 @@ def run_schema_migrations():
             )
         )
 
+    if {"study", "chat_message", "chat_archive"} <= table_names:
+        ensure_study_chat_activity()
+        db.session.execute(text("DROP INDEX IF EXISTS ix_study_last_message_at"))
+        db.session.execute(
+            text("CREATE INDEX IF NOT EXISTS ix_study_last_activity ON study (last_activity_at, id)")
+        )
+
+    if {"study", "study_category_count"} <= table_names:
+        ensure_study_category_counts()
+
+    if "chat_message" in table_names:
+        db.session.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_chat_message_study_date "
+                "ON chat_message (study_id, date, id)"
+            )
+        )
+
+    if "comment" in table_names:
+        db.session.execute(
+            text("CREATE INDEX IF NOT EXISTS ix_comment_study_parent ON comment (study_id, parent_id, date)")
+        )
+
+    if "comment_likes" in table_names:
+        db.session.execute(
+            text("CREATE INDEX IF NOT EXISTS ix_comment_likes_comment ON comment_likes (comment_id)")
+        )
+
+    if {"comment", "comment_likes"} <= table_names:
+        ensure_comment_like_counts()
+
+    if {"study", "enrollment"} <= table_names:
+        ensure_study_member_counts()
+
     create_unique_index_if_safe("ix_user_nickname_unique", "user", "nickname")
     create_compound_unique_index_if_safe(
         "ix_enrollment_user_study_unique", "enrollment", ["user_id", "study_id"]
     )
     db.session.commit()
 
+    if "study" in table_names:
+        ensure_study_search_index()
+
 
 with app.app_context():
     db.create_all()
     run_schema_migrations()
 
 
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def record_query_time(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = g.get("query_stats") if has_app_context() else None
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+
+def discard_query_timer(exception_context):
+    started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+with app.app_context():
+    event.listen(db.engine, "before_cursor_execute", start_query_timer)
+    event.listen(db.engine, "after_cursor_execute", record_query_time)
+    event.listen(db.engine, "handle_error", discard_query_timer)
+
+
+@app.before_request
+def start_request_stats():
+    g.request_started = time.perf_counter()
+    g.query_stats = QueryStats()
+
+
+@app.after_request
+def report_request_stats(response):
+    stats = g.get("query_stats")
+    if stats is None:
+        return response
+    elapsed = time.perf_counter() - g.request_started
+    if app.config["SERVER_TIMING"]:
+        response.headers["Server-Timing"] = stats.server_timing(elapsed)
+    request_logger.info(stats.log_line(request.method, request.path, request.endpoint, response.status_code, elapsed))
+    return response
+
+
 @app.before_request
 def load_user_and_protect_forms():
     get_current_user()
@@ -396,7 +1113,7 @@ def favicon():
 
 @app.route("/")
 def home():
-    random_studies = Study.query.order_by(func.random()).limit(4).all()
+    random_studies = sample_random_studies()
     return render_template(
         "index.html",
         random_studies=random_studies,
@@ -502,21 +1219,67 @@ def signup():
 @app.route("/study")
 def study():
     page = request.args.get("page", 1, type=int)
+    cursor = request.args.get("cursor")
     keyword = normalize_text(request.args.get("keyword", ""))
     category = normalize_text(request.args.get("category", ""))
 
-    query = Study.query.order_by(Study.date.desc())
-
-    if keyword:
-        query = query.filter(or_(Study.title.contains(keyword), Study.content.contains(keyword)))
+    query = Study.query
 
     if category and category in CATEGORY_VALUES:
         query = query.filter(Study.category == category)
     else:
         category = ""
 
-    pagination = query.paginate(page=page, per_page=9)
-    return render_template("study.html", pagination=pagination, keyword=keyword, category=category)
+    if cursor is not None:
+        return study_cursor_page(query, keyword, cursor)
+
+    category_counts = get_study_category_counts()
+    if keyword:
+        count_query = search_studies(query, keyword, ranked=False)
+        query = search_studies(query, keyword)
+    query = query.order_by(Study.date.desc(), Study.id.desc())
+
+    pagination = query.paginate(page=page, per_page=STUDY_PAGE_SIZE, count=False)
+    if keyword:
+        pagination.total = get_cached_study_total((keyword, category), count_query.count)
+    elif category:
+        pagination.total = category_counts.get(category, 0)
+    else:
+        pagination.total = sum(category_counts.values())
+    return render_template(
+        "study.html",
+        pagination=pagination,
+        keyword=keyword,
+        category=category,
+        category_counts=category_counts,
+    )
+
+
+def study_cursor_page(query, keyword, cursor):
+    if keyword:
+        query = search_studies(query, keyword, ranked=False)
+
+    if cursor:
+        try:
+            date_text, study_id = decode_study_cursor(cursor)
+            cursor_date = datetime.fromisoformat(date_text)
+        except ValueError:
+            abort(400, description="잘못된 요청입니다.")
+        query = query.filter(tuple_(Study.date, Study.id) < tuple_(cursor_date, study_id))
+
+    studies = query.order_by(Study.date.desc(), Study.id.desc()).limit(STUDY_PAGE_SIZE + 1).all()
+    next_cursor = None
+    if len(studies) > STUDY_PAGE_SIZE:
+        studies = studies[:STUDY_PAGE_SIZE]
+        next_cursor = encode_study_cursor(studies[-1].date.isoformat(), studies[-1].id)
+
+    return jsonify(
+        {
+            "ok": True,
+            "studies": [serialize_study(study) for study in studies],
+            "next_cursor": next_cursor,
+        }
+    )
 
 
 @app.route("/study/write", methods=["GET", "POST"])
@@ -536,6 +1299,7 @@ def studywrite():
         new_study = Study(writer=user.nickname, author_id=user.id, **payload)
         db.session.add(new_study)
         db.session.commit()
+        invalidate_study_totals()
 
         flash("스터디 모집글이 등록되었습니다.", "success")
         return redirect(url_for("study_detail", study_id=new_study.id))
@@ -551,8 +1315,7 @@ def study_detail(study_id):
     if user:
         enrollment = Enrollment.query.filter_by(user_id=user.id, study_id=study.id).first()
 
-    root_comments = [comment for comment in study.comments if comment.parent_id is None]
-    root_comments.sort(key=lambda comment: comment.date)
+    root_comments = load_comment_tree(study, user)
 
     return render_template(
         "study_detail.html",
@@ -577,8 +1340,10 @@ def study_delete(study_id):
         flash("삭제 권한이 없습니다.", "error")
         return redirect(url_for("study_detail", study_id=study_id))
 
+    ChatArchive.query.filter(ChatArchive.study_id == study_id).delete(synchronize_session=False)
     db.session.delete(study)
     db.session.commit()
+    invalidate_study_totals()
     flash("스터디가 삭제되었습니다.", "success")
     return redirect(url_for("study"))
 
@@ -612,6 +1377,7 @@ def study_edit(study_id):
         sync_closed_state(study)
 
         db.session.commit()
+        invalidate_study_totals()
         flash("스터디가 수정되었습니다.", "success")
         return redirect(url_for("study_detail", study_id=study.id))
 
@@ -689,14 +1455,9 @@ def comment_like(comment_id):
         return redirect(url_for("login"))
 
     comment = get_or_404(Comment, comment_id)
-
-    if user in comment.likers:
-        comment.likers.remove(user)
-    else:
-        comment.likers.append(user)
-
-    db.session.commit()
-    return redirect(url_for("study_detail", study_id=comment.study_id))
+    study_id = comment.study_id
+    toggle_comment_like(comment, user)
+    return redirect(url_for("study_detail", study_id=study_id))
 
 
 @app.route("/study/apply/<int:study_id>", methods=["POST"])
@@ -788,49 +1549,82 @@ def study_chat(study_id):
             flash("메시지는 300자 이내로 입력해주세요.", "error")
             return redirect(url_for("study_chat", study_id=study.id))
 
-        message = ChatMessage(content=content, study_id=study.id, user_id=user.id)
-        db.session.add(message)
-        db.session.commit()
-        payload = serialize_chat_message(message)
+        if chat_group_commit is not None:
+            payload = chat_group_commit.submit({"study_id": study.id, "user_id": user.id, "content": content})
+        else:
+            message = ChatMessage(content=content, study_id=study.id, user_id=user.id)
+            db.session.add(message)
+            db.session.commit()
+            payload = serialize_chat_message(message)
         broadcast_chat_message(study.id, payload)
 
         if request.is_json:
             return jsonify({"ok": True, "message": payload})
         return redirect(url_for("study_chat", study_id=study.id))
 
-    messages = study.chat_messages[-80:]
+    messages, has_older = get_chat_history(study.id)
     return render_template(
         "study_chat.html",
         study=study,
         messages=messages,
+        has_older=has_older,
+        approved_count=approved_member_count(study),
         user=user,
         is_owner=is_study_owner(study, user),
     )
 
 
+@app.route("/study/<int:study_id>/chat/messages")
+def study_chat_messages(study_id):
+    denial = chat_access_denial(study_id)
+    if denial:
+        abort(denial)
+
+    before_id = parse_message_id(request.args.get("before_id"))
+    if before_id is not None:
+        messages, has_more = get_chat_history(study_id, before_id)
+    else:
+        messages = replay_chat_messages(study_id, parse_message_id(request.args.get("after_id")))
+        has_more = False
+    return jsonify(
+        {
+            "ok": True,
+            "messages": [serialize_chat_message(message) for message in messages],
+            "has_more": has_more,
+        }
+    )
+
+
 @app.route("/study/<int:study_id>/chat/stream")
 def study_chat_stream(study_id):
-    user = get_current_user()
-    if not user:
-        abort(401)
-
-    study = get_or_404(Study, study_id)
-    if not can_access_study_chat(study, user):
-        abort(403)
+    denial = chat_access_denial(study_id)
+    if denial:
+        abort(denial)
+    last_event_id = parse_message_id(request.headers.get("Last-Event-ID") or request.args.get("last_event_id"))
 
     def generate():
-        subscriber = queue.Queue()
-        chat_subscribers[study.id].append(subscriber)
+        subscriber = chat_broadcast.subscribe(study_id)
         try:
+            replayed_id = 0
+            if last_event_id is not None:
+                for payload in iter_chat_replay(study_id, last_event_id):
+                    if payload is CHAT_REPLAY_RESYNC:
+                        yield CHAT_STREAM_RESYNC
+                        return
+                    replayed_id = payload["id"]
+                    yield format_chat_event(payload)
             while True:
                 try:
-                    payload = subscriber.get(timeout=20)
-                    yield f"data: {dumps(payload, ensure_ascii=False)}\n\n"
+                    payload = subscriber.get(timeout=CHAT_STREAM_KEEPALIVE_SECONDS)
+                    if payload is CHAT_SUBSCRIBER_EVICTED:
+                        return
+                    if payload["id"] <= replayed_id:
+                        continue
+                    yield format_chat_event(payload)
                 except queue.Empty:
-                    yield ": keepalive\n\n"
+                    yield CHAT_STREAM_KEEPALIVE
         finally:
-            if subscriber in chat_subscribers.get(study.id, []):
-                chat_subscribers[study.id].remove(subscriber)
+            chat_broadcast.unsubscribe(study_id, subscriber)
 
     response = Response(stream_with_context(generate()), mimetype="text/event-stream")
     response.headers["Cache-Control"] = "no-cache"
@@ -0,0 +1,122 @@
+import asyncio
+import re
+from urllib.parse import parse_qs
+
+from asgiref.wsgi import WsgiToAsgi
+from werkzeug.test import EnvironBuilder
+
+from app import (
+    CHAT_REPLAY_LIMIT,
+    CHAT_REPLAY_MAX_PAGES,
+    CHAT_STREAM_RESYNC,
+    CHAT_STREAM_KEEPALIVE,
+    CHAT_STREAM_KEEPALIVE_SECONDS,
+    app,
+    chat_broadcast,
+    chat_replay_payloads,
+    chat_access_denial,
+    format_chat_event,
+    parse_message_id,
+)
+from chat_broadcast import CHAT_SUBSCRIBER_EVICTED
+
+CHAT_STREAM_PATTERN = re.compile(r"^/study/(?P<study_id>\d+)/chat/stream$")
+CHAT_STREAM_HEADERS = [
+    (b"content-type", b"text/event-stream; charset=utf-8"),
+    (b"cache-control", b"no-cache"),
+    (b"x-accel-buffering", b"no"),
+]
+
+
+class StudyMateASGI:
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi_app = WsgiToAsgi(flask_app)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "GET":
+            matched = CHAT_STREAM_PATTERN.match(scope["path"])
+            if matched:
+                await self.chat_stream(scope, receive, send, int(matched.group("study_id")))
+                return
+        await self.wsgi_app(scope, receive, send)
+
+    def check_access(self, scope, study_id):
+        environ = EnvironBuilder(
+            path=scope["path"],
+            headers=[(key.decode("latin-1"), value.decode("latin-1")) for key, value in scope["headers"]],
+        ).get_environ()
+        with self.flask_app.request_context(environ):
+            return chat_access_denial(study_id)
+
+    def replay(self, study_id, last_event_id):
+        with self.flask_app.app_context():
+            return chat_replay_payloads(study_id, last_event_id)
+
+    def last_event_id(self, scope):
+        headers = dict(scope["headers"])
+        value = headers.get(b"last-event-id", b"").decode("latin-1")
+        if not value:
+            query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+            value = query.get("last_event_id", [""])[0]
+        return parse_message_id(value)
+
+    async def chat_stream(self, scope, receive, send, study_id):
+        denial = await asyncio.to_thread(self.check_access, scope, study_id)
+        if denial:
+            await send({"type": "http.response.start", "status": denial, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        subscriber = chat_broadcast.subscribe_async(study_id, asyncio.get_running_loop())
+        last_event_id = self.last_event_id(scope)
+        streamer = asyncio.create_task(self.stream_events(send, subscriber, study_id, last_event_id))
+        disconnect = asyncio.create_task(self.wait_for_disconnect(receive))
+        try:
+            await asyncio.wait({streamer, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            streamer.cancel()
+            disconnect.cancel()
+            await asyncio.gather(streamer, disconnect, return_exceptions=True)
+            chat_broadcast.unsubscribe(study_id, subscriber)
+
+    async def stream_events(self, send, subscriber, study_id, last_event_id):
+        await send({"type": "http.response.start", "status": 200, "headers": CHAT_STREAM_HEADERS})
+        replayed_id = 0
+        after_id = last_event_id
+        pages = 0
+        while after_id is not None:
+            if pages >= CHAT_REPLAY_MAX_PAGES:
+                await self.send_chunk(send, CHAT_STREAM_RESYNC)
+                await send({"type": "http.response.body", "body": b""})
+                return
+            payloads = await asyncio.to_thread(self.replay, study_id, after_id)
+            pages += 1
+            for payload in payloads:
+                replayed_id = payload["id"]
+                await self.send_chunk(send, format_chat_event(payload))
+            after_id = replayed_id if len(payloads) >= CHAT_REPLAY_LIMIT else None
+        while True:
+            try:
+                payload = await asyncio.wait_for(subscriber.receive(), CHAT_STREAM_KEEPALIVE_SECONDS)
+                if payload is CHAT_SUBSCRIBER_EVICTED:
+                    await send({"type": "http.response.body", "body": b""})
+                    return
+                if payload["id"] <= replayed_id:
+                    continue
+                chunk = format_chat_event(payload)
+            except asyncio.TimeoutError:
+                chunk = CHAT_STREAM_KEEPALIVE
+            await self.send_chunk(send, chunk)
+
+    async def send_chunk(self, send, chunk):
+        await send({"type": "http.response.body", "body": chunk.encode("utf-8"), "more_body": True})
+
+    async def wait_for_disconnect(self, receive):
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+
+
+application = StudyMateASGI(app)
@@ -0,0 +1,119 @@
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from report import percentile
+
+
+def seed(app_module):
+    with app_module.app.app_context():
+        app_module.db.drop_all()
+        app_module.db.create_all()
+        app_module.run_schema_migrations()
+        user = app_module.User(
+            userid="bench",
+            nickname="벤치",
+            email="bench@example.com",
+            password=app_module.generate_password_hash("password123"),
+        )
+        app_module.db.session.add(user)
+        app_module.db.session.commit()
+        study = app_module.Study(
+            title="붐비는 채팅방",
+            category="웹 개발",
+            member_count=50,
+            content="그룹 커밋 벤치마크",
+            writer=user.nickname,
+            author_id=user.id,
+        )
+        app_module.db.session.add(study)
+        app_module.db.session.commit()
+        return user.userid, user.nickname, study.id
+
+
+def make_client(app_module, userid, nickname):
+    client = app_module.app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = userid
+        session["user_nickname"] = nickname
+        session["_csrf_token"] = "bench"
+    return client
+
+
+def run_burst(app_module, study_id, clients, messages_per_client):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def post_messages(client, sender):
+        for index in range(messages_per_client):
+            started = time.perf_counter()
+            response = client.post(
+                f"/study/{study_id}/chat",
+                json={"content": f"{sender}번 사용자 메시지 {index}"},
+                headers={"X-CSRFToken": "bench"},
+            )
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                if response.status_code != 200:
+                    errors.append(response.status_code)
+
+    threads = [threading.Thread(target=post_messages, args=(client, sender)) for sender, client in enumerate(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, latencies, errors
+
+
+def report(label, total_seconds, latencies, errors, batches=None):
+    line = (
+        f"{label:<12} {len(latencies) / total_seconds:>9.1f} msg/s"
+        f"  p50 {statistics.median(latencies) * 1000:>7.2f} ms"
+        f"  p95 {percentile(latencies, 0.95) * 1000:>7.2f} ms"
+        f"  errors {len(errors)}"
+    )
+    if batches is not None:
+        line += f"  batches {batches}"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-message chat commits with group commit on SQLite.")
+    parser.add_argument("--senders", type=int, default=16, help="concurrent chat senders")
+    parser.add_argument("--messages", type=int, default=50, help="messages per sender")
+    parser.add_argument("--window-ms", type=float, default=5, help="group commit window in milliseconds")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="studymate_bench_")
+    os.environ["STUDYMATE_DB_URI"] = "sqlite:///" + os.path.join(workdir, "bench.db").replace("\\", "/")
+    os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+
+    import app as app_module
+
+    from group_commit import GroupCommitQueue
+
+    userid, nickname, study_id = seed(app_module)
+    clients = [make_client(app_module, userid, nickname) for _ in range(args.senders)]
+
+    app_module.chat_group_commit = None
+    report("per-message", *run_burst(app_module, study_id, clients, args.messages))
+
+    queue = GroupCommitQueue(app_module.commit_chat_messages, window_seconds=args.window_ms / 1000)
+    app_module.chat_group_commit = queue
+    total_seconds, latencies, errors = run_burst(app_module, study_id, clients, args.messages)
+    report("group", total_seconds, latencies, errors, queue.stats["batches"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from dataset import generate_dataset
+from scenarios import bench_request
+from worker_routes import BenchEnv, build_request, install_runtime_shims, seed_env
+
+POLL_INTERVAL_SECONDS = 3
+QUERY_COUNT_PATTERN = re.compile(r'desc="(\d+) queries')
+
+
+def load_worker(time_scale):
+    install_runtime_shims()
+    sys.path.insert(0, str(ROOT / "worker"))
+    import cf_worker as worker
+
+    worker.CHAT_LONG_POLL_SECONDS *= time_scale
+    worker.CHAT_LONG_POLL_INTERVAL *= time_scale
+    worker.CHAT_VERSION_CACHE_SECONDS *= time_scale
+    return worker
+
+
+async def fetch(worker, env, method, spec):
+    request = build_request(worker, method, spec)
+    started = time.perf_counter()
+    response = await worker.Default(None, env).fetch(request)
+    queries = int(QUERY_COUNT_PATTERN.search(response.headers["Server-Timing"]).group(1))
+    return response.status, queries, time.perf_counter() - started
+
+
+def messages_request(fixture, after_id, wait):
+    query = {"after_id": after_id}
+    if wait:
+        query["wait"] = 1
+    return bench_request(f"/study/{fixture['study_id']}/chat/messages", fixture["member"], query=query)
+
+
+async def measure(worker, env, fixture, after_id, time_scale, clients):
+    window = worker.CHAT_LONG_POLL_SECONDS
+    await fetch(worker, env, "GET", messages_request(fixture, after_id, False))
+    worker.chat_version_cache.clear()
+
+    idle = await asyncio.gather(
+        *(fetch(worker, env, "GET", messages_request(fixture, after_id, True)) for _ in range(clients))
+    )
+    status = max(result[0] for result in idle)
+    idle_queries = sum(result[1] for result in idle) / clients
+    idle_seconds = max(result[2] for result in idle)
+
+    polls = math.ceil(window / (POLL_INTERVAL_SECONDS * time_scale))
+    polling_queries = 0
+    for _ in range(polls):
+        worker.chat_version_cache.clear()
+        polling_queries += (await fetch(worker, env, "GET", messages_request(fixture, after_id, False)))[1]
+
+    worker.chat_version_cache.clear()
+    waiting = asyncio.ensure_future(fetch(worker, env, "GET", messages_request(fixture, after_id, True)))
+    await asyncio.sleep(window / 4)
+    post = bench_request(f"/study/{fixture['study_id']}/chat", fixture["member"], json={"content": "롱 폴링 깨우기"})
+    await fetch(worker, env, "POST", post)
+    woken_status, woken_queries, woken_seconds = await waiting
+
+    return {
+        "window_seconds": window,
+        "clients": clients,
+        "long_poll_idle": {"status": status, "queries": idle_queries, "seconds": round(idle_seconds, 3)},
+        "short_poll": {"requests": polls, "queries": polling_queries},
+        "long_poll_woken": {
+            "status": woken_status,
+            "queries": woken_queries,
+            "seconds_after_post": round(woken_seconds - window / 4, 3),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Count D1 reads an idle chat client costs per long-poll window, against 3 s short polling."
+    )
+    parser.add_argument("--time-scale", type=float, default=0.05, help="shrink the 20 s window and intervals by this factor")
+    parser.add_argument("--clients", type=int, default=10, help="idle clients long-polling the same study at once")
+    parser.add_argument("--json", help="also write the counts to this JSON file")
+    args = parser.parse_args()
+
+    worker = load_worker(args.time_scale)
+    dataset = generate_dataset("small", iterations=1)
+    env = BenchEnv(worker.ChatRoom)
+    seed_env(env, dataset)
+    fixture = dataset.fixture
+    after_id = env.DB.connection.execute(
+        "SELECT last_message_id FROM study WHERE id = ?", [fixture["study_id"]]
+    ).fetchone()[0]
+
+    loop = asyncio.new_event_loop()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = loop.run_until_complete(measure(worker, env, fixture, after_id, args.time_scale, args.clients))
+    finally:
+        loop.close()
+
+    idle = result["long_poll_idle"]["queries"]
+    polling = result["short_poll"]["queries"]
+    print(f"window {result['window_seconds'] / args.time_scale:.0f} s (scaled by {args.time_scale})")
+    print(f"long poll, no new message   {idle:>5.1f} queries per client ({result['clients']} clients)")
+    print(f"3 s polling, same window    {polling:>3} queries in {result['short_poll']['requests']} requests")
+    print(f"reduction                   {polling / idle:>5.1f}x")
+    print(
+        f"long poll woken by a post   {result['long_poll_woken']['queries']:>3} queries, "
+        f"answered {result['long_poll_woken']['seconds_after_post'] / args.time_scale * 1000:.0f} ms (unscaled) after the post"
+    )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(result, handle, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
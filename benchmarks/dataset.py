@@ -0,0 +1,223 @@
+import random
+from datetime import datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+BENCH_PASSWORD = "password123"
+BENCH_CATEGORIES = ["웹 개발", "알고리즘 / 코딩테스트", "토익 / 토플", "영어 회화", "데이터 분석", "독서"]
+BENCH_KEYWORD = "스터디"
+BASE_DATE = datetime(2026, 1, 1, 9, 0, 0)
+
+SCALES = {
+    "small": {
+        "users": 60,
+        "studies": 40,
+        "enrollments": 5,
+        "comments": 4,
+        "likes": 2,
+        "messages": 20,
+        "hot_comments": 30,
+        "hot_likes": 10,
+        "hot_messages": 200,
+    },
+    "medium": {
+        "users": 500,
+        "studies": 400,
+        "enrollments": 10,
+        "comments": 6,
+        "likes": 3,
+        "messages": 40,
+        "hot_comments": 150,
+        "hot_likes": 40,
+        "hot_messages": 2000,
+    },
+    "large": {
+        "users": 3000,
+        "studies": 3000,
+        "enrollments": 15,
+        "comments": 8,
+        "likes": 4,
+        "messages": 60,
+        "hot_comments": 600,
+        "hot_likes": 200,
+        "hot_messages": 10000,
+    },
+}
+
+
+class Dataset:
+    def __init__(self):
+        self.tables = {
+            "user": [],
+            "study": [],
+            "enrollment": [],
+            "comment": [],
+            "comment_likes": [],
+            "chat_message": [],
+        }
+        self.fixture = {}
+
+    def add(self, table_name, **row):
+        rows = self.tables[table_name]
+        if table_name != "comment_likes":
+            row["id"] = len(rows) + 1
+        rows.append(row)
+        return row
+
+    def summary(self):
+        return ", ".join(f"{name} {len(rows)}" for name, rows in self.tables.items())
+
+
+def add_study(dataset, rng, author, date, member_count, title=None):
+    return dataset.add(
+        "study",
+        title=title or f"{rng.choice(['주말', '평일 저녁', '새벽', '온라인'])} {BENCH_KEYWORD} {len(dataset.tables['study']) + 1}",
+        category=rng.choice(BENCH_CATEGORIES),
+        member_count=member_count,
+        content=f"함께 꾸준히 공부할 멤버를 찾습니다. 벤치마크용 {BENCH_KEYWORD} 설명입니다.",
+        date=date,
+        writer=author["nickname"],
+        author_id=author["id"],
+        chat_link=None,
+        is_closed=False,
+        last_message_id=None,
+        last_message_at=None,
+        message_count=0,
+        last_activity_at=date,
+    )
+
+
+def add_comments(dataset, rng, study, users, count, likes):
+    roots = []
+    for index in range(count):
+        author = rng.choice(users)
+        parent = rng.choice(roots) if roots and index % 3 == 2 else None
+        comment = dataset.add(
+            "comment",
+            content=f"{index + 1}번째 댓글입니다.",
+            date=study["date"] + timedelta(minutes=index + 1),
+            writer=author["nickname"],
+            author_id=author["id"],
+            study_id=study["id"],
+            parent_id=parent["id"] if parent else None,
+        )
+        if parent is None:
+            roots.append(comment)
+        for liker in rng.sample(users, min(likes, len(users))):
+            dataset.add("comment_likes", user_id=liker["id"], comment_id=comment["id"])
+    return roots
+
+
+def add_messages(dataset, rng, study, senders, count):
+    for index in range(count):
+        dataset.add(
+            "chat_message",
+            content=f"{index + 1}번째 채팅 메시지",
+            date=study["date"] + timedelta(seconds=30 * (index + 1)),
+            study_id=study["id"],
+            user_id=rng.choice(senders)["id"],
+        )
+
+
+def generate_dataset(scale="small", iterations=20, seed=7):
+    sizes = SCALES[scale]
+    rng = random.Random(seed)
+    dataset = Dataset()
+    password = generate_password_hash(BENCH_PASSWORD)
+
+    user_total = max(sizes["users"], sizes["enrollments"] + iterations * 2 + 10)
+    users = [
+        dataset.add(
+            "user",
+            userid=f"user{index}",
+            password=password,
+            nickname=f"사용자{index}",
+            email=f"user{index}@example.com",
+            bio=None,
+        )
+        for index in range(1, user_total + 1)
+    ]
+    owner, member, applicant = users[0], users[1], users[2]
+
+    for index in range(sizes["studies"]):
+        author = users[index % len(users)]
+        enrolled = [users[(index + offset) % len(users)] for offset in range(1, sizes["enrollments"] + 1)]
+        study = add_study(dataset, rng, author, BASE_DATE + timedelta(hours=index), sizes["enrollments"] + 3)
+        approved = [author]
+        for position, user in enumerate(enrolled):
+            status = 1 if position == 0 else 0 if position == 1 else rng.choice([0, 1, 1, 2])
+            dataset.add(
+                "enrollment",
+                user_id=user["id"],
+                study_id=study["id"],
+                status=status,
+                date=study["date"] + timedelta(minutes=position + 1),
+            )
+            if status == 1:
+                approved.append(user)
+        hot = index == 0
+        roots = add_comments(
+            dataset,
+            rng,
+            study,
+            users,
+            sizes["hot_comments"] if hot else sizes["comments"],
+            sizes["hot_likes"] if hot else sizes["likes"],
+        )
+        add_messages(dataset, rng, study, approved, sizes["hot_messages"] if hot else sizes["messages"])
+        if hot:
+            hot_study, hot_roots = study, roots
+
+    disposable_date = BASE_DATE - timedelta(days=30)
+    disposable_studies = [
+        add_study(dataset, rng, owner, disposable_date + timedelta(minutes=index), 4)["id"] for index in range(iterations)
+    ]
+    disposable_comments = [
+        dataset.add(
+            "comment",
+            content="지워질 댓글입니다.",
+            date=hot_study["date"] + timedelta(days=1, minutes=index),
+            writer=owner["nickname"],
+            author_id=owner["id"],
+            study_id=hot_study["id"],
+            parent_id=None,
+        )["id"]
+        for index in range(iterations)
+    ]
+
+    applicants = users[-iterations:]
+    enrollment_study = add_study(dataset, rng, owner, disposable_date, iterations + 10, title="승인 처리용 스터디")
+    pending_enrollments = [
+        dataset.add(
+            "enrollment",
+            user_id=user["id"],
+            study_id=enrollment_study["id"],
+            status=0,
+            date=enrollment_study["date"] + timedelta(minutes=index + 1),
+        )["id"]
+        for index, user in enumerate(users[-iterations * 2 : -iterations])
+    ]
+    apply_study = add_study(dataset, rng, owner, disposable_date, iterations + 10, title="신청 받는 스터디")
+    toggle_study = add_study(dataset, rng, owner, disposable_date, 4, title="모집 상태 전환 스터디")
+
+    hot_message_ids = [
+        message["id"] for message in dataset.tables["chat_message"] if message["study_id"] == hot_study["id"]
+    ]
+    dataset.fixture = {
+        "owner": owner,
+        "member": member,
+        "applicant": applicant,
+        "applicants": applicants,
+        "study_id": hot_study["id"],
+        "comment_id": hot_roots[0]["id"] if hot_roots else disposable_comments[0],
+        "category": hot_study["category"],
+        "keyword": BENCH_KEYWORD,
+        "chat_after_id": hot_message_ids[-min(20, len(hot_message_ids))] if hot_message_ids else 0,
+        "chat_before_id": hot_message_ids[len(hot_message_ids) // 2] if hot_message_ids else 0,
+        "disposable_studies": disposable_studies,
+        "disposable_comments": disposable_comments,
+        "pending_enrollments": pending_enrollments,
+        "apply_study_id": apply_study["id"],
+        "toggle_study_id": toggle_study["id"],
+    }
+    return dataset
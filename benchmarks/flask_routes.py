@@ -0,0 +1,91 @@
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import event
+
+from report import RouteStats
+from scenarios import BENCH_CSRF_TOKEN, select_scenarios
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def load_app(workdir):
+    os.environ["STUDYMATE_DB_URI"] = "sqlite:///" + os.path.join(workdir, "flask_bench.db").replace("\\", "/")
+    os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+    os.environ.pop("STUDYMATE_CHAT_GROUP_COMMIT", None)
+    import app as app_module
+
+    return app_module
+
+
+def seed_app(app_module, dataset):
+    from models import comment_likes
+
+    tables = {
+        "user": app_module.User.__table__,
+        "study": app_module.Study.__table__,
+        "enrollment": app_module.Enrollment.__table__,
+        "comment": app_module.Comment.__table__,
+        "comment_likes": comment_likes,
+        "chat_message": app_module.ChatMessage.__table__,
+    }
+    with app_module.app.app_context():
+        for name, rows in dataset.tables.items():
+            if rows:
+                app_module.db.session.execute(tables[name].insert(), rows)
+        app_module.db.session.commit()
+
+
+def send(client, method, spec):
+    with client.session_transaction() as session:
+        session.clear()
+        session["_csrf_token"] = BENCH_CSRF_TOKEN
+        if spec["user"]:
+            session["user_id"] = spec["user"]["userid"]
+            session["user_nickname"] = spec["user"]["nickname"]
+    headers = dict(spec["headers"], **{"X-CSRFToken": BENCH_CSRF_TOKEN})
+    started = time.perf_counter()
+    if spec["path"].split("?")[0].endswith("/chat/stream"):
+        response = client.open(spec["path"], method=method, headers=headers, buffered=False)
+        next(iter(response.response), None)
+        response.close()
+    else:
+        response = client.open(spec["path"], method=method, headers=headers, data=spec["form"], json=spec["json"])
+    return time.perf_counter() - started, response.status_code
+
+
+def run_flask_benchmark(dataset, iterations, only=None):
+    workdir = tempfile.mkdtemp(prefix="studymate_flask_bench_")
+    app_module = load_app(workdir)
+    seed_app(app_module, dataset)
+
+    endpoints = {rule.endpoint for rule in app_module.app.url_map.iter_rules()}
+    counter = QueryCounter()
+    with app_module.app.app_context():
+        engine = app_module.db.engine
+    event.listen(engine, "before_cursor_execute", counter)
+
+    client = app_module.app.test_client()
+    results = []
+    try:
+        for label, method, build in select_scenarios(endpoints, only):
+            stats = RouteStats(label)
+            for iteration in range(iterations):
+                spec = build(dataset.fixture, iteration)
+                counter.count = 0
+                elapsed, status = send(client, method, spec)
+                stats.record(elapsed, counter.count, counter.count, status)
+            results.append(stats)
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+    return results
@@ -0,0 +1,62 @@
+import json
+import statistics
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class RouteStats:
+    def __init__(self, label):
+        self.label = label
+        self.latencies = []
+        self.queries = []
+        self.round_trips = []
+        self.statuses = set()
+
+    def record(self, elapsed, queries, round_trips, status):
+        self.latencies.append(elapsed)
+        self.queries.append(queries)
+        self.round_trips.append(round_trips)
+        self.statuses.add(status)
+
+    def summary(self):
+        return {
+            "route": self.label,
+            "requests": len(self.latencies),
+            "p50_ms": statistics.median(self.latencies) * 1000,
+            "p95_ms": percentile(self.latencies, 0.95) * 1000,
+            "p99_ms": percentile(self.latencies, 0.99) * 1000,
+            "max_ms": max(self.latencies) * 1000,
+            "queries": statistics.mean(self.queries),
+            "max_queries": max(self.queries),
+            "round_trips": statistics.mean(self.round_trips),
+            "statuses": sorted(self.statuses),
+        }
+
+
+def print_report(title, results):
+    print(title)
+    print(
+        f"{'route':<40} {'n':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+        f" {'queries':>8} {'max q':>6} {'trips':>6}  status"
+    )
+    for stats in results:
+        row = stats.summary()
+        print(
+            f"{row['route']:<40} {row['requests']:>4} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f}"
+            f" {row['p99_ms']:>9.2f} {row['max_ms']:>9.2f} {row['queries']:>8.1f} {row['max_queries']:>6}"
+            f" {row['round_trips']:>6.1f}  {','.join(str(status) for status in row['statuses'])}"
+        )
+    print()
+
+
+def write_json(path, reports):
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(
+            {title: [stats.summary() for stats in results] for title, results in reports.items()},
+            handle,
+            ensure_ascii=False,
+            indent=2,
+        )
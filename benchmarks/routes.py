@@ -0,0 +1,45 @@
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from dataset import SCALES, generate_dataset
+from report import print_report, write_json
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Drive every Flask and worker route against synthetic data and report latency and query counts."
+    )
+    parser.add_argument("--backend", choices=["flask", "worker", "both"], default="both")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--iterations", type=int, default=20, help="requests per route")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--only", action="append", help="only run routes whose label contains this text")
+    parser.add_argument("--json", help="also write the summaries to this JSON file")
+    args = parser.parse_args()
+
+    dataset = generate_dataset(args.scale, args.iterations, args.seed)
+    print(f"scale {args.scale}: {dataset.summary()}")
+    print()
+
+    reports = {}
+    if args.backend in ("flask", "both"):
+        from flask_routes import run_flask_benchmark
+
+        reports["flask"] = run_flask_benchmark(dataset, args.iterations, args.only)
+        print_report("Flask app (SQLite)", reports["flask"])
+    if args.backend in ("worker", "both"):
+        from worker_routes import run_worker_benchmark
+
+        reports["worker"] = run_worker_benchmark(dataset, args.iterations, args.only)
+        print_report("Worker (in-memory SQLite as D1)", reports["worker"])
+
+    if args.json:
+        write_json(args.json, reports)
+
+
+if __name__ == "__main__":
+    main()
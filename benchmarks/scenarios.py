@@ -0,0 +1,148 @@
+from urllib.parse import quote, urlencode
+
+from dataset import BENCH_PASSWORD
+
+BENCH_CSRF_TOKEN = "bench-csrf-token"
+
+
+def bench_request(path, user=None, form=None, json=None, headers=None, query=None):
+    if query:
+        path = f"{path}?{urlencode(query)}"
+    return {"path": path, "user": user, "form": form, "json": json, "headers": headers or {}}
+
+
+def study_form(index, title=None):
+    return {
+        "title": title or f"벤치마크 스터디 {index}",
+        "category": "웹 개발",
+        "member_count": "6",
+        "content": "벤치마크 중에 작성한 스터디입니다.",
+        "chat_link": "",
+    }
+
+
+ROUTE_SCENARIOS = [
+    ("favicon", "GET", lambda f, i: bench_request("/favicon.ico")),
+    ("home", "GET", lambda f, i: bench_request("/", f["member"])),
+    ("index", "GET", lambda f, i: bench_request("/index.html")),
+    ("login", "GET", lambda f, i: bench_request("/login")),
+    (
+        "login",
+        "POST",
+        lambda f, i: bench_request("/login", form={"userid": f["owner"]["userid"], "password": BENCH_PASSWORD}),
+    ),
+    ("logout", "POST", lambda f, i: bench_request("/logout", f["member"], form={})),
+    ("check_userid", "GET", lambda f, i: bench_request("/check-userid", query={"userid": f["owner"]["userid"]})),
+    ("signup", "GET", lambda f, i: bench_request("/signup")),
+    (
+        "signup",
+        "POST",
+        lambda f, i: bench_request(
+            "/signup",
+            form={
+                "userid": f"newbie{i}",
+                "password": BENCH_PASSWORD,
+                "password_confirm": BENCH_PASSWORD,
+                "nickname": f"새내기{i}",
+                "email": f"newbie{i}@example.com",
+            },
+        ),
+    ),
+    ("study", "GET", lambda f, i: bench_request("/study", f["member"])),
+    ("study?page", "GET", lambda f, i: bench_request("/study", f["member"], query={"page": 2})),
+    ("study?keyword", "GET", lambda f, i: bench_request("/study", f["member"], query={"keyword": f["keyword"]})),
+    ("study?category", "GET", lambda f, i: bench_request("/study", f["member"], query={"category": f["category"]})),
+    ("studywrite", "GET", lambda f, i: bench_request("/study/write", f["owner"])),
+    ("studywrite", "POST", lambda f, i: bench_request("/study/write", f["owner"], form=study_form(i))),
+    ("study_detail", "GET", lambda f, i: bench_request(f"/study/{f['study_id']}", f["member"])),
+    ("study_edit", "GET", lambda f, i: bench_request(f"/study/{f['study_id']}/edit", f["owner"])),
+    (
+        "study_edit",
+        "POST",
+        lambda f, i: bench_request(
+            f"/study/{f['study_id']}/edit", f["owner"], form=study_form(i, title="가장 붐비는 벤치마크 스터디")
+        ),
+    ),
+    ("my_posts", "GET", lambda f, i: bench_request("/myposts", f["owner"])),
+    (
+        "comment_write",
+        "POST",
+        lambda f, i: bench_request(f"/comment/write/{f['study_id']}", f["member"], form={"content": f"벤치마크 댓글 {i}"}),
+    ),
+    ("comment_like", "POST", lambda f, i: bench_request(f"/comment/like/{f['comment_id']}", f["member"], form={})),
+    (
+        "study_apply",
+        "POST",
+        lambda f, i: bench_request(f"/study/apply/{f['apply_study_id']}", f["applicants"][i], form={}),
+    ),
+    ("mypage", "GET", lambda f, i: bench_request("/mypage", f["owner"])),
+    ("chats", "GET", lambda f, i: bench_request("/chats", f["member"])),
+    ("study_chat", "GET", lambda f, i: bench_request(f"/study/{f['study_id']}/chat", f["member"])),
+    (
+        "study_chat",
+        "POST",
+        lambda f, i: bench_request(f"/study/{f['study_id']}/chat", f["member"], json={"content": f"벤치마크 채팅 {i}"}),
+    ),
+    (
+        "study_chat_messages?after_id",
+        "GET",
+        lambda f, i: bench_request(
+            f"/study/{f['study_id']}/chat/messages", f["member"], query={"after_id": f["chat_after_id"]}
+        ),
+    ),
+    (
+        "study_chat_messages?before_id",
+        "GET",
+        lambda f, i: bench_request(
+            f"/study/{f['study_id']}/chat/messages", f["member"], query={"before_id": f["chat_before_id"]}
+        ),
+    ),
+    (
+        "study_chat_stream",
+        "GET",
+        lambda f, i: bench_request(
+            f"/study/{f['study_id']}/chat/stream", f["member"], query={"last_event_id": f["chat_after_id"]}
+        ),
+    ),
+    (
+        "study_chat_socket",
+        "GET",
+        lambda f, i: bench_request(f"/study/{f['study_id']}/chat/socket", f["member"], headers={"Upgrade": "websocket"}),
+    ),
+    ("update_profile", "POST", lambda f, i: bench_request("/update_profile", f["owner"], form={"bio": f"소개 {i}"})),
+    ("profile", "GET", lambda f, i: bench_request(f"/profile/{quote(f['owner']['nickname'])}", f["member"])),
+    (
+        "enrollment_action",
+        "POST",
+        lambda f, i: bench_request(
+            f"/enrollment/{f['pending_enrollments'][i]}/{'accept' if i % 2 == 0 else 'reject'}", f["owner"], form={}
+        ),
+    ),
+    (
+        "study_toggle_close",
+        "POST",
+        lambda f, i: bench_request(f"/study/{f['toggle_study_id']}/toggle_close", f["owner"], form={}),
+    ),
+    (
+        "comment_delete",
+        "POST",
+        lambda f, i: bench_request(f"/comment/delete/{f['disposable_comments'][i]}", f["owner"], form={}),
+    ),
+    (
+        "study_delete",
+        "POST",
+        lambda f, i: bench_request(f"/study/{f['disposable_studies'][i]}/delete", f["owner"], form={}),
+    ),
+]
+
+
+def select_scenarios(endpoints, only=None):
+    selected = []
+    for label, method, build in ROUTE_SCENARIOS:
+        endpoint = label.split("?")[0]
+        if endpoint not in endpoints:
+            continue
+        if only and not any(name in label for name in only):
+            continue
+        selected.append((f"{method} {label}", method, build))
+    return selected
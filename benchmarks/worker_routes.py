@@ -0,0 +1,270 @@
+import asyncio
+import contextlib
+import importlib.util
+import io
+import json
+import sqlite3
+import sys
+import time
+import types
+from pathlib import Path
+
+from report import RouteStats
+from scenarios import BENCH_CSRF_TOKEN, select_scenarios
+
+ROOT = Path(__file__).resolve().parents[1]
+SCHEMA_PATH = ROOT / "cloudflare" / "schema.sql"
+
+
+class BenchResponse:
+    def __init__(self, body="", status=200, headers=None, web_socket=None):
+        self.body = body
+        self.status = status
+        self.headers = dict(headers or {})
+        self.web_socket = web_socket
+
+    @classmethod
+    def json(cls, payload, status=200):
+        return cls(json.dumps(payload, ensure_ascii=False), status, {"Content-Type": "application/json"})
+
+
+class BenchEntrypoint:
+    def __init__(self, ctx=None, env=None):
+        self.ctx = ctx
+        self.env = env
+
+
+class BenchWebSocket:
+    def __init__(self):
+        self.peer = None
+        self.received = []
+        self.accepted = False
+        self.closed = None
+        self.listeners = {}
+
+    def accept(self):
+        self.accepted = True
+
+    def addEventListener(self, event_type, listener):
+        self.listeners.setdefault(event_type, []).append(listener)
+
+    def dispatch(self, event_type, event=None):
+        for listener in self.listeners.get(event_type, []):
+            listener(event)
+
+    def send(self, data):
+        if self.closed or self.peer.closed:
+            raise RuntimeError("WebSocket is closed")
+        self.peer.received.append(data)
+
+    def close(self, code=1000, reason=""):
+        if self.closed:
+            return
+        self.closed = (code, reason)
+        self.peer.dispatch("close", {"code": code, "reason": reason})
+
+
+class BenchWebSocketPair:
+    def __init__(self):
+        self.client = BenchWebSocket()
+        self.server = BenchWebSocket()
+        self.client.peer = self.server
+        self.server.peer = self.client
+
+    @classmethod
+    def new(cls):
+        return cls()
+
+    def object_values(self):
+        return self.client, self.server
+
+
+def install_runtime_shims():
+    if "workers" in sys.modules or importlib.util.find_spec("workers") is not None:
+        return
+    js_module = types.ModuleType("js")
+    js_module.URL = None
+    js_module.WebSocketPair = BenchWebSocketPair
+    js_module.Request = BenchRequest
+    workers_module = types.ModuleType("workers")
+    workers_module.Response = BenchResponse
+    workers_module.WorkerEntrypoint = BenchEntrypoint
+    workers_module.DurableObject = BenchEntrypoint
+    pyodide_module = types.ModuleType("pyodide")
+    ffi_module = types.ModuleType("pyodide.ffi")
+    ffi_module.to_js = lambda value: value
+    ffi_module.create_proxy = lambda value: value
+    pyodide_module.ffi = ffi_module
+    sys.modules.update({"js": js_module, "workers": workers_module, "pyodide": pyodide_module, "pyodide.ffi": ffi_module})
+
+
+class SQLiteStatement:
+    def __init__(self, database, sql, params=()):
+        self.database = database
+        self.sql = sql
+        self.params = params
+
+    def bind(self, *params):
+        return SQLiteStatement(self.database, self.sql, params)
+
+    def execute(self):
+        self.database.statements += 1
+        cursor = self.database.connection.execute(self.sql, self.params)
+        rows = []
+        if cursor.description:
+            columns = [description[0] for description in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        self.database.connection.commit()
+        return {"results": rows, "success": True, "meta": {"last_row_id": cursor.lastrowid, "changes": cursor.rowcount}}
+
+    async def run(self):
+        self.database.round_trips += 1
+        return self.execute()
+
+    async def all(self):
+        return await self.run()
+
+    async def first(self):
+        rows = (await self.run())["results"]
+        return rows[0] if rows else None
+
+
+class SQLiteD1:
+    def __init__(self):
+        self.connection = sqlite3.connect(":memory:")
+        self.connection.executescript(SCHEMA_PATH.read_text(encoding="utf-8"))
+        self.statements = 0
+        self.round_trips = 0
+
+    def prepare(self, sql):
+        return SQLiteStatement(self, sql)
+
+    async def batch(self, statements):
+        self.round_trips += 1
+        return [statement.execute() for statement in statements]
+
+    def reset_counters(self):
+        self.statements = 0
+        self.round_trips = 0
+
+
+class BenchDurableState:
+    def __init__(self):
+        self.websockets = []
+
+    def acceptWebSocket(self, socket, tags=None):
+        socket.accept()
+        self.websockets.append((socket, set(tags or [])))
+
+    def getWebSockets(self, tag=None):
+        return [socket for socket, tags in self.websockets if not socket.closed and (tag is None or tag in tags)]
+
+
+class BenchChatRoomNamespace:
+    def __init__(self, room_class, env):
+        self.room_class = room_class
+        self.env = env
+        self.rooms = {}
+
+    def idFromName(self, name):
+        return name
+
+    def get(self, room_id):
+        if room_id not in self.rooms:
+            self.rooms[room_id] = self.room_class(BenchDurableState(), self.env)
+        return self.rooms[room_id]
+
+
+class BenchEnv:
+    def __init__(self, chat_room_class=None):
+        self.DB = SQLiteD1()
+        self.SECRET_KEY = "bench-secret-key"
+        if chat_room_class is not None:
+            self.CHAT_ROOM = BenchChatRoomNamespace(chat_room_class, self)
+
+
+class BenchHeaders(dict):
+    def get(self, key, default=None):
+        for name, value in self.items():
+            if name.lower() == key.lower():
+                return value
+        return default
+
+
+class BenchRequest:
+    def __init__(self, method, url, headers, form=None, body=None):
+        self.method = method
+        self.url = url
+        self.headers = BenchHeaders(headers)
+        self.form = form or {}
+        self.body = body
+
+    @classmethod
+    def new(cls, url, request):
+        return cls(request.method, url, request.headers, request.form, request.body)
+
+    async def formData(self):
+        return self.form
+
+    async def json(self):
+        return self.body
+
+
+def to_d1_value(value):
+    if hasattr(value, "isoformat"):
+        return value.replace(microsecond=0).isoformat()
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def seed_env(env, dataset):
+    connection = env.DB.connection
+    for name, rows in dataset.tables.items():
+        if not rows:
+            continue
+        columns = list(rows[0])
+        connection.executemany(
+            f"INSERT INTO {name} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+            [[to_d1_value(row[column]) for column in columns] for row in rows],
+        )
+    connection.commit()
+
+
+def build_request(worker, method, spec):
+    session = {"_csrf_token": BENCH_CSRF_TOKEN}
+    if spec["user"]:
+        session.update(user_id=spec["user"]["userid"], user_nickname=spec["user"]["nickname"])
+    headers = dict(spec["headers"], **{"X-CSRFToken": BENCH_CSRF_TOKEN})
+    if spec["json"] is not None:
+        headers["Content-Type"] = "application/json"
+    headers["Cookie"] = f"{worker.SESSION_COOKIE_NAME}={worker.sign_session(session, 'bench-secret-key')}"
+    return BenchRequest(method, "http://localhost" + spec["path"], headers, spec["form"], spec["json"])
+
+
+def run_worker_benchmark(dataset, iterations, only=None):
+    install_runtime_shims()
+    sys.path.insert(0, str(ROOT / "worker"))
+    import cf_worker as worker
+
+    env = BenchEnv(worker.ChatRoom)
+    seed_env(env, dataset)
+    entrypoint = worker.Default(None, env)
+    loop = asyncio.new_event_loop()
+    request_log = io.StringIO()
+    results = []
+    try:
+        for label, method, build in select_scenarios(set(worker.HANDLERS), only):
+            stats = RouteStats(label)
+            for iteration in range(iterations):
+                request = build_request(worker, method, build(dataset.fixture, iteration))
+                env.DB.reset_counters()
+                started = time.perf_counter()
+                with contextlib.redirect_stdout(request_log):
+                    response = loop.run_until_complete(entrypoint.fetch(request))
+                elapsed = time.perf_counter() - started
+                stats.record(elapsed, env.DB.statements, env.DB.round_trips, response.status)
+            results.append(stats)
+    finally:
+        loop.close()
+    return results
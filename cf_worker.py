@@ -1,19 +1,26 @@
+import asyncio
 import base64
+import contextvars
 import hashlib
 import hmac
 import json
+import logging
 import math
+import random
 import re
+import time
+import zlib
 from datetime import datetime, timedelta
 from pathlib import Path
 from types import SimpleNamespace
-from urllib.parse import parse_qs, quote, urlencode, urlparse
+from urllib.parse import parse_qs, quote, unquote, urlencode, urlparse
 
 from jinja2 import Environment, FileSystemLoader, select_autoescape
-from js import URL
+from js import URL, Request, WebSocketPair
 from markupsafe import Markup
+from pyodide.ffi import create_proxy, to_js
 from werkzeug.security import check_password_hash, generate_password_hash
-from workers import Response, WorkerEntrypoint
+from workers import DurableObject, Response, WorkerEntrypoint
 
 STUDY_CATEGORIES = [
     ("취업 / 커리어", ["취업 준비", "자소서 / 포트폴리오", "면접 준비", "공기업 / 공시"]),
@@ -68,6 +75,23 @@ HOME_SHOWCASE_VISUALS = [
 SESSION_COOKIE_NAME = "studymate_session"
 DEFAULT_SECRET = "dev-secret-change-me"
 TEMPLATES_DIR = Path(__file__).parent / "templates"
+D1_MAX_BOUND_PARAMS = 100
+HOME_PICK_COUNT = 4
+HOME_SAMPLE_DRAWS = 16
+HOME_SAMPLE_ROUNDS = 3
+STUDY_SEARCH_MIN_FTS_LENGTH = 3
+STUDY_PAGE_SIZE = 9
+STUDY_TOTAL_CACHE_SECONDS = 30
+STUDY_TOTAL_CACHE_SIZE = 256
+CHAT_ACCESS_CACHE_SECONDS = 15
+CHAT_ACCESS_CACHE_SIZE = 1024
+CHAT_HISTORY_PAGE_SIZE = 80
+CHAT_LONG_POLL_SECONDS = 30
+CHAT_LONG_POLL_INTERVAL = 2
+CHAT_VERSION_CACHE_SECONDS = 1
+CHAT_VERSION_CACHE_SIZE = 1024
+QUERY_STATS_SLOWEST = 3
+QUERY_STATS_SQL_LENGTH = 200
 
 ROUTE_PATTERNS = [
     ("home", ["GET"], re.compile(r"^/$")),
@@ -84,6 +108,7 @@ ROUTE_PATTERNS = [
     ("study_apply", ["POST"], re.compile(r"^/study/apply/(?P<study_id>\d+)$")),
     ("study_chat", ["GET", "POST"], re.compile(r"^/study/(?P<study_id>\d+)/chat$")),
     ("study_chat_messages", ["GET"], re.compile(r"^/study/(?P<study_id>\d+)/chat/messages$")),
+    ("study_chat_socket", ["GET"], re.compile(r"^/study/(?P<study_id>\d+)/chat/socket$")),
     ("study_toggle_close", ["POST"], re.compile(r"^/study/(?P<study_id>\d+)/toggle_close$")),
     ("mypage", ["GET"], re.compile(r"^/mypage$")),
     ("my_posts", ["GET"], re.compile(r"^/myposts$")),
@@ -111,6 +136,7 @@ URL_RULES = {
     "study_apply": "/study/apply/{study_id}",
     "study_chat": "/study/{study_id}/chat",
     "study_chat_messages": "/study/{study_id}/chat/messages",
+    "study_chat_socket": "/study/{study_id}/chat/socket",
     "study_toggle_close": "/study/{study_id}/toggle_close",
     "mypage": "/mypage",
     "my_posts": "/myposts",
@@ -127,6 +153,12 @@ jinja_env = Environment(
     loader=FileSystemLoader(str(TEMPLATES_DIR)),
     autoescape=select_autoescape(["html", "xml"]),
 )
+study_total_cache = {}
+chat_access_cache = {}
+chat_version_cache = {}
+
+chat_logger = logging.getLogger("studymate.chat")
+
 jinja_env.filters["tojson"] = lambda value: Markup(json.dumps(value, ensure_ascii=False))
 
 
@@ -277,6 +309,11 @@ def build_study(row):
         "author_id": row.get("author_id"),
         "chat_link": row.get("chat_link"),
         "is_closed": bool(row.get("is_closed", 0)),
+        "last_message_id": row.get("last_message_id"),
+        "last_message_at": parse_db_datetime(row["last_message_at"]) if row.get("last_message_at") else None,
+        "message_count": int(row.get("message_count") or 0),
+        "approved_count": int(row.get("approved_count") or 0),
+        "pending_count": int(row.get("pending_count") or 0),
     }
 
 
@@ -290,7 +327,8 @@ def build_comment(row):
         "study_id": row["study_id"],
         "parent_id": row.get("parent_id"),
         "replies": [],
-        "likers": [],
+        "like_count": int(row.get("like_count") or 0),
+        "liked": False,
     }
 
 
@@ -315,8 +353,82 @@ def build_chat_message(row):
     }
 
 
+def build_fts_phrase(keyword):
+    return '"' + keyword.replace('"', '""') + '"'
+
+
+def encode_study_cursor(date_value, study_id):
+    raw = f"{date_value}|{study_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_study_cursor(token):
+    padding = "=" * (-len(token) % 4)
+    try:
+        date_text, study_id = base64.urlsafe_b64decode(token + padding).decode("utf-8").rsplit("|", 1)
+        return date_text, int(study_id)
+    except ValueError as error:
+        raise ValueError("잘못된 커서입니다.") from error
+
+
+def serialize_study(study):
+    return {
+        "id": study["id"],
+        "title": study["title"],
+        "category": study["category"],
+        "member_count": study["member_count"],
+        "content": study["content"][:90],
+        "date": study["date"].strftime("%Y-%m-%d"),
+        "writer": study["writer"],
+        "is_closed": study["is_closed"],
+        "url": url_for("study_detail", study_id=study["id"]),
+    }
+
+
+async def get_cached_study_total(env, cache_key, sql, params):
+    now = time.monotonic()
+    cached = study_total_cache.get(cache_key)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    row = await d1_first(env, sql, params)
+    total = int(row["total"] if row else 0)
+    if len(study_total_cache) >= STUDY_TOTAL_CACHE_SIZE:
+        study_total_cache.pop(next(iter(study_total_cache)))
+    study_total_cache[cache_key] = (now + STUDY_TOTAL_CACHE_SECONDS, total)
+    return total
+
+
+def invalidate_study_totals():
+    study_total_cache.clear()
+
+
+def get_cached_chat_access(user_id, study_id):
+    expires_at = chat_access_cache.get((user_id, study_id))
+    if expires_at and expires_at > time.monotonic():
+        return True
+    return None
+
+
+def remember_chat_access(user_id, study_id, allowed):
+    if not allowed:
+        chat_access_cache.pop((user_id, study_id), None)
+        return
+    if len(chat_access_cache) >= CHAT_ACCESS_CACHE_SIZE:
+        chat_access_cache.pop(next(iter(chat_access_cache)))
+    chat_access_cache[(user_id, study_id)] = time.monotonic() + CHAT_ACCESS_CACHE_SECONDS
+
+
+def invalidate_chat_access(study_id, user_id=None):
+    if user_id is not None:
+        chat_access_cache.pop((user_id, study_id), None)
+        return
+    for key in [key for key in chat_access_cache if key[1] == study_id]:
+        del chat_access_cache[key]
+
+
 def approved_member_count(study):
-    return sum(1 for enrollment in study.get("enrollments", []) if enrollment["status"] == 1)
+    return study["approved_count"]
 
 
 def is_study_owner(study, user):
@@ -397,20 +509,79 @@ def js_to_py(value):
     return value
 
 
-async def d1_run(env, sql, params=None):
+def prepare_statement(env, sql, params=None):
     statement = env.DB.prepare(sql)
     if params:
         statement = statement.bind(*params)
-    return js_to_py(await statement.run())
+    return statement
 
 
-async def d1_rows(env, sql, params=None):
-    result = await d1_run(env, sql, params)
+def result_rows(result):
     if isinstance(result, dict):
         return result.get("results", []) or []
     return []
 
 
+class QueryStats:
+    def __init__(self, slowest_limit=QUERY_STATS_SLOWEST):
+        self.slowest_limit = slowest_limit
+        self.count = 0
+        self.round_trips = 0
+        self.total_seconds = 0.0
+        self.slowest = []
+
+    def record(self, statement, seconds, statements=1):
+        self.count += statements
+        self.round_trips += 1
+        self.total_seconds += seconds
+        self.slowest.append((seconds, " ".join(statement.split())[:QUERY_STATS_SQL_LENGTH]))
+        self.slowest.sort(key=lambda entry: entry[0], reverse=True)
+        del self.slowest[self.slowest_limit :]
+
+    def server_timing(self, total_seconds):
+        return (
+            f'db;dur={self.total_seconds * 1000:.1f};desc="{self.count} queries, {self.round_trips} round trips", '
+            f"app;dur={total_seconds * 1000:.1f}"
+        )
+
+    def log_line(self, method, path, endpoint, status, total_seconds):
+        return json.dumps(
+            {
+                "event": "request",
+                "method": method,
+                "path": path,
+                "endpoint": endpoint,
+                "status": status,
+                "duration_ms": round(total_seconds * 1000, 1),
+                "db_queries": self.count,
+                "db_round_trips": self.round_trips,
+                "db_ms": round(self.total_seconds * 1000, 1),
+                "slowest": [{"ms": round(seconds * 1000, 2), "sql": sql} for seconds, sql in self.slowest],
+            },
+            ensure_ascii=False,
+        )
+
+
+request_query_stats = contextvars.ContextVar("request_query_stats", default=None)
+
+
+def record_query(sql, started, statements=1):
+    stats = request_query_stats.get()
+    if stats is not None:
+        stats.record(sql, time.perf_counter() - started, statements)
+
+
+async def d1_run(env, sql, params=None):
+    started = time.perf_counter()
+    result = js_to_py(await prepare_statement(env, sql, params).run())
+    record_query(sql, started)
+    return result
+
+
+async def d1_rows(env, sql, params=None):
+    return result_rows(await d1_run(env, sql, params))
+
+
 async def d1_first(env, sql, params=None):
     rows = await d1_rows(env, sql, params)
     return rows[0] if rows else None
@@ -428,6 +599,40 @@ async def d1_execute(env, sql, params=None):
     return None
 
 
+class D1Query:
+    def __init__(self, sql, params=None, build=None):
+        self.sql = sql
+        self.params = params or []
+        self.build = build or (lambda rows: rows)
+
+
+class D1Batch:
+    def __init__(self, env):
+        self.env = env
+        self.queries = []
+
+    def add(self, query):
+        self.queries.append(query)
+        return len(self.queries) - 1
+
+    async def run(self):
+        if not self.queries:
+            return []
+        statements = [prepare_statement(self.env, query.sql, query.params) for query in self.queries]
+        started = time.perf_counter()
+        results = js_to_py(await self.env.DB.batch(to_js(statements)))
+        record_query(
+            f"BATCH[{len(statements)}] " + "; ".join(query.sql.split(None, 1)[0] for query in self.queries),
+            started,
+            len(statements),
+        )
+        return [query.build(result_rows(result)) for query, result in zip(self.queries, results)]
+
+
+async def d1_fetch(env, query):
+    return query.build(await d1_rows(env, query.sql, query.params))
+
+
 async def fetch_user_by_userid(env, userid):
     row = await d1_first(
         env,
@@ -455,106 +660,364 @@ async def fetch_user_by_nickname(env, nickname):
     return build_user(row)
 
 
+def study_by_id_query(study_id):
+    return D1Query(
+        "SELECT * FROM study WHERE id = ?",
+        [study_id],
+        lambda rows: build_study(rows[0]) if rows else None,
+    )
+
+
 async def fetch_study_by_id(env, study_id):
-    row = await d1_first(env, "SELECT * FROM study WHERE id = ?", [study_id])
-    return build_study(row)
+    return await d1_fetch(env, study_by_id_query(study_id))
 
 
-async def fetch_enrollment(env, user_id, study_id):
-    row = await d1_first(
-        env,
+def enrollment_query(user_id, study_id):
+    return D1Query(
         "SELECT id, user_id, study_id, status, date FROM enrollment WHERE user_id = ? AND study_id = ?",
         [user_id, study_id],
+        lambda rows: build_enrollment(rows[0]) if rows else None,
     )
-    return build_enrollment(row) if row else None
 
 
-async def fetch_study_enrollments(env, study_id):
-    rows = await d1_rows(
-        env,
+def chat_access_query(user, study_id):
+    return D1Query(
         """
+        SELECT s.author_id, s.writer, e.status AS enrollment_status
+        FROM study s
+        LEFT JOIN enrollment e ON e.user_id = ? AND e.study_id = s.id
+        WHERE s.id = ?
+        """,
+        [user["id"], study_id],
+        lambda rows: (is_study_owner(rows[0], user) or rows[0]["enrollment_status"] == 1) if rows else None,
+    )
+
+
+async def fetch_enrollment(env, user_id, study_id):
+    return await d1_fetch(env, enrollment_query(user_id, study_id))
+
+
+def build_study_enrollment(row):
+    return {
+        "id": row["id"],
+        "user_id": row["member_user_id"],
+        "study_id": row["study_id"],
+        "status": int(row["status"]),
+        "date": parse_db_datetime(row["date"]),
+        "user": build_user(row, "user_"),
+    }
+
+
+def chunked(values, size=D1_MAX_BOUND_PARAMS):
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def study_enrollments_query(study_ids):
+    placeholders = ", ".join(["?"] * len(study_ids))
+    return D1Query(
+        f"""
         SELECT e.id, e.user_id AS member_user_id, e.study_id, e.status, e.date,
                u.id AS user_id, u.userid AS user_userid, u.nickname AS user_nickname,
                u.email AS user_email, u.bio AS user_bio
         FROM enrollment e
         JOIN user u ON u.id = e.user_id
-        WHERE e.study_id = ?
-        ORDER BY e.date DESC
+        WHERE e.study_id IN ({placeholders})
+        ORDER BY e.date DESC, e.id DESC
         """,
-        [study_id],
+        list(study_ids),
+        lambda rows: [build_study_enrollment(row) for row in rows],
     )
-    enrollments = []
-    for row in rows:
-        enrollment = {
-            "id": row["id"],
-            "user_id": row["member_user_id"],
-            "study_id": row["study_id"],
-            "status": int(row["status"]),
-            "date": parse_db_datetime(row["date"]),
-            "user": build_user(row, "user_"),
-        }
-        enrollments.append(enrollment)
-    return enrollments
 
 
-async def fetch_study_comments(env, study_id):
-    rows = await d1_rows(
-        env,
-        "SELECT id, content, date, writer, author_id, study_id, parent_id FROM comment WHERE study_id = ? ORDER BY date ASC, id ASC",
-        [study_id],
-    )
-    comments = {row["id"]: build_comment(row) for row in rows}
-    if not comments:
-        return []
+async def fetch_enrollments_by_study(env, study_ids):
+    enrollments_by_study = {study_id: [] for study_id in study_ids}
+    batch = D1Batch(env)
+    for chunk in chunked(list(enrollments_by_study)):
+        batch.add(study_enrollments_query(chunk))
+    for enrollments in await batch.run():
+        for enrollment in enrollments:
+            enrollments_by_study[enrollment["study_id"]].append(enrollment)
+    return enrollments_by_study
+
+
+async def fetch_study_enrollments(env, study_id):
+    return await d1_fetch(env, study_enrollments_query([study_id]))
 
-    placeholders = ", ".join(["?"] * len(comments))
-    like_rows = await d1_rows(
-        env,
-        f"""
-        SELECT cl.comment_id,
-               u.id, u.userid, u.nickname, u.email, u.bio
-        FROM comment_likes cl
-        JOIN user u ON u.id = cl.user_id
-        WHERE cl.comment_id IN ({placeholders})
-        ORDER BY cl.comment_id ASC
-        """,
-        list(comments.keys()),
-    )
-    for row in like_rows:
-        comments[row["comment_id"]]["likers"].append(build_user(row))
 
-    root_comments = []
+def build_comment_tree(rows):
+    comments = {}
+    for row in rows:
+        comment = build_comment(row)
+        comments[comment["id"]] = comment
+
     for comment in comments.values():
         parent_id = comment.get("parent_id")
         if parent_id and parent_id in comments:
             comments[parent_id]["replies"].append(comment)
-        else:
-            root_comments.append(comment)
-    root_comments.sort(key=lambda item: (item["date"], item["id"]))
     for comment in comments.values():
         comment["replies"].sort(key=lambda item: (item["date"], item["id"]))
+    return list(comments.values())
+
+
+def mark_liked_comments(comments, liked_ids):
+    for comment in comments:
+        comment["liked"] = comment["id"] in (liked_ids or ())
+    return comments
+
+
+def select_root_comments(comments):
+    comment_ids = {comment["id"] for comment in comments}
+    root_comments = [comment for comment in comments if comment.get("parent_id") not in comment_ids]
+    root_comments.sort(key=lambda item: (item["date"], item["id"]))
     return root_comments
 
 
-async def fetch_chat_messages(env, study_id, limit=80, after_id=None):
+def study_comments_query(study_id):
+    return D1Query(
+        """
+        SELECT id, content, date, writer, author_id, study_id, parent_id, like_count
+        FROM comment
+        WHERE study_id = ?
+        ORDER BY date ASC, id ASC
+        """,
+        [study_id],
+        build_comment_tree,
+    )
+
+
+def liked_comments_query(study_id, viewer_id):
+    return D1Query(
+        """
+        SELECT cl.comment_id
+        FROM comment_likes cl
+        JOIN comment c ON c.id = cl.comment_id
+        WHERE cl.user_id = ? AND c.study_id = ?
+        """,
+        [viewer_id, study_id],
+        lambda rows: {row["comment_id"] for row in rows},
+    )
+
+
+async def toggle_comment_like(env, user_id, comment_id):
+    batch = D1Batch(env)
+    batch.add(D1Query("SELECT id, study_id FROM comment WHERE id = ?", [comment_id], lambda rows: rows[0] if rows else None))
+    batch.add(
+        D1Query(
+            """
+            INSERT INTO comment_likes (user_id, comment_id)
+            SELECT ?, id FROM comment WHERE id = ?
+            ON CONFLICT DO NOTHING
+            RETURNING comment_id
+            """,
+            [user_id, comment_id],
+        )
+    )
+    comment, inserted = await batch.run()
+    if comment and not inserted:
+        await d1_run(env, "DELETE FROM comment_likes WHERE user_id = ? AND comment_id = ?", [user_id, comment_id])
+    return comment
+
+
+CHAT_MESSAGE_SELECT_SQL = """
+    SELECT cm.id, cm.content, cm.date, cm.study_id, cm.user_id AS message_user_id,
+           u.id AS user_id, u.userid AS user_userid, u.nickname AS user_nickname,
+           u.email AS user_email, u.bio AS user_bio
+    FROM chat_message cm
+    JOIN user u ON u.id = cm.user_id
+    WHERE cm.study_id = ?
+"""
+
+
+def build_chat_history(rows, limit):
+    page = rows[:limit]
+    messages = [build_chat_message(row) for row in page]
+    messages.reverse()
+    return {
+        "messages": messages,
+        "has_more": len(rows) > limit,
+        "anchor": (page[-1]["date"], page[-1]["id"]) if page else None,
+    }
+
+
+def chat_history_query(study_id, before_id=None, limit=CHAT_HISTORY_PAGE_SIZE):
     params = [study_id]
-    sql = """
-        SELECT cm.id, cm.content, cm.date, cm.study_id, cm.user_id AS message_user_id,
-               u.id AS user_id, u.userid AS user_userid, u.nickname AS user_nickname,
-               u.email AS user_email, u.bio AS user_bio
-        FROM chat_message cm
-        JOIN user u ON u.id = cm.user_id
-        WHERE cm.study_id = ?
-    """
-    if after_id is not None:
-        sql += " AND cm.id > ?"
-        params.append(after_id)
+    sql = CHAT_MESSAGE_SELECT_SQL
+    if before_id:
+        sql += """
+            AND (cm.date, cm.id) < (
+                SELECT anchor.date, anchor.id
+                FROM chat_message anchor
+                WHERE anchor.id = ? AND anchor.study_id = ?
+            )
+        """
+        params.extend([before_id, study_id])
+    sql += " ORDER BY cm.date DESC, cm.id DESC LIMIT ?"
+    params.append(limit + 1)
+    return D1Query(sql, params, lambda rows: build_chat_history(rows, limit))
+
+
+def chat_messages_query(study_id, limit=80, after_id=None):
+    params = [study_id]
+    sql = CHAT_MESSAGE_SELECT_SQL
+    if after_id:
+        sql += """
+            AND (cm.date, cm.id) > (
+                SELECT COALESCE(MAX(anchor.date), ''), ?
+                FROM chat_message anchor
+                WHERE anchor.id = ? AND anchor.study_id = ?
+            )
+            AND (
+                cm.id > ?
+                OR EXISTS (SELECT 1 FROM chat_message anchor WHERE anchor.id = ? AND anchor.study_id = ?)
+            )
+        """
+        params.extend([after_id, after_id, study_id, after_id, after_id, study_id])
     sql += " ORDER BY cm.date ASC, cm.id ASC"
     if limit is not None:
         sql += " LIMIT ?"
         params.append(limit)
-    rows = await d1_rows(env, sql, params)
-    return [build_chat_message(row) for row in rows]
+    return D1Query(sql, params, lambda rows: [build_chat_message(row) for row in rows])
+
+
+def decode_chat_archive(payload):
+    return json.loads(zlib.decompress(base64.b64decode(payload)).decode("utf-8"))
+
+
+async def fetch_chat_anchor(env, study_id, message_id):
+    row = await d1_first(env, "SELECT date FROM chat_message WHERE id = ? AND study_id = ?", [message_id, study_id])
+    if row:
+        return (row["date"], message_id)
+    rows = await d1_rows(
+        env,
+        """
+        SELECT payload FROM chat_archive
+        WHERE study_id = ? AND first_message_id <= ? AND last_message_id >= ?
+        """,
+        [study_id, message_id, message_id],
+    )
+    for row in rows:
+        for archived_id, date, _, _ in decode_chat_archive(row["payload"]):
+            if archived_id == message_id:
+                return (date, message_id)
+    return None
+
+
+async def fetch_archived_chat_history(env, study_id, anchor, limit):
+    collected = []
+    chunk_cursor = None
+    while len(collected) <= limit:
+        sql = "SELECT id, first_date, payload FROM chat_archive WHERE study_id = ?"
+        params = [study_id]
+        if anchor:
+            sql += " AND first_date <= ?"
+            params.append(anchor[0])
+        if chunk_cursor:
+            sql += " AND (first_date, id) < (?, ?)"
+            params.extend(chunk_cursor)
+        sql += " ORDER BY first_date DESC, id DESC LIMIT 1"
+        row = await d1_first(env, sql, params)
+        if not row:
+            break
+        chunk_cursor = (row["first_date"], row["id"])
+        archived = decode_chat_archive(row["payload"])
+        if anchor:
+            archived = [message for message in archived if (message[1], message[0]) < anchor]
+        collected = archived + collected
+
+    page = collected[-limit:] if limit else []
+    user_ids = sorted({user_id for _, _, user_id, _ in page})
+    users = {}
+    if user_ids:
+        placeholders = ", ".join("?" for _ in user_ids)
+        rows = await d1_rows(env, f"SELECT id, userid, nickname, email, bio FROM user WHERE id IN ({placeholders})", user_ids)
+        users = {row["id"]: build_user(row) for row in rows}
+    messages = [
+        {
+            "id": message_id,
+            "content": content,
+            "date": parse_db_datetime(date),
+            "study_id": study_id,
+            "user_id": user_id,
+            "user": users.get(user_id),
+        }
+        for message_id, date, user_id, content in page
+    ]
+    return messages, len(collected) > limit
+
+
+async def complete_chat_history(env, study_id, history, before_id=None, limit=CHAT_HISTORY_PAGE_SIZE):
+    if history["has_more"]:
+        return history
+    anchor = history["anchor"]
+    if anchor is None and before_id:
+        anchor = await fetch_chat_anchor(env, study_id, before_id)
+        if anchor is None:
+            return history
+    archived, has_more = await fetch_archived_chat_history(env, study_id, anchor, limit - len(history["messages"]))
+    if not archived:
+        return {**history, "has_more": has_more}
+    return {"messages": archived + history["messages"], "has_more": has_more, "anchor": None}
+
+
+async def load_chat_version(env, study_id):
+    row = await d1_first(env, "SELECT last_message_id FROM study WHERE id = ?", [study_id])
+    return int(row["last_message_id"] or 0) if row else 0
+
+
+def remember_chat_version(study_id, version):
+    cached = chat_version_cache.pop(study_id, None)
+    if cached:
+        version = max(version, cached[1])
+    elif len(chat_version_cache) >= CHAT_VERSION_CACHE_SIZE:
+        chat_version_cache.pop(next(iter(chat_version_cache)))
+    chat_version_cache[study_id] = (time.monotonic() + CHAT_VERSION_CACHE_SECONDS, version)
+    return version
+
+
+async def fetch_chat_version(env, study_id):
+    cached = chat_version_cache.get(study_id)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    return remember_chat_version(study_id, await load_chat_version(env, study_id))
+
+
+async def poll_chat_version(env, study_id, known_version, version):
+    deadline = time.monotonic() + CHAT_LONG_POLL_SECONDS
+    while version <= known_version:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        await asyncio.sleep(min(CHAT_LONG_POLL_INTERVAL, remaining))
+        version = await fetch_chat_version(env, study_id)
+    return version
+
+
+async def wait_for_chat_version(env, study_id, known_version, wait):
+    namespace = chat_room_namespace(env)
+    if wait and namespace is not None:
+        try:
+            version = await DurableChatRooms(namespace).wait(study_id, known_version, CHAT_LONG_POLL_SECONDS)
+            return remember_chat_version(study_id, int(version))
+        except Exception as error:
+            log_chat_failure("chat_wait_failed", study_id, error)
+    version = await fetch_chat_version(env, study_id)
+    if not wait:
+        return version
+    return await poll_chat_version(env, study_id, known_version, version)
+
+
+def chat_etag(study_id, version):
+    return f'W/"chat-{study_id}-{version}"'
+
+
+def parse_message_id(value):
+    value = (value or "").strip()
+    return int(value) if value.isdigit() else None
+
+
+async def fetch_chat_messages(env, study_id, limit=80, after_id=None):
+    return await d1_fetch(env, chat_messages_query(study_id, limit=limit, after_id=after_id))
 
 
 async def fetch_current_user(env, session_data):
@@ -579,22 +1042,99 @@ async def fetch_author_studies(env, user):
     return [build_study(row) for row in rows]
 
 
-async def sync_closed_state(env, study_id):
-    row = await d1_first(
+async def fetch_chat_inbox(env, user):
+    rows = await d1_rows(
         env,
         """
-        SELECT s.member_count, COUNT(e.id) AS approved_count
-        FROM study s
-        LEFT JOIN enrollment e ON e.study_id = s.id AND e.status = 1
-        WHERE s.id = ?
-        GROUP BY s.id, s.member_count
+        WITH accessible AS (
+            SELECT id AS study_id FROM study WHERE author_id = ? OR (author_id IS NULL AND writer = ?)
+            UNION
+            SELECT study_id FROM enrollment WHERE user_id = ? AND status = 1
+        )
+        SELECT s.*,
+               cm.id AS message_id, cm.content AS message_content, cm.date AS message_date,
+               cm.user_id AS message_user_id,
+               u.id AS user_id, u.userid AS user_userid, u.nickname AS user_nickname,
+               u.email AS user_email, u.bio AS user_bio
+        FROM accessible a
+        JOIN study s ON s.id = a.study_id
+        LEFT JOIN chat_message cm ON cm.id = s.last_message_id
+        LEFT JOIN user u ON u.id = cm.user_id
+        ORDER BY s.last_activity_at DESC, s.id DESC
         """,
-        [study_id],
+        [user["id"], user["nickname"], user["id"]],
     )
-    if not row:
-        return
-    should_close = int(row["approved_count"] or 0) >= int(row["member_count"])
-    await d1_execute(env, "UPDATE study SET is_closed = ? WHERE id = ?", [1 if should_close else 0, study_id])
+    studies = []
+    for row in rows:
+        study = build_study(row)
+        study["last_message"] = None
+        if row.get("message_id") is not None:
+            study["last_message"] = build_chat_message(
+                {
+                    **row,
+                    "id": row["message_id"],
+                    "content": row["message_content"],
+                    "date": row["message_date"],
+                    "study_id": row["id"],
+                }
+            )
+        studies.append(study)
+    return studies
+
+
+def build_random_probe_sql(draws):
+    return f"""
+        WITH bounds AS (SELECT MIN(id) AS low, MAX(id) AS high FROM study),
+             draws(fraction) AS (VALUES {", ".join(["(?)"] * draws)})
+        SELECT *
+        FROM study
+        WHERE id IN (
+            SELECT bounds.low + CAST((bounds.high - bounds.low + 1) * draws.fraction AS INTEGER)
+            FROM bounds, draws
+        )
+    """
+
+
+async def sample_random_studies(env, limit=HOME_PICK_COUNT, draws=HOME_SAMPLE_DRAWS, rounds=HOME_SAMPLE_ROUNDS):
+    picked = {}
+    for _ in range(rounds):
+        rows = await d1_rows(env, build_random_probe_sql(draws), [random.random() for _ in range(draws)])
+        for row in rows:
+            picked.setdefault(row["id"], row)
+        if len(picked) >= limit:
+            break
+
+    if len(picked) < limit:
+        excluded_sql = f"WHERE id NOT IN ({', '.join(['?'] * len(picked))})" if picked else ""
+        counted = await d1_first(env, f"SELECT COUNT(*) AS total FROM study {excluded_sql}", list(picked))
+        available = int(counted["total"]) if counted else 0
+        for _ in range(min(available, limit - len(picked))):
+            excluded_sql = f"WHERE id NOT IN ({', '.join(['?'] * len(picked))})" if picked else ""
+            row = await d1_first(
+                env,
+                f"SELECT * FROM study {excluded_sql} ORDER BY id LIMIT 1 OFFSET ?",
+                [*picked, random.randrange(available)],
+            )
+            picked[row["id"]] = row
+            available -= 1
+
+    studies = [build_study(row) for row in picked.values()]
+    random.shuffle(studies)
+    return studies[:limit]
+
+
+async def fetch_study_category_counts(env):
+    rows = await d1_rows(env, "SELECT category, total FROM study_category_count")
+    return {row["category"]: int(row["total"]) for row in rows}
+
+
+def sync_closed_state_query(study_id):
+    return D1Query("UPDATE study SET is_closed = approved_count >= member_count WHERE id = ?", [study_id])
+
+
+async def sync_closed_state(env, study_id):
+    query = sync_closed_state_query(study_id)
+    await d1_execute(env, query.sql, query.params)
 
 
 def url_for(endpoint, **values):
@@ -626,7 +1166,7 @@ class RequestContext:
         self.endpoint = endpoint
         self.route_params = route_params
         self.url = urlparse(request.url)
-        self.query = {key: values[0] for key, values in parse_qs(self.url.query).items()}
+        self.query = {key: values[0] for key, values in parse_qs(self.url.query, keep_blank_values=True).items()}
         self.secret = env.SECRET_KEY if hasattr(env, "SECRET_KEY") and env.SECRET_KEY else DEFAULT_SECRET
         cookies = parse_cookie_header(request.headers.get("Cookie"))
         self.session = unsign_session(cookies.get(SESSION_COOKIE_NAME), self.secret)
@@ -644,6 +1184,9 @@ class RequestContext:
             self.session["flashes"] = []
             self.mutated = True
 
+    def batch(self):
+        return D1Batch(self.env)
+
     def flash(self, message, category="message"):
         self.session.setdefault("flashes", []).append([category, message])
         self.mutated = True
@@ -739,8 +1282,7 @@ def ensure_path_int(route_params, key):
 
 
 async def handle_home(ctx):
-    rows = await d1_rows(ctx.env, "SELECT * FROM study ORDER BY RANDOM() LIMIT 4")
-    studies = [build_study(row) for row in rows]
+    studies = await sample_random_studies(ctx.env)
     return ctx.render("index.html", random_studies=studies)
 
 
@@ -835,32 +1377,88 @@ async def handle_signup(ctx):
 
 async def handle_study(ctx):
     page = int(ctx.query.get("page", "1") or "1")
+    cursor = ctx.query.get("cursor")
     keyword = normalize_text(ctx.query.get("keyword", ""))
     category = normalize_text(ctx.query.get("category", ""))
+    join_sql = ""
     where_clauses = []
     params = []
-    if keyword:
-        where_clauses.append("(title LIKE ? OR content LIKE ?)")
+    order_sql = "study.date DESC, study.id DESC"
+    if keyword and len(keyword) >= STUDY_SEARCH_MIN_FTS_LENGTH:
+        join_sql = "JOIN study_fts ON study_fts.rowid = study.id"
+        where_clauses.append("study_fts MATCH ?")
+        params.append(build_fts_phrase(keyword))
+        order_sql = f"study_fts.rank, {order_sql}"
+    elif keyword:
+        where_clauses.append("(study.title LIKE ? OR study.content LIKE ?)")
         like = f"%{keyword}%"
         params.extend([like, like])
     if category and category in CATEGORY_VALUES:
-        where_clauses.append("category = ?")
+        where_clauses.append("study.category = ?")
         params.append(category)
     else:
         category = ""
 
+    if cursor is not None:
+        return await study_cursor_page(ctx, join_sql, where_clauses, params, cursor)
+
     where_sql = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
-    count_row = await d1_first(ctx.env, f"SELECT COUNT(*) AS total FROM study {where_sql}", params)
-    total = int(count_row["total"] if count_row else 0)
-    per_page = 9
-    offset = (page - 1) * per_page
+    category_counts = await fetch_study_category_counts(ctx.env)
+    if keyword:
+        total = await get_cached_study_total(
+            ctx.env,
+            (keyword, category),
+            f"SELECT COUNT(*) AS total FROM study {join_sql} {where_sql}",
+            params,
+        )
+    elif category:
+        total = category_counts.get(category, 0)
+    else:
+        total = sum(category_counts.values())
+    offset = (page - 1) * STUDY_PAGE_SIZE
     rows = await d1_rows(
         ctx.env,
-        f"SELECT * FROM study {where_sql} ORDER BY date DESC, id DESC LIMIT ? OFFSET ?",
-        [*params, per_page, offset],
+        f"SELECT study.* FROM study {join_sql} {where_sql} ORDER BY {order_sql} LIMIT ? OFFSET ?",
+        [*params, STUDY_PAGE_SIZE, offset],
+    )
+    pagination = Pagination([build_study(row) for row in rows], page, STUDY_PAGE_SIZE, total)
+    return ctx.render(
+        "study.html",
+        pagination=pagination,
+        keyword=keyword,
+        category=category,
+        category_counts=category_counts,
+    )
+
+
+async def study_cursor_page(ctx, join_sql, where_clauses, params, cursor):
+    where_clauses = list(where_clauses)
+    params = list(params)
+    if cursor:
+        try:
+            date_text, study_id = decode_study_cursor(cursor)
+        except ValueError as error:
+            raise HTTPError(400, "잘못된 요청입니다.") from error
+        where_clauses.append("(study.date, study.id) < (?, ?)")
+        params.extend([date_text, study_id])
+
+    where_sql = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+    rows = await d1_rows(
+        ctx.env,
+        f"SELECT study.* FROM study {join_sql} {where_sql} ORDER BY study.date DESC, study.id DESC LIMIT ?",
+        [*params, STUDY_PAGE_SIZE + 1],
+    )
+    next_cursor = None
+    if len(rows) > STUDY_PAGE_SIZE:
+        rows = rows[:STUDY_PAGE_SIZE]
+        next_cursor = encode_study_cursor(rows[-1]["date"], rows[-1]["id"])
+    return ctx.json(
+        {
+            "ok": True,
+            "studies": [serialize_study(build_study(row)) for row in rows],
+            "next_cursor": next_cursor,
+        }
     )
-    pagination = Pagination([build_study(row) for row in rows], page, per_page, total)
-    return ctx.render("study.html", pagination=pagination, keyword=keyword, category=category)
 
 
 async def handle_studywrite(ctx):
@@ -880,8 +1478,10 @@ async def handle_studywrite(ctx):
         study_id = await d1_execute(
             ctx.env,
             """
-            INSERT INTO study (title, category, member_count, content, date, writer, author_id, chat_link, is_closed)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)
+            INSERT INTO study (
+                title, category, member_count, content, date, writer, author_id, chat_link, is_closed, last_activity_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?5)
             RETURNING id
             """,
             [
@@ -895,46 +1495,77 @@ async def handle_studywrite(ctx):
                 payload["chat_link"],
             ],
         )
+        invalidate_study_totals()
         ctx.flash("스터디 모집글이 등록되었습니다.", "success")
         return ctx.redirect(url_for("study_detail", study_id=study_id))
 
     return ctx.render("studywrite.html")
 
 
-async def load_study_bundle(ctx, study_id):
-    study = await fetch_study_by_id(ctx.env, study_id)
+def study_relation_query(ctx, study_id, name):
+    if name == "enrollments":
+        return study_enrollments_query([study_id])
+    if name == "chat_history":
+        return chat_history_query(study_id)
+    if name == "comments":
+        return study_comments_query(study_id)
+    if name == "liked_comments":
+        return liked_comments_query(study_id, ctx.current_user["id"]) if ctx.current_user else None
+    if name == "viewer_enrollment":
+        return enrollment_query(ctx.current_user["id"], study_id) if ctx.current_user else None
+    raise KeyError(f"Unknown study relation: {name}")
+
+
+async def load_study_bundle(ctx, study_id, *names, **queries):
+    relations = {name: study_relation_query(ctx, study_id, name) for name in names}
+    relations.update(queries)
+    batch = ctx.batch()
+    batch.add(study_by_id_query(study_id))
+    loaded_names = []
+    for name, query in relations.items():
+        if query is not None:
+            batch.add(query)
+            loaded_names.append(name)
+    study, *results = await batch.run()
     if not study:
         raise HTTPError(404, "스터디를 찾을 수 없습니다.")
-    study["enrollments"] = await fetch_study_enrollments(ctx.env, study_id)
-    study["chat_messages"] = await fetch_chat_messages(ctx.env, study_id, limit=80)
+    study.update(dict.fromkeys(relations))
+    study.update(zip(loaded_names, results))
     return study
 
 
 async def handle_study_detail(ctx):
     study_id = ensure_path_int(ctx.route_params, "study_id")
-    study = await load_study_bundle(ctx, study_id)
-    enrollment = None
-    if ctx.current_user:
-        enrollment = await fetch_enrollment(ctx.env, ctx.current_user["id"], study_id)
-    root_comments = await fetch_study_comments(ctx.env, study_id)
-    approved_count = approved_member_count(study)
+    study = await load_study_bundle(ctx, study_id, "comments", "liked_comments", "viewer_enrollment")
     return ctx.render(
         "study_detail.html",
         study=study,
-        enrollment=enrollment,
-        approved_count=approved_count,
-        root_comments=root_comments,
+        enrollment=study["viewer_enrollment"],
+        approved_count=approved_member_count(study),
+        root_comments=select_root_comments(mark_liked_comments(study["comments"], study["liked_comments"])),
         is_owner=is_study_owner(study, ctx.current_user),
         can_access_chat=can_access_study_chat(study, ctx.current_user),
     )
 
 
+async def check_chat_access(ctx, study_id, cached=True):
+    user_id = ctx.current_user["id"]
+    allowed = get_cached_chat_access(user_id, study_id) if cached else None
+    if allowed is None:
+        allowed = await d1_fetch(ctx.env, chat_access_query(ctx.current_user, study_id))
+        if allowed is None:
+            raise HTTPError(404, "스터디를 찾을 수 없습니다.")
+        remember_chat_access(user_id, study_id, allowed)
+    return allowed
+
+
 def can_access_study_chat(study, user):
     if not user:
         return False
     if is_study_owner(study, user):
         return True
-    return any(enrollment["user_id"] == user["id"] and enrollment["status"] == 1 for enrollment in study.get("enrollments", []))
+    enrollment = study.get("viewer_enrollment")
+    return bool(enrollment) and enrollment["status"] == 1
 
 
 async def handle_study_delete(ctx):
@@ -951,6 +1582,8 @@ async def handle_study_delete(ctx):
         ctx.flash("삭제 권한이 없습니다.", "error")
         return ctx.redirect(url_for("study_detail", study_id=study_id))
     await d1_execute(ctx.env, "DELETE FROM study WHERE id = ?", [study_id])
+    invalidate_study_totals()
+    await revoke_chat_access(ctx.env, study_id)
     ctx.flash("스터디가 삭제되었습니다.", "success")
     return ctx.redirect(url_for("study"))
 
@@ -995,6 +1628,7 @@ async def handle_study_edit(ctx):
             ],
         )
         await sync_closed_state(ctx.env, study_id)
+        invalidate_study_totals()
         ctx.flash("스터디가 수정되었습니다.", "success")
         return ctx.redirect(url_for("study_detail", study_id=study_id))
 
@@ -1071,18 +1705,9 @@ async def handle_comment_like(ctx):
     form = await ctx.get_form()
     await validate_csrf(ctx, form)
     comment_id = ensure_path_int(ctx.route_params, "comment_id")
-    comment = await d1_first(ctx.env, "SELECT id, study_id FROM comment WHERE id = ?", [comment_id])
+    comment = await toggle_comment_like(ctx.env, ctx.current_user["id"], comment_id)
     if not comment:
         raise HTTPError(404, "댓글을 찾을 수 없습니다.")
-    existing = await d1_first(
-        ctx.env,
-        "SELECT 1 AS present FROM comment_likes WHERE user_id = ? AND comment_id = ?",
-        [ctx.current_user["id"], comment_id],
-    )
-    if existing:
-        await d1_execute(ctx.env, "DELETE FROM comment_likes WHERE user_id = ? AND comment_id = ?", [ctx.current_user["id"], comment_id])
-    else:
-        await d1_execute(ctx.env, "INSERT INTO comment_likes (user_id, comment_id) VALUES (?, ?)", [ctx.current_user["id"], comment_id])
     return ctx.redirect(url_for("study_detail", study_id=comment["study_id"]))
 
 
@@ -1093,7 +1718,7 @@ async def handle_study_apply(ctx):
     form = await ctx.get_form()
     await validate_csrf(ctx, form)
     study_id = ensure_path_int(ctx.route_params, "study_id")
-    study = await load_study_bundle(ctx, study_id)
+    study = await load_study_bundle(ctx, study_id, "viewer_enrollment")
     if is_study_owner(study, ctx.current_user):
         ctx.flash("본인 스터디에는 신청할 수 없습니다.", "error")
         return ctx.redirect(url_for("study_detail", study_id=study_id))
@@ -1105,7 +1730,7 @@ async def handle_study_apply(ctx):
         ctx.flash("정원이 모두 차서 더 이상 신청할 수 없습니다.", "error")
         return ctx.redirect(url_for("study_detail", study_id=study_id))
 
-    existing = await fetch_enrollment(ctx.env, ctx.current_user["id"], study_id)
+    existing = study["viewer_enrollment"]
     if existing:
         messages = {
             0: "이미 신청한 스터디입니다. 승인 결과를 기다려주세요.",
@@ -1130,8 +1755,9 @@ async def handle_mypage(ctx):
         return redirect_response
 
     my_studies = await fetch_author_studies(ctx.env, ctx.current_user)
+    enrollments_by_study = await fetch_enrollments_by_study(ctx.env, [study["id"] for study in my_studies])
     for study in my_studies:
-        study["enrollments"] = await fetch_study_enrollments(ctx.env, study["id"])
+        study["enrollments"] = enrollments_by_study[study["id"]]
 
     enrollment_rows = await d1_rows(
         ctx.env,
@@ -1174,26 +1800,7 @@ async def handle_chats(ctx):
     if redirect_response:
         return redirect_response
 
-    owned_rows = await d1_rows(
-        ctx.env,
-        "SELECT id FROM study WHERE author_id = ? OR (author_id IS NULL AND writer = ?)",
-        [ctx.current_user["id"], ctx.current_user["nickname"]],
-    )
-    approved_rows = await d1_rows(
-        ctx.env,
-        "SELECT study_id AS id FROM enrollment WHERE user_id = ? AND status = 1",
-        [ctx.current_user["id"]],
-    )
-    study_ids = sorted({int(row["id"]) for row in owned_rows + approved_rows})
-    studies = []
-    for study_id in study_ids:
-        study = await fetch_study_by_id(ctx.env, study_id)
-        if not study:
-            continue
-        messages = await fetch_chat_messages(ctx.env, study_id, limit=None)
-        study["chat_messages"] = messages[-1:] if messages else []
-        studies.append(study)
-    studies.sort(key=lambda study: study["chat_messages"][-1]["date"] if study["chat_messages"] else study["date"], reverse=True)
+    studies = await fetch_chat_inbox(ctx.env, ctx.current_user)
     return ctx.render("chat_list.html", studies=studies, user=ctx.current_user)
 
 
@@ -1203,8 +1810,13 @@ async def handle_study_chat(ctx):
         return redirect_response
 
     study_id = ensure_path_int(ctx.route_params, "study_id")
-    study = await load_study_bundle(ctx, study_id)
-    if not can_access_study_chat(study, ctx.current_user):
+    if ctx.request.method == "POST":
+        allowed = await check_chat_access(ctx, study_id, cached=False)
+    else:
+        study = await load_study_bundle(ctx, study_id, "viewer_enrollment", "chat_history")
+        allowed = can_access_study_chat(study, ctx.current_user)
+        remember_chat_access(ctx.current_user["id"], study_id, allowed)
+    if not allowed:
         ctx.flash("승인된 참여자만 채팅방에 입장할 수 있습니다.", "error")
         return ctx.redirect(url_for("study_detail", study_id=study_id))
 
@@ -1229,6 +1841,7 @@ async def handle_study_chat(ctx):
             "INSERT INTO chat_message (content, date, study_id, user_id) VALUES (?, ?, ?, ?) RETURNING id",
             [content, now_iso(), study_id, ctx.current_user["id"]],
         )
+        remember_chat_version(study_id, message_id)
         message = {
             "id": message_id,
             "content": content,
@@ -1238,18 +1851,22 @@ async def handle_study_chat(ctx):
             "user": ctx.current_user,
         }
         payload = serialize_chat_message(message)
+        await publish_chat_message(ctx.env, study_id, payload)
         if is_json:
             return ctx.json({"ok": True, "message": payload})
         return ctx.redirect(url_for("study_chat", study_id=study_id))
 
-    messages = await fetch_chat_messages(ctx.env, study_id, limit=80)
+    history = await complete_chat_history(ctx.env, study_id, study["chat_history"])
     return ctx.render(
         "study_chat.html",
         study=study,
-        messages=messages,
+        messages=history["messages"],
+        has_older=history["has_more"],
+        approved_count=approved_member_count(study),
         user=ctx.current_user,
         is_owner=is_study_owner(study, ctx.current_user),
         chat_stream_url="",
+        chat_socket_url=url_for("study_chat_socket", study_id=study_id) if chat_room_namespace(ctx.env) else "",
         chat_poll_url=url_for("study_chat_messages", study_id=study_id),
     )
 
@@ -1259,13 +1876,49 @@ async def handle_study_chat_messages(ctx):
     if redirect_response:
         return redirect_response
     study_id = ensure_path_int(ctx.route_params, "study_id")
-    study = await load_study_bundle(ctx, study_id)
-    if not can_access_study_chat(study, ctx.current_user):
+    after_value = parse_message_id(ctx.query.get("after_id") or ctx.request.headers.get("Last-Event-ID"))
+    wait = ctx.query.get("wait") == "1"
+    allowed = await check_chat_access(ctx, study_id, cached=not wait)
+    if not allowed:
         raise HTTPError(403, "접근 권한이 없습니다.")
-    after_id = ctx.query.get("after_id")
-    after_value = int(after_id) if after_id and after_id.isdigit() else None
-    messages = await fetch_chat_messages(ctx.env, study_id, limit=50, after_id=after_value)
-    return ctx.json({"ok": True, "messages": [serialize_chat_message(message) for message in messages]})
+
+    before_value = parse_message_id(ctx.query.get("before_id"))
+    if before_value is not None:
+        history = await d1_fetch(ctx.env, chat_history_query(study_id, before_id=before_value))
+        history = await complete_chat_history(ctx.env, study_id, history, before_id=before_value)
+        return ctx.json(
+            {
+                "ok": True,
+                "messages": [serialize_chat_message(message) for message in history["messages"]],
+                "has_more": history["has_more"],
+            }
+        )
+
+    version = await wait_for_chat_version(ctx.env, study_id, after_value or 0, wait)
+    etag = chat_etag(study_id, version)
+    if after_value is not None:
+        unchanged = version <= after_value
+    else:
+        unchanged = ctx.request.headers.get("If-None-Match") == etag
+    if unchanged:
+        return ctx.finalize(Response("", status=304, headers={"ETag": etag}))
+
+    messages = await d1_fetch(ctx.env, chat_messages_query(study_id, limit=50, after_id=after_value))
+    response = ctx.json({"ok": True, "messages": [serialize_chat_message(message) for message in messages]})
+    response.headers["ETag"] = etag
+    return response
+
+
+async def handle_study_chat_socket(ctx):
+    if not ctx.current_user:
+        raise HTTPError(401, "로그인이 필요합니다.")
+    study_id = ensure_path_int(ctx.route_params, "study_id")
+    if (ctx.request.headers.get("Upgrade") or "").lower() != "websocket":
+        raise HTTPError(426, "WebSocket 연결이 필요합니다.")
+    allowed = await check_chat_access(ctx, study_id, cached=False)
+    if not allowed:
+        raise HTTPError(403, "접근 권한이 없습니다.")
+    return await chat_rooms(ctx.env).connect(ctx.request, study_id, ctx.current_user["id"])
 
 
 async def handle_update_profile(ctx):
@@ -1284,7 +1937,7 @@ async def handle_update_profile(ctx):
 
 
 async def handle_profile(ctx):
-    nickname = ctx.route_params["nickname"]
+    nickname = unquote(ctx.route_params["nickname"])
     target_user = await fetch_user_by_nickname(ctx.env, nickname)
     if not target_user:
         raise HTTPError(404, "사용자를 찾을 수 없습니다.")
@@ -1326,11 +1979,15 @@ async def handle_enrollment_action(ctx):
             await d1_execute(ctx.env, "UPDATE study SET is_closed = 1 WHERE id = ?", [study["id"]])
             ctx.flash("정원이 가득 차 더 이상 승인할 수 없습니다.", "error")
             return ctx.redirect(url_for("mypage"))
-        await d1_execute(ctx.env, "UPDATE enrollment SET status = 1 WHERE id = ?", [enrollment_id])
-        await sync_closed_state(ctx.env, study["id"])
+        batch = ctx.batch()
+        batch.add(D1Query("UPDATE enrollment SET status = 1 WHERE id = ?", [enrollment_id]))
+        batch.add(sync_closed_state_query(study["id"]))
+        await batch.run()
+        invalidate_chat_access(study["id"], enrollment["user_id"])
         ctx.flash("신청자를 승인했습니다.", "success")
     else:
         await d1_execute(ctx.env, "UPDATE enrollment SET status = 2 WHERE id = ?", [enrollment_id])
+        await revoke_chat_access(ctx.env, study["id"], enrollment["user_id"])
         ctx.flash("신청을 거절했습니다.", "success")
     return ctx.redirect(url_for("mypage"))
 
@@ -1374,6 +2031,7 @@ HANDLERS = {
     "chats": handle_chats,
     "study_chat": handle_study_chat,
     "study_chat_messages": handle_study_chat_messages,
+    "study_chat_socket": handle_study_chat_socket,
     "update_profile": handle_update_profile,
     "profile": handle_profile,
     "enrollment_action": handle_enrollment_action,
@@ -1387,6 +2045,174 @@ async def serve_static(env, request, path):
     return await env.ASSETS.fetch(target.toString())
 
 
+class LocalChatRooms:
+    def __init__(self):
+        self.rooms = {}
+
+    async def connect(self, request, study_id, user_id):
+        client, server = WebSocketPair.new().object_values()
+        server.accept()
+        self.subscribe(study_id, server, user_id)
+        unsubscribe = create_proxy(lambda event: self.unsubscribe(study_id, server))
+        server.addEventListener("close", unsubscribe)
+        server.addEventListener("error", unsubscribe)
+        return Response(None, status=101, web_socket=client)
+
+    def subscribe(self, study_id, socket, user_id=None):
+        self.rooms.setdefault(study_id, {})[socket] = user_id
+
+    def unsubscribe(self, study_id, socket):
+        sockets = self.rooms.get(study_id)
+        if sockets is None:
+            return
+        sockets.pop(socket, None)
+        if not sockets:
+            del self.rooms[study_id]
+
+    async def publish(self, study_id, data, message_id):
+        for socket in list(self.rooms.get(study_id, ())):
+            try:
+                socket.send(data)
+            except Exception:
+                self.unsubscribe(study_id, socket)
+
+    async def evict(self, study_id, user_id=None):
+        for socket, member_id in list(self.rooms.get(study_id, {}).items()):
+            if user_id is None or member_id == user_id:
+                self.unsubscribe(study_id, socket)
+                socket.close(1008, "chat access revoked")
+
+
+class DurableChatRooms:
+    def __init__(self, namespace):
+        self.namespace = namespace
+
+    def room(self, study_id):
+        return self.namespace.get(self.namespace.idFromName(str(study_id)))
+
+    async def connect(self, request, study_id, user_id):
+        return await self.room(study_id).fetch(Request.new(f"https://chat-room/{study_id}?user_id={user_id}", request))
+
+    async def publish(self, study_id, data, message_id):
+        await self.room(study_id).publish(data, message_id)
+
+    async def wait(self, study_id, after_id, timeout):
+        return await self.room(study_id).wait_for_message(study_id, after_id, timeout)
+
+    async def evict(self, study_id, user_id=None):
+        if user_id is None:
+            await self.room(study_id).evict_all()
+        else:
+            await self.room(study_id).evict_member(user_id)
+
+
+local_chat_rooms = LocalChatRooms()
+
+
+def server_timing_enabled(env):
+    return str(getattr(env, "SERVER_TIMING", "1")) != "0"
+
+
+def chat_room_namespace(env):
+    return getattr(env, "CHAT_ROOM", None)
+
+
+def chat_rooms(env):
+    namespace = chat_room_namespace(env)
+    return DurableChatRooms(namespace) if namespace is not None else local_chat_rooms
+
+
+def log_chat_failure(event, study_id, error, **fields):
+    chat_logger.warning(
+        json.dumps({"event": event, "study_id": study_id, **fields, "error": repr(error)}, ensure_ascii=False)
+    )
+
+
+async def publish_chat_message(env, study_id, payload):
+    data = json.dumps(payload, ensure_ascii=False)
+    try:
+        await chat_rooms(env).publish(study_id, data, payload["id"])
+    except Exception as error:
+        log_chat_failure("chat_publish_failed", study_id, error, message_id=payload.get("id"))
+
+
+async def revoke_chat_access(env, study_id, user_id=None):
+    invalidate_chat_access(study_id, user_id)
+    try:
+        await chat_rooms(env).evict(study_id, user_id)
+    except Exception as error:
+        log_chat_failure("chat_evict_failed", study_id, error, user_id=user_id)
+
+
+def chat_member_tag(user_id):
+    return f"user:{user_id}"
+
+
+class ChatRoom(DurableObject):
+    def __init__(self, ctx, env):
+        super().__init__(ctx, env)
+        self.last_message_id = 0
+        self.checked_at = None
+        self.loading = None
+        self.waiters = set()
+
+    async def fetch(self, request):
+        if (request.headers.get("Upgrade") or "").lower() != "websocket":
+            return Response("WebSocket 연결이 필요합니다.", status=426)
+        user_id = parse_qs(urlparse(request.url).query).get("user_id", [""])[0]
+        client, server = WebSocketPair.new().object_values()
+        self.ctx.acceptWebSocket(server, [chat_member_tag(user_id)])
+        return Response(None, status=101, web_socket=client)
+
+    async def evict_member(self, user_id):
+        for socket in self.ctx.getWebSockets(chat_member_tag(user_id)):
+            socket.close(1008, "chat access revoked")
+
+    async def evict_all(self):
+        for socket in self.ctx.getWebSockets():
+            socket.close(1008, "chat access revoked")
+
+    async def publish(self, data, message_id):
+        self.last_message_id = max(self.last_message_id, message_id)
+        for waiter in self.waiters:
+            if not waiter.done():
+                waiter.set_result(self.last_message_id)
+        for socket in self.ctx.getWebSockets():
+            try:
+                socket.send(data)
+            except Exception:
+                socket.close(1011, "send failed")
+
+    async def current_message_id(self, study_id):
+        if self.checked_at is not None and time.monotonic() - self.checked_at < CHAT_LONG_POLL_SECONDS:
+            return self.last_message_id
+        if self.loading is None:
+            self.loading = asyncio.ensure_future(load_chat_version(self.env, study_id))
+            self.loading.add_done_callback(lambda _: setattr(self, "loading", None))
+        version = await asyncio.shield(self.loading)
+        self.checked_at = time.monotonic()
+        self.last_message_id = max(self.last_message_id, version)
+        return self.last_message_id
+
+    async def wait_for_message(self, study_id, after_id, timeout):
+        if await self.current_message_id(study_id) > after_id:
+            return self.last_message_id
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.add(waiter)
+        try:
+            return await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            return self.last_message_id
+        finally:
+            self.waiters.discard(waiter)
+
+    async def webSocketMessage(self, socket, message):
+        pass
+
+    async def webSocketClose(self, socket, code, reason, was_clean):
+        socket.close(code, reason)
+
+
 def match_route(path, method):
     for endpoint, methods, pattern in ROUTE_PATTERNS:
         if method not in methods:
@@ -1409,6 +2235,20 @@ class Default(WorkerEntrypoint):
         if endpoint is None:
             return Response("Not Found", status=404)
 
+        started = time.perf_counter()
+        stats = QueryStats()
+        token = request_query_stats.set(stats)
+        try:
+            response = await self.dispatch(request, endpoint, route_params)
+        finally:
+            request_query_stats.reset(token)
+        elapsed = time.perf_counter() - started
+        if server_timing_enabled(self.env) and response.status != 101:
+            response.headers["Server-Timing"] = stats.server_timing(elapsed)
+        print(stats.log_line(request.method, path, endpoint, response.status, elapsed))
+        return response
+
+    async def dispatch(self, request, endpoint, route_params):
         ctx = RequestContext(self.env, request, endpoint, route_params)
         await ctx.load_user()
         try:
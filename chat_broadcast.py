@@ -0,0 +1,234 @@
+import asyncio
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+CHAT_EVENT_POLL_SECONDS = 0.2
+CHAT_EVENT_RETENTION_SECONDS = 60
+CHAT_SUBSCRIBER_QUEUE_SIZE = 100
+CHAT_OVERFLOW_POLICIES = ("drop", "evict")
+CHAT_SUBSCRIBER_EVICTED = object()
+CHAT_POLLER_JOIN_SECONDS = 2
+
+CHAT_EVENT_DDL = """
+CREATE TABLE IF NOT EXISTS chat_event (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    study_id INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL
+)
+"""
+
+logger = logging.getLogger("studymate.chat")
+
+
+class ChatSubscriber(queue.Queue):
+    def __init__(self, maxsize=CHAT_SUBSCRIBER_QUEUE_SIZE):
+        super().__init__(maxsize)
+        self.evicted = False
+
+    def evict(self):
+        with self.mutex:
+            self.evicted = True
+            self.queue.clear()
+            self.queue.append(CHAT_SUBSCRIBER_EVICTED)
+            self.not_empty.notify()
+
+
+class AsyncChatSubscriber(ChatSubscriber):
+    def __init__(self, loop, maxsize=CHAT_SUBSCRIBER_QUEUE_SIZE):
+        super().__init__(maxsize)
+        self.loop = loop
+        self.ready = asyncio.Event()
+
+    def put_nowait(self, payload):
+        super().put_nowait(payload)
+        self.wake()
+
+    def evict(self):
+        super().evict()
+        self.wake()
+
+    def wake(self):
+        self.loop.call_soon_threadsafe(self.ready.set)
+
+    async def receive(self):
+        while True:
+            try:
+                return self.get_nowait()
+            except queue.Empty:
+                self.ready.clear()
+                if self.empty():
+                    await self.ready.wait()
+
+
+class LocalChatBroadcast:
+    def __init__(self, queue_size=CHAT_SUBSCRIBER_QUEUE_SIZE, overflow="evict"):
+        if overflow not in CHAT_OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown chat overflow policy: {overflow}")
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.subscribers = defaultdict(set)
+        self.stats = {"dropped_messages": 0, "evicted_subscribers": 0}
+        self.lock = threading.Lock()
+
+    def subscribe(self, study_id, subscriber=None):
+        if subscriber is None:
+            subscriber = ChatSubscriber(self.queue_size)
+        with self.lock:
+            self.subscribers[study_id].add(subscriber)
+        return subscriber
+
+    def subscribe_async(self, study_id, loop):
+        return self.subscribe(study_id, AsyncChatSubscriber(loop, self.queue_size))
+
+    def unsubscribe(self, study_id, subscriber):
+        with self.lock:
+            subscribers = self.subscribers.get(study_id)
+            if subscribers is None:
+                return
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self.subscribers[study_id]
+
+    def has_subscribers(self):
+        return bool(self.subscribers)
+
+    def publish(self, study_id, payload):
+        self.deliver(study_id, payload)
+
+    def deliver(self, study_id, payload):
+        with self.lock:
+            subscribers = list(self.subscribers.get(study_id, ()))
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(payload)
+            except queue.Full:
+                self.handle_overflow(study_id, subscriber)
+            except Exception:
+                self.unsubscribe(study_id, subscriber)
+
+    def handle_overflow(self, study_id, subscriber):
+        if self.overflow == "drop":
+            with self.lock:
+                self.stats["dropped_messages"] += 1
+            return
+        self.unsubscribe(study_id, subscriber)
+        with self.lock:
+            self.stats["evicted_subscribers"] += 1
+        try:
+            subscriber.evict()
+        except Exception:
+            pass
+
+
+class SQLiteChatBroadcast(LocalChatBroadcast):
+    def __init__(
+        self,
+        path,
+        poll_seconds=CHAT_EVENT_POLL_SECONDS,
+        retention_seconds=CHAT_EVENT_RETENTION_SECONDS,
+        **options,
+    ):
+        super().__init__(**options)
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self.retention_seconds = retention_seconds
+        self.poller = None
+        self.stopping = threading.Event()
+        connection = self.connect()
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(CHAT_EVENT_DDL)
+        finally:
+            connection.close()
+
+    def connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def subscribe(self, study_id, subscriber=None):
+        subscriber = super().subscribe(study_id, subscriber)
+        self.start_poller()
+        return subscriber
+
+    def publish(self, study_id, payload):
+        now = time.time()
+        connection = self.connect()
+        try:
+            with connection:
+                connection.execute(
+                    "INSERT INTO chat_event (study_id, payload, created_at) VALUES (?, ?, ?)",
+                    (study_id, json.dumps(payload, ensure_ascii=False), now),
+                )
+                connection.execute("DELETE FROM chat_event WHERE created_at < ?", (now - self.retention_seconds,))
+        finally:
+            connection.close()
+
+    def latest_event_id(self, connection):
+        return connection.execute("SELECT COALESCE(MAX(id), 0) FROM chat_event").fetchone()[0]
+
+    def start_poller(self):
+        with self.lock:
+            if self.poller is not None or self.stopping.is_set():
+                return
+            connection = self.connect()
+            try:
+                last_event_id = self.latest_event_id(connection)
+            finally:
+                connection.close()
+            self.poller = threading.Thread(
+                target=self.poll_events, args=(last_event_id,), name="chat-broadcast", daemon=True
+            )
+        self.poller.start()
+
+    def fetch_events(self, connection, last_event_id):
+        return connection.execute(
+            "SELECT id, study_id, payload FROM chat_event WHERE id > ? ORDER BY id",
+            (last_event_id,),
+        ).fetchall()
+
+    def poll_events(self, last_event_id):
+        connection = None
+        try:
+            while not self.stopping.wait(self.poll_seconds):
+                try:
+                    if connection is None:
+                        connection = self.connect()
+                    if not self.has_subscribers():
+                        last_event_id = self.latest_event_id(connection)
+                        continue
+                    for event_id, study_id, payload in self.fetch_events(connection, last_event_id):
+                        last_event_id = event_id
+                        self.deliver(study_id, json.loads(payload))
+                except Exception:
+                    logger.exception("Chat broadcast poll failed; reconnecting")
+                    if connection is not None:
+                        connection.close()
+                        connection = None
+        finally:
+            if connection is not None:
+                connection.close()
+
+    def close(self):
+        self.stopping.set()
+        with self.lock:
+            poller, self.poller = self.poller, None
+        if poller is not None:
+            poller.join(CHAT_POLLER_JOIN_SECONDS)
+
+
+def create_chat_broadcast(config):
+    backend = config.get("CHAT_BROADCAST_BACKEND", "local")
+    options = {
+        "queue_size": config.get("CHAT_SUBSCRIBER_QUEUE_SIZE", CHAT_SUBSCRIBER_QUEUE_SIZE),
+        "overflow": config.get("CHAT_SUBSCRIBER_OVERFLOW", "evict"),
+    }
+    if backend == "local":
+        return LocalChatBroadcast(**options)
+    if backend == "sqlite":
+        return SQLiteChatBroadcast(config["CHAT_BROADCAST_PATH"], **options)
+    raise ValueError(f"Unknown chat broadcast backend: {backend}")
@@ -0,0 +1,94 @@
+import argparse
+import base64
+import json
+import sqlite3
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from export_sqlite_to_d1 import quote_sql
+
+
+DEFAULT_RETENTION_DAYS = 180
+ARCHIVE_CHUNK_SIZE = 200
+
+
+def get_kst_now():
+    return datetime.utcnow() + timedelta(hours=9)
+
+
+def encode_archive_payload(messages):
+    raw = json.dumps(messages, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.b64encode(zlib.compress(raw, 9)).decode("ascii")
+
+
+def collect_archive_chunks(cursor, study_id, last_message_id, cutoff):
+    rows = cursor.execute(
+        """
+        SELECT id, date, user_id, content
+        FROM chat_message
+        WHERE study_id = ? AND date < ? AND id <> ?
+        ORDER BY date ASC, id ASC
+        """,
+        (study_id, cutoff, last_message_id or 0),
+    ).fetchall()
+    for start in range(0, len(rows), ARCHIVE_CHUNK_SIZE):
+        chunk = rows[start : start + ARCHIVE_CHUNK_SIZE]
+        yield {
+            "study_id": study_id,
+            "first_message_id": min(row[0] for row in chunk),
+            "last_message_id": max(row[0] for row in chunk),
+            "first_date": chunk[0][1],
+            "last_date": chunk[-1][1],
+            "message_count": len(chunk),
+            "payload": encode_archive_payload([list(row) for row in chunk]),
+            "message_ids": [row[0] for row in chunk],
+        }
+
+
+def archive_statements(chunk):
+    columns = ["study_id", "first_message_id", "last_message_id", "first_date", "last_date", "message_count", "payload"]
+    values = ", ".join(quote_sql(chunk[column]) for column in columns)
+    ids = ", ".join(str(message_id) for message_id in chunk["message_ids"])
+    return [
+        f"INSERT INTO chat_archive ({', '.join(columns)}) VALUES ({values});",
+        f"DELETE FROM chat_message WHERE study_id = {chunk['study_id']} AND id IN ({ids});",
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move old chat messages into the compressed chat_archive table.")
+    parser.add_argument("db_path", help="SQLite database path")
+    parser.add_argument("--days", type=int, default=DEFAULT_RETENTION_DAYS, help="keep messages newer than this many days")
+    parser.add_argument("--sql", action="store_true", help="print D1 statements instead of changing the database")
+    args = parser.parse_args()
+
+    db_path = Path(args.db_path).resolve()
+    if not db_path.exists():
+        print(f"Database not found: {db_path}")
+        raise SystemExit(1)
+
+    cutoff = (get_kst_now() - timedelta(days=args.days)).strftime("%Y-%m-%d")
+    connection = sqlite3.connect(str(db_path))
+    cursor = connection.cursor()
+    studies = cursor.execute("SELECT id, last_message_id FROM study ORDER BY id").fetchall()
+
+    archived = 0
+    for study_id, last_message_id in studies:
+        for chunk in collect_archive_chunks(cursor, study_id, last_message_id, cutoff):
+            for statement in archive_statements(chunk):
+                if args.sql:
+                    print(statement)
+                else:
+                    cursor.execute(statement)
+            archived += chunk["message_count"]
+        if not args.sql:
+            connection.commit()
+
+    connection.close()
+    if not args.sql:
+        print(f"Archived {archived} chat messages older than {cutoff}.")
+
+
+if __name__ == "__main__":
+    main()
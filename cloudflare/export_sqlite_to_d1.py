@@ -2,8 +2,10 @@ import sqlite3
 import sys
 from pathlib import Path
 
+from reconcile_counters import reconcile_statements
 
-TABLES = ["user", "study", "enrollment", "comment", "comment_likes", "chat_message"]
+
+TABLES = ["user", "study", "enrollment", "comment", "comment_likes", "chat_message", "chat_archive"]
 
 
 def quote_sql(value):
@@ -43,10 +45,16 @@ def main():
     connection = sqlite3.connect(str(db_path))
     cursor = connection.cursor()
 
+    existing_tables = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
     print("PRAGMA foreign_keys = OFF;")
     for table in TABLES:
+        if table not in existing_tables:
+            continue
         for statement in export_table(cursor, table):
             print(statement)
+    for statement in reconcile_statements():
+        print(statement)
     print("PRAGMA foreign_keys = ON;")
 
     connection.close()
@@ -0,0 +1,20 @@
+ALTER TABLE study ADD COLUMN last_message_id INTEGER;
+ALTER TABLE study ADD COLUMN last_message_at TEXT;
+ALTER TABLE study ADD COLUMN message_count INTEGER NOT NULL DEFAULT 0;
+
+UPDATE study
+SET last_message_id = (
+        SELECT cm.id FROM chat_message cm
+        WHERE cm.study_id = study.id
+        ORDER BY cm.date DESC, cm.id DESC
+        LIMIT 1
+    ),
+    last_message_at = (
+        SELECT cm.date FROM chat_message cm
+        WHERE cm.study_id = study.id
+        ORDER BY cm.date DESC, cm.id DESC
+        LIMIT 1
+    ),
+    message_count = (SELECT COUNT(*) FROM chat_message cm WHERE cm.study_id = study.id);
+
+CREATE INDEX IF NOT EXISTS ix_study_last_message_at ON study(last_message_at DESC);
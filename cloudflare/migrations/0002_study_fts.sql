@@ -0,0 +1,22 @@
+CREATE VIRTUAL TABLE IF NOT EXISTS study_fts USING fts5(
+    title,
+    content,
+    content='study',
+    content_rowid='id',
+    tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS study_fts_after_insert AFTER INSERT ON study BEGIN
+    INSERT INTO study_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS study_fts_after_delete AFTER DELETE ON study BEGIN
+    INSERT INTO study_fts (study_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS study_fts_after_update AFTER UPDATE OF title, content ON study BEGIN
+    INSERT INTO study_fts (study_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    INSERT INTO study_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+
+INSERT INTO study_fts (study_fts) VALUES ('rebuild');
@@ -0,0 +1,8 @@
+CREATE TABLE IF NOT EXISTS study_category_count (
+    category TEXT PRIMARY KEY,
+    total INTEGER NOT NULL DEFAULT 0
+) STRICT;
+
+DELETE FROM study_category_count;
+INSERT INTO study_category_count (category, total)
+SELECT category, COUNT(*) FROM study GROUP BY category;
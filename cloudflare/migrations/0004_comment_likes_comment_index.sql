@@ -0,0 +1 @@
+CREATE INDEX IF NOT EXISTS ix_comment_likes_comment ON comment_likes(comment_id);
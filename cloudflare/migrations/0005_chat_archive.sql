@@ -0,0 +1,13 @@
+CREATE TABLE IF NOT EXISTS chat_archive (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    study_id INTEGER NOT NULL,
+    first_message_id INTEGER NOT NULL,
+    last_message_id INTEGER NOT NULL,
+    first_date TEXT NOT NULL,
+    last_date TEXT NOT NULL,
+    message_count INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    FOREIGN KEY (study_id) REFERENCES study(id) ON DELETE CASCADE
+) STRICT;
+
+CREATE INDEX IF NOT EXISTS ix_chat_archive_study_first ON chat_archive(study_id, first_date, id);
@@ -0,0 +1,12 @@
+ALTER TABLE comment ADD COLUMN like_count INTEGER NOT NULL DEFAULT 0;
+
+UPDATE comment
+SET like_count = (SELECT COUNT(*) FROM comment_likes cl WHERE cl.comment_id = comment.id);
+
+CREATE TRIGGER IF NOT EXISTS comment_likes_after_insert AFTER INSERT ON comment_likes BEGIN
+    UPDATE comment SET like_count = like_count + 1 WHERE id = new.comment_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS comment_likes_after_delete AFTER DELETE ON comment_likes BEGIN
+    UPDATE comment SET like_count = like_count - 1 WHERE id = old.comment_id;
+END;
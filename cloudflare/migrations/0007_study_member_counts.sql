@@ -0,0 +1,31 @@
+ALTER TABLE study ADD COLUMN approved_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE study ADD COLUMN pending_count INTEGER NOT NULL DEFAULT 0;
+
+UPDATE study
+SET approved_count = (SELECT COUNT(*) FROM enrollment e WHERE e.study_id = study.id AND e.status = 1),
+    pending_count = (SELECT COUNT(*) FROM enrollment e WHERE e.study_id = study.id AND e.status = 0);
+
+CREATE TRIGGER IF NOT EXISTS enrollment_after_insert AFTER INSERT ON enrollment BEGIN
+    UPDATE study
+    SET approved_count = approved_count + (new.status = 1),
+        pending_count = pending_count + (new.status = 0)
+    WHERE id = new.study_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS enrollment_after_update AFTER UPDATE OF status, study_id ON enrollment BEGIN
+    UPDATE study
+    SET approved_count = approved_count - (old.status = 1),
+        pending_count = pending_count - (old.status = 0)
+    WHERE id = old.study_id;
+    UPDATE study
+    SET approved_count = approved_count + (new.status = 1),
+        pending_count = pending_count + (new.status = 0)
+    WHERE id = new.study_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS enrollment_after_delete AFTER DELETE ON enrollment BEGIN
+    UPDATE study
+    SET approved_count = approved_count - (old.status = 1),
+        pending_count = pending_count - (old.status = 0)
+    WHERE id = old.study_id;
+END;
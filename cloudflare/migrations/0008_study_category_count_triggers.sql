@@ -0,0 +1,19 @@
+CREATE TRIGGER IF NOT EXISTS study_category_after_insert AFTER INSERT ON study BEGIN
+    INSERT INTO study_category_count (category, total) VALUES (new.category, 1)
+    ON CONFLICT (category) DO UPDATE SET total = total + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS study_category_after_update AFTER UPDATE OF category ON study
+WHEN old.category IS NOT new.category BEGIN
+    UPDATE study_category_count SET total = total - 1 WHERE category = old.category;
+    INSERT INTO study_category_count (category, total) VALUES (new.category, 1)
+    ON CONFLICT (category) DO UPDATE SET total = total + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS study_category_after_delete AFTER DELETE ON study BEGIN
+    UPDATE study_category_count SET total = total - 1 WHERE category = old.category;
+END;
+
+DELETE FROM study_category_count;
+INSERT INTO study_category_count (category, total)
+SELECT category, COUNT(*) FROM study GROUP BY category;
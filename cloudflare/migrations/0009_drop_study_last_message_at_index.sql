@@ -0,0 +1 @@
+DROP INDEX IF EXISTS ix_study_last_message_at;
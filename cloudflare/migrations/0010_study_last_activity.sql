@@ -0,0 +1,14 @@
+ALTER TABLE study ADD COLUMN last_activity_at TEXT NOT NULL DEFAULT '';
+
+UPDATE study SET last_activity_at = MAX(date, COALESCE(last_message_at, date));
+
+CREATE INDEX IF NOT EXISTS ix_study_last_activity ON study(last_activity_at, id);
+
+CREATE TRIGGER IF NOT EXISTS chat_message_after_insert AFTER INSERT ON chat_message BEGIN
+    UPDATE study
+    SET message_count = message_count + 1,
+        last_message_at = CASE WHEN COALESCE(last_message_id, 0) < new.id THEN new.date ELSE last_message_at END,
+        last_activity_at = MAX(last_activity_at, new.date),
+        last_message_id = MAX(COALESCE(last_message_id, 0), new.id)
+    WHERE id = new.study_id;
+END;
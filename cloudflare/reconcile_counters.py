@@ -0,0 +1,74 @@
+import argparse
+import sqlite3
+from pathlib import Path
+
+
+COUNTERS = [
+    (
+        "study",
+        "approved_count",
+        "SELECT COUNT(*) FROM enrollment WHERE enrollment.study_id = study.id AND enrollment.status = 1",
+    ),
+    (
+        "study",
+        "pending_count",
+        "SELECT COUNT(*) FROM enrollment WHERE enrollment.study_id = study.id AND enrollment.status = 0",
+    ),
+    (
+        "study",
+        "message_count",
+        "SELECT (SELECT COUNT(*) FROM chat_message WHERE chat_message.study_id = study.id)"
+        " + (SELECT COALESCE(SUM(chat_archive.message_count), 0) FROM chat_archive WHERE chat_archive.study_id = study.id)",
+    ),
+    (
+        "comment",
+        "like_count",
+        "SELECT COUNT(*) FROM comment_likes WHERE comment_likes.comment_id = comment.id",
+    ),
+]
+CATEGORY_COUNT_REBUILD = [
+    "DELETE FROM study_category_count;",
+    "INSERT INTO study_category_count (category, total) SELECT category, COUNT(*) FROM study GROUP BY category;",
+]
+
+
+def reconcile_statement(table_name, column_name, expected):
+    return f"UPDATE {table_name} SET {column_name} = ({expected}) WHERE {column_name} <> ({expected});"
+
+
+def reconcile_statements():
+    return [reconcile_statement(*counter) for counter in COUNTERS] + CATEGORY_COUNT_REBUILD
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recount the trigger-maintained counter columns from their source rows.")
+    parser.add_argument("db_path", nargs="?", help="SQLite database path")
+    parser.add_argument("--sql", action="store_true", help="print D1 statements instead of changing the database")
+    args = parser.parse_args()
+
+    if args.sql:
+        for statement in reconcile_statements():
+            print(statement)
+        return
+
+    if not args.db_path:
+        parser.error("db_path is required unless --sql is given")
+    db_path = Path(args.db_path).resolve()
+    if not db_path.exists():
+        print(f"Database not found: {db_path}")
+        raise SystemExit(1)
+
+    connection = sqlite3.connect(str(db_path))
+    cursor = connection.cursor()
+    for table_name, column_name, expected in COUNTERS:
+        fixed = cursor.execute(reconcile_statement(table_name, column_name, expected)).rowcount
+        print(f"{table_name}.{column_name}: fixed {fixed} rows")
+    for statement in CATEGORY_COUNT_REBUILD:
+        rebuilt = cursor.execute(statement).rowcount
+    print(f"study_category_count: rebuilt {rebuilt} categories")
+    connection.commit()
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
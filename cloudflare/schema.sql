@@ -20,9 +20,20 @@ CREATE TABLE IF NOT EXISTS study (
     author_id INTEGER,
     chat_link TEXT,
     is_closed INTEGER NOT NULL DEFAULT 0,
+    last_message_id INTEGER,
+    last_message_at TEXT,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    last_activity_at TEXT NOT NULL,
+    approved_count INTEGER NOT NULL DEFAULT 0,
+    pending_count INTEGER NOT NULL DEFAULT 0,
     FOREIGN KEY (author_id) REFERENCES user(id) ON DELETE SET NULL
 ) STRICT;
 
+CREATE TABLE IF NOT EXISTS study_category_count (
+    category TEXT PRIMARY KEY,
+    total INTEGER NOT NULL DEFAULT 0
+) STRICT;
+
 CREATE TABLE IF NOT EXISTS enrollment (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     user_id INTEGER NOT NULL,
@@ -42,6 +53,7 @@ CREATE TABLE IF NOT EXISTS comment (
     author_id INTEGER,
     study_id INTEGER NOT NULL,
     parent_id INTEGER,
+    like_count INTEGER NOT NULL DEFAULT 0,
     FOREIGN KEY (author_id) REFERENCES user(id) ON DELETE SET NULL,
     FOREIGN KEY (study_id) REFERENCES study(id) ON DELETE CASCADE,
     FOREIGN KEY (parent_id) REFERENCES comment(id) ON DELETE CASCADE
@@ -65,9 +77,103 @@ CREATE TABLE IF NOT EXISTS chat_message (
     FOREIGN KEY (user_id) REFERENCES user(id) ON DELETE CASCADE
 ) STRICT;
 
+CREATE TABLE IF NOT EXISTS chat_archive (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    study_id INTEGER NOT NULL,
+    first_message_id INTEGER NOT NULL,
+    last_message_id INTEGER NOT NULL,
+    first_date TEXT NOT NULL,
+    last_date TEXT NOT NULL,
+    message_count INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    FOREIGN KEY (study_id) REFERENCES study(id) ON DELETE CASCADE
+) STRICT;
+
 CREATE INDEX IF NOT EXISTS ix_study_author_id ON study(author_id);
 CREATE INDEX IF NOT EXISTS ix_study_date ON study(date DESC);
+CREATE INDEX IF NOT EXISTS ix_study_last_activity ON study(last_activity_at, id);
 CREATE INDEX IF NOT EXISTS ix_enrollment_study_status ON enrollment(study_id, status);
 CREATE INDEX IF NOT EXISTS ix_enrollment_user_date ON enrollment(user_id, date DESC);
+CREATE INDEX IF NOT EXISTS ix_comment_likes_comment ON comment_likes(comment_id);
 CREATE INDEX IF NOT EXISTS ix_comment_study_parent ON comment(study_id, parent_id, date ASC);
-CREATE INDEX IF NOT EXISTS ix_chat_message_study_date ON chat_message(study_id, date ASC, id ASC);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS ix_chat_message_study_date ON chat_message(study_id, date ASC, id ASC);
+CREATE INDEX IF NOT EXISTS ix_chat_archive_study_first ON chat_archive(study_id, first_date, id);
+
+CREATE TRIGGER IF NOT EXISTS study_category_after_insert AFTER INSERT ON study BEGIN
+    INSERT INTO study_category_count (category, total) VALUES (new.category, 1)
+    ON CONFLICT (category) DO UPDATE SET total = total + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS study_category_after_update AFTER UPDATE OF category ON study
+WHEN old.category IS NOT new.category BEGIN
+    UPDATE study_category_count SET total = total - 1 WHERE category = old.category;
+    INSERT INTO study_category_count (category, total) VALUES (new.category, 1)
+    ON CONFLICT (category) DO UPDATE SET total = total + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS study_category_after_delete AFTER DELETE ON study BEGIN
+    UPDATE study_category_count SET total = total - 1 WHERE category = old.category;
+END;
+
+CREATE TRIGGER IF NOT EXISTS enrollment_after_insert AFTER INSERT ON enrollment BEGIN
+    UPDATE study
+    SET approved_count = approved_count + (new.status = 1),
+        pending_count = pending_count + (new.status = 0)
+    WHERE id = new.study_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS enrollment_after_update AFTER UPDATE OF status, study_id ON enrollment BEGIN
+    UPDATE study
+    SET approved_count = approved_count - (old.status = 1),
+        pending_count = pending_count - (old.status = 0)
+    WHERE id = old.study_id;
+    UPDATE study
+    SET approved_count = approved_count + (new.status = 1),
+        pending_count = pending_count + (new.status = 0)
+    WHERE id = new.study_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS enrollment_after_delete AFTER DELETE ON enrollment BEGIN
+    UPDATE study
+    SET approved_count = approved_count - (old.status = 1),
+        pending_count = pending_count - (old.status = 0)
+    WHERE id = old.study_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS chat_message_after_insert AFTER INSERT ON chat_message BEGIN
+    UPDATE study
+    SET message_count = message_count + 1,
+        last_message_at = CASE WHEN COALESCE(last_message_id, 0) < new.id THEN new.date ELSE last_message_at END,
+        last_activity_at = MAX(last_activity_at, new.date),
+        last_message_id = MAX(COALESCE(last_message_id, 0), new.id)
+    WHERE id = new.study_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS comment_likes_after_insert AFTER INSERT ON comment_likes BEGIN
+    UPDATE comment SET like_count = like_count + 1 WHERE id = new.comment_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS comment_likes_after_delete AFTER DELETE ON comment_likes BEGIN
+    UPDATE comment SET like_count = like_count - 1 WHERE id = old.comment_id;
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS study_fts USING fts5(
+    title,
+    content,
+    content='study',
+    content_rowid='id',
+    tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS study_fts_after_insert AFTER INSERT ON study BEGIN
+    INSERT INTO study_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS study_fts_after_delete AFTER DELETE ON study BEGIN
+    INSERT INTO study_fts (study_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS study_fts_after_update AFTER UPDATE OF title, content ON study BEGIN
+    INSERT INTO study_fts (study_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    INSERT INTO study_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
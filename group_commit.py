@@ -0,0 +1,55 @@
+import threading
+import time
+from concurrent.futures import Future
+
+GROUP_COMMIT_WINDOW_SECONDS = 0.005
+GROUP_COMMIT_MAX_BATCH = 64
+
+
+class GroupCommitQueue:
+    def __init__(self, flush, window_seconds=GROUP_COMMIT_WINDOW_SECONDS, max_batch=GROUP_COMMIT_MAX_BATCH):
+        self.flush = flush
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self.pending = []
+        self.condition = threading.Condition()
+        self.worker = None
+        self.stats = {"batches": 0, "items": 0}
+
+    def submit(self, item, timeout=None):
+        future = Future()
+        with self.condition:
+            self.pending.append((item, future))
+            if self.worker is None:
+                self.worker = threading.Thread(target=self.run, name="group-commit", daemon=True)
+                self.worker.start()
+            self.condition.notify()
+        return future.result(timeout)
+
+    def next_batch(self):
+        with self.condition:
+            while not self.pending:
+                self.condition.wait()
+            deadline = time.monotonic() + self.window_seconds
+            while len(self.pending) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+            batch = self.pending[: self.max_batch]
+            self.pending = self.pending[self.max_batch :]
+        return batch
+
+    def run(self):
+        while True:
+            batch = self.next_batch()
+            try:
+                results = self.flush([item for item, _ in batch])
+            except Exception as error:
+                for _, future in batch:
+                    future.set_exception(error)
+                continue
+            self.stats["batches"] += 1
+            self.stats["items"] += len(batch)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
@@ -1,7 +1,7 @@
 from datetime import datetime, timedelta
 
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import Index, UniqueConstraint
 
 db = SQLAlchemy()
 
@@ -10,10 +10,15 @@ def get_kst_now():
     return datetime.utcnow() + timedelta(hours=9)
 
 
+def get_study_created_at(context):
+    return context.get_current_parameters()["date"]
+
+
 comment_likes = db.Table(
     "comment_likes",
     db.Column("user_id", db.Integer, db.ForeignKey("user.id"), primary_key=True),
     db.Column("comment_id", db.Integer, db.ForeignKey("comment.id"), primary_key=True),
+    Index("ix_comment_likes_comment", "comment_id"),
 )
 
 
@@ -54,6 +59,9 @@ class User(db.Model):
 
 class Study(db.Model):
     __tablename__ = "study"
+    __table_args__ = (
+        Index("ix_study_last_activity", "last_activity_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -65,6 +73,12 @@ class Study(db.Model):
     author_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=True)
     chat_link = db.Column(db.String(300), nullable=True)
     is_closed = db.Column(db.Boolean, default=False, nullable=False)
+    last_message_id = db.Column(db.Integer, nullable=True)
+    last_message_at = db.Column(db.DateTime, nullable=True)
+    message_count = db.Column(db.Integer, default=0, nullable=False)
+    last_activity_at = db.Column(db.DateTime, default=get_study_created_at, nullable=False)
+    approved_count = db.Column(db.Integer, default=0, nullable=False)
+    pending_count = db.Column(db.Integer, default=0, nullable=False)
 
     author = db.relationship("User", back_populates="studies")
     comments = db.relationship(
@@ -88,13 +102,38 @@ class Study(db.Model):
         lazy=True,
         order_by="ChatMessage.date.asc()",
     )
+    chat_archives = db.relationship(
+        "ChatArchive",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="dynamic",
+    )
+    last_message = db.relationship(
+        "ChatMessage",
+        primaryjoin="foreign(Study.last_message_id) == ChatMessage.id",
+        uselist=False,
+        viewonly=True,
+    )
 
     def __repr__(self):
         return f"<Study {self.title}>"
 
 
+class StudyCategoryCount(db.Model):
+    __tablename__ = "study_category_count"
+
+    category = db.Column(db.String(50), primary_key=True)
+    total = db.Column(db.Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<StudyCategoryCount {self.category}:{self.total}>"
+
+
 class Comment(db.Model):
     __tablename__ = "comment"
+    __table_args__ = (
+        Index("ix_comment_study_parent", "study_id", "parent_id", "date"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.Text, nullable=False)
@@ -103,6 +142,7 @@ class Comment(db.Model):
     author_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=True)
     study_id = db.Column(db.Integer, db.ForeignKey("study.id"), nullable=False)
     parent_id = db.Column(db.Integer, db.ForeignKey("comment.id"), nullable=True)
+    like_count = db.Column(db.Integer, default=0, nullable=False)
 
     author = db.relationship("User", back_populates="comments")
     study = db.relationship("Study", back_populates="comments")
@@ -126,6 +166,9 @@ class Comment(db.Model):
 
 class ChatMessage(db.Model):
     __tablename__ = "chat_message"
+    __table_args__ = (
+        Index("ix_chat_message_study_date", "study_id", "date", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.Text, nullable=False)
@@ -138,3 +181,22 @@ class ChatMessage(db.Model):
 
     def __repr__(self):
         return f"<ChatMessage {self.study_id}:{self.user_id}>"
+
+
+class ChatArchive(db.Model):
+    __tablename__ = "chat_archive"
+    __table_args__ = (
+        Index("ix_chat_archive_study_first", "study_id", "first_date", "id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    study_id = db.Column(db.Integer, db.ForeignKey("study.id", ondelete="CASCADE"), nullable=False)
+    first_message_id = db.Column(db.Integer, nullable=False)
+    last_message_id = db.Column(db.Integer, nullable=False)
+    first_date = db.Column(db.DateTime, nullable=False)
+    last_date = db.Column(db.DateTime, nullable=False)
+    message_count = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+
+    def __repr__(self):
+        return f"<ChatArchive {self.study_id}:{self.first_message_id}-{self.last_message_id}>"
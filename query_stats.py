@@ -0,0 +1,41 @@
+import json
+
+QUERY_STATS_SLOWEST = 3
+QUERY_STATS_SQL_LENGTH = 200
+
+
+class QueryStats:
+    def __init__(self, slowest_limit=QUERY_STATS_SLOWEST):
+        self.slowest_limit = slowest_limit
+        self.count = 0
+        self.total_seconds = 0.0
+        self.slowest = []
+
+    def record(self, statement, seconds, statements=1):
+        self.count += statements
+        self.total_seconds += seconds
+        self.slowest.append((seconds, " ".join(statement.split())[:QUERY_STATS_SQL_LENGTH]))
+        self.slowest.sort(key=lambda entry: entry[0], reverse=True)
+        del self.slowest[self.slowest_limit :]
+
+    def server_timing(self, total_seconds):
+        return (
+            f'db;dur={self.total_seconds * 1000:.1f};desc="{self.count} queries", '
+            f"app;dur={total_seconds * 1000:.1f}"
+        )
+
+    def log_line(self, method, path, endpoint, status, total_seconds):
+        return json.dumps(
+            {
+                "event": "request",
+                "method": method,
+                "path": path,
+                "endpoint": endpoint,
+                "status": status,
+                "duration_ms": round(total_seconds * 1000, 1),
+                "db_queries": self.count,
+                "db_ms": round(self.total_seconds * 1000, 1),
+                "slowest": [{"ms": round(seconds * 1000, 2), "sql": sql} for seconds, sql in self.slowest],
+            },
+            ensure_ascii=False,
+        )
@@ -1,8 +1,12 @@
 import importlib
 import json
 import os
+import sqlite3
+import subprocess
+import sys
 import tempfile
 import unittest
+from datetime import datetime, timedelta
 
 
 class StudyMateAppTestCase(unittest.TestCase):
@@ -73,6 +77,19 @@ class StudyMateAppTestCase(unittest.TestCase):
             session["user_nickname"] = user["nickname"]
             session["_csrf_token"] = "test-token"
 
+    def load_worker_modules(self):
+        root = os.path.dirname(os.path.dirname(__file__))
+        sys.path[:0] = [os.path.join(root, "benchmarks"), os.path.join(root, "worker")]
+        try:
+            import scenarios
+            import worker_routes
+
+            worker_routes.install_runtime_shims()
+            import cf_worker
+        finally:
+            del sys.path[:2]
+        return worker_routes, scenarios, cf_worker
+
     def test_category_filter_applies(self):
         with self.app.app_context():
             owner = self.create_user("owner", "개발왕", "owner@example.com")
@@ -234,11 +251,16 @@ class StudyMateAppTestCase(unittest.TestCase):
 
         with self.app.app_context():
             messages = self.ChatMessage.query.filter_by(study_id=study_id).all()
+            study = self.db.session.get(self.Study, study_id)
+            last_message_id = study.last_message_id
+            message_count = study.message_count
 
         payload = json.loads(response.get_data(as_text=True))
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(messages), 1)
         self.assertEqual(payload["message"]["content"], "안녕하세요 반갑습니다")
+        self.assertEqual(last_message_id, messages[0].id)
+        self.assertEqual(message_count, 1)
 
     def test_pending_member_cannot_access_study_chat(self):
         with self.app.app_context():
@@ -266,6 +288,1373 @@ class StudyMateAppTestCase(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn("승인된 참여자만 채팅방에 입장할 수 있습니다.", response.get_data(as_text=True))
 
+    def test_chat_list_orders_rooms_by_latest_message(self):
+        with self.app.app_context():
+            owner = self.create_user("owner", "방장", "owner@example.com")
+            guest = self.create_user("guest", "참여자", "guest@example.com")
+            quiet = self.Study(
+                title="조용한 방",
+                category="웹 개발",
+                member_count=4,
+                content="대화가 오래전에 멈춘 방",
+                writer=owner["nickname"],
+                author_id=owner["id"],
+            )
+            busy = self.Study(
+                title="활발한 방",
+                category="웹 개발",
+                member_count=4,
+                content="방금 대화가 오간 방",
+                writer=owner["nickname"],
+                author_id=owner["id"],
+            )
+            self.db.session.add_all([quiet, busy])
+            self.db.session.commit()
+            self.db.session.add(self.Enrollment(user_id=guest["id"], study_id=busy.id, status=1))
+            self.db.session.add_all(
+                [
+                    self.ChatMessage(content="예전 공지", study_id=busy.id, user_id=owner["id"]),
+                    self.ChatMessage(content="마지막 메시지", study_id=busy.id, user_id=guest["id"]),
+                ]
+            )
+            self.db.session.commit()
+
+        self.login_as(owner)
+        response = self.client.get("/chats")
+        html = response.get_data(as_text=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(html.index("활발한 방"), html.index("조용한 방"))
+        self.assertIn("마지막 메시지", html)
+        self.assertNotIn("예전 공지", html)
+
+    def test_home_samples_distinct_studies(self):
+        with self.app.app_context():
+            owner = self.create_user("owner", "방장", "owner@example.com")
+            for index in range(12):
+                self.db.session.add(
+                    self.Study(
+                        title=f"샘플 스터디 {index}",
+                        category="웹 개발",
+                        member_count=4,
+                        content="홈 화면 추천 후보",
+                        writer=owner["nickname"],
+                        author_id=owner["id"],
+                    )
+                )
+            self.db.session.commit()
+            self.Study.query.filter(self.Study.id.between(3, 8)).delete()
+            self.db.session.commit()
+
+            remaining_ids = {study.id for study in self.Study.query.all()}
+            picked_counts = dict.fromkeys(remaining_ids, 0)
+            self.app_module.random.seed(4)
+            for _ in range(300):
+                picks = self.app_module.sample_random_studies()
+                picked_ids = [study.id for study in picks]
+                self.assertEqual(len(picked_ids), 4)
+                self.assertEqual(len(set(picked_ids)), 4)
+                self.assertLessEqual(set(picked_ids), remaining_ids)
+                for study_id in picked_ids:
+                    picked_counts[study_id] += 1
+
+        expected = 300 * 4 / len(remaining_ids)
+        for study_id, count in picked_counts.items():
+            self.assertLess(abs(count - expected), expected * 0.25, (study_id, picked_counts))
+
+        response = self.client.get("/")
+        self.assertEqual(response.status_code, 200)
+
+    def test_keyword_search_uses_full_text_index(self):
+        with self.app.app_context():
+            owner = self.create_user("owner", "검색왕", "owner@example.com")
+            for title, content in [
+                ("알고리즘 스터디", "매주 코딩테스트 문제를 풉니다."),
+                ("토익 스터디", "LC RC 문제 풀이"),
+                ("헬스 인증", "운동 기록 공유"),
+            ]:
+                self.db.session.add(
+                    self.Study(
+                        title=title,
+                        category="웹 개발",
+                        member_count=4,
+                        content=content,
+                        writer=owner["nickname"],
+                        author_id=owner["id"],
+                    )
+                )
+            self.db.session.commit()
+            renamed = self.Study.query.filter_by(title="헬스 인증").one()
+            renamed.content = "코딩테스트 대비 체력 관리"
+            self.db.session.commit()
+
+        self.assertTrue(self.app.config["STUDY_SEARCH_FTS"])
+
+        html = self.client.get("/study?keyword=코딩테스트").get_data(as_text=True)
+        self.assertIn("알고리즘 스터디", html)
+        self.assertIn("헬스 인증", html)
+        self.assertNotIn("토익 스터디", html)
+
+        html = self.client.get("/study?keyword=토익").get_data(as_text=True)
+        self.assertIn("토익 스터디", html)
+        self.assertNotIn("알고리즘 스터디", html)
+
+    def test_study_cursor_pages_walk_every_post_once(self):
+        with self.app.app_context():
+            owner = self.create_user("owner", "방장", "owner@example.com")
+            for index in range(20):
+                self.db.session.add(
+                    self.Study(
+                        title=f"커서 스터디 {index}",
+                        category="웹 개발",
+                        member_count=4,
+                        content="무한 스크롤 테스트",
+                        writer=owner["nickname"],
+                        author_id=owner["id"],
+                    )
+                )
+            self.db.session.commit()
+            expected_ids = [
+                study.id
+                for study in self.Study.query.order_by(self.Study.date.desc(), self.Study.id.desc())
+            ]
+
+        seen_ids = []
+        cursor = ""
+        while cursor is not None:
+            response = self.client.get("/study", query_string={"cursor": cursor})
+            payload = json.loads(response.get_data(as_text=True))
+            self.assertEqual(response.status_code, 200)
+            seen_ids.extend(study["id"] for study in payload["studies"])
+            cursor = payload["next_cursor"]
+
+        self.assertEqual(seen_ids, expected_ids)
+        self.assertEqual(self.client.get("/study", query_string={"cursor": "%%%"}).status_code, 400)
+
+        html = self.client.get("/study?page=3").get_data(as_text=True)
+        self.assertIn("커서 스터디 0", html)
+        self.assertNotIn("커서 스터디 19", html)
+
+    def test_category_counts_follow_study_writes(self):
+        with self.app.app_context():
+            owner = self.create_user("owner", "방장", "owner@example.com")
+
+        self.login_as(owner)
+        form = {
+            "_csrf_token": "test-token",
+            "title": "카운트 스터디",
+            "category": "웹 개발",
+            "member_count": "4",
+            "content": "카테고리 집계 테스트",
+        }
+        self.client.post("/study/write", data=form)
+        self.client.post("/study/write", data=form)
+
+        with self.app.app_context():
+            study_id = self.Study.query.order_by(self.Study.id).first().id
+            self.assertEqual(
+                self.app_module.get_study_category_counts(), {"웹 개발": 2}
+            )
+
+        self.client.post(f"/study/{study_id}/edit", data={**form, "category": "독서"})
+        with self.app.app_context():
+            self.assertEqual(
+                self.app_module.get_study_category_counts(), {"웹 개발": 1, "독서": 1}
+            )
+
+        html = self.client.get("/study?category=독서").get_data(as_text=True)
+        self.assertIn("독서 (1)", html)
+        self.assertNotIn("조건에 맞는 스터디가 아직 없습니다.", html)
+
+        self.client.post(f"/study/{study_id}/delete", data={"_csrf_token": "test-token"})
+        with self.app.app_context():
+            self.assertEqual(
+                self.app_module.get_study_category_counts(), {"웹 개발": 1, "독서": 0}
+            )
+
+            statements = []
+            record = lambda conn, cursor, statement, *args: statements.append(statement)
+            self.app_module.event.listen(self.db.engine, "before_cursor_execute", record)
+            try:
+                self.app_module.run_schema_migrations()
+            finally:
+                self.app_module.event.remove(self.db.engine, "before_cursor_execute", record)
+            self.assertFalse([statement for statement in statements if "GROUP BY category" in statement])
+            self.assertEqual(
+                self.app_module.get_study_category_counts(), {"웹 개발": 1, "독서": 0}
+            )
+
+    def test_d1_export_rebuilds_counters_on_fresh_schema(self):
+        with self.app.app_context():
+            owner = self.create_user("owner", "방장", "owner@example.com")
+            guest = self.create_user("guest", "지원자", "guest@example.com")
+            for index, category in enumerate(["웹 개발", "웹 개발", "독서"]):
+                study = self.Study(
+                    title=f"이전 스터디 {index}",
+                    category=category,
+                    member_count=4,
+                    content="D1로 옮길 스터디입니다.",
+                    writer=owner["nickname"],
+                    author_id=owner["id"],
+                )
+                self.db.session.add(study)
+                self.db.session.commit()
+                self.db.session.add(self.Enrollment(user_id=guest["id"], study_id=study.id, status=1))
+                self.db.session.commit()
+            self.db.session.remove()
+            self.db.engine.dispose()
+
+        root = os.path.dirname(os.path.dirname(__file__))
+        export = subprocess.run(
+            [sys.executable, os.path.join(root, "cloudflare", "export_sqlite_to_d1.py"), self.db_path],
+            check=True,
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+        )
+        with tempfile.TemporaryDirectory() as workdir:
+            connection = sqlite3.connect(os.path.join(workdir, "d1.db"))
+            try:
+                with open(os.path.join(root, "cloudflare", "schema.sql"), encoding="utf-8") as schema:
+                    connection.executescript(schema.read())
+                connection.executescript(export.stdout)
+                categories = dict(connection.execute("SELECT category, total FROM study_category_count"))
+                approved = [row[0] for row in connection.execute("SELECT approved_count FROM study ORDER BY id")]
+            finally:
+                connection.close()
+
+        self.assertEqual(categories, {"웹 개발": 2, "독서": 1})
+        self.assertEqual(approved, [1, 1, 1])
+
+    def test_sqlite_chat_broadcast_reaches_other_processes(self):
+        from chat_broadcast import SQLiteChatBroadcast
+
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        bus_path = os.path.join(workdir.name, "chat.bus")
+        listener = SQLiteChatBroadcast(bus_path, poll_seconds=0.01)
+        publisher = SQLiteChatBroadcast(bus_path, poll_seconds=0.01)
+        self.addCleanup(publisher.close)
+        self.addCleanup(listener.close)
+
+        subscriber = listener.subscribe(7)
+        other_room = listener.subscribe(8)
+        publisher.publish(7, {"id": 1, "content": "다른 워커에서 보낸 메시지"})
+
+        self.assertEqual(subscriber.get(timeout=2)["content"], "다른 워커에서 보낸 메시지")
+        self.assertTrue(other_room.empty())
+
+        fetch_events = listener.fetch_events
+        failures = []
+
+        def flaky_fetch_events(connection, last_event_id):
+            if not failures:
+                failures.append(last_event_id)
+                raise sqlite3.OperationalError("database is locked")
+            return fetch_events(connection, last_event_id)
+
+        listener.fetch_events = flaky_fetch_events
+        with self.assertLogs("studymate.chat", level="ERROR"):
+            publisher.publish(7, {"id": 2, "content": "잠금이 풀린 뒤 도착한 메시지"})
+            self.assertEqual(subscriber.get(timeout=2)["content"], "잠금이 풀린 뒤 도착한 메시지")
+        self.assertEqual(len(failures), 1)
+
+        listener.unsubscribe(7, subscriber)
+        listener.unsubscribe(8, other_room)
+        self.assertFalse(listener.has_subscribers())
+
+        poller = listener.poller
+        listener.close()
+        self.assertFalse(poller.is_alive())
+
+    def test_chat_stream_replays_messages_after_last_event_id(self):
+        with self.app.app_context():
+            owner = self.create_user("owner", "방장", "owner@example.com")
+            study = self.Study(
+                title="재연결 채팅",
+                category="웹 개발",
+                member_count=4,
+                content="Last-Event-ID 테스트",
+                writer=owner["nickname"],
+                author_id=owner["id"],
+            )
+            self.db.session.add(study)
+            self.db.session.commit()
+            study_id = study.id
+
+        self.login_as(owner)
+        message_ids = []
+        for content in ("첫째", "둘째", "셋째"):
+            response = self.client.post(
+                f"/study/{study_id}/chat",
+                json={"content": content},
+                headers={"X-CSRFToken": "test-token"},
+            )
+            message_ids.append(response.get_json()["message"]["id"])
+
+        response = self.client.get(
+            f"/study/{study_id}/chat/stream",
+            headers={"Last-Event-ID": str(message_ids[0])},
+            buffered=False,
+        )
+        chunks = iter(response.response)
+        replayed = [next(chunks).decode("utf-8"), next(chunks).decode("utf-8")]
+        response.close()
+
+        self.assertTrue(replayed[0].startswith(f"id: {message_ids[1]}\n"))
+        self.assertIn("둘째", replayed[0])
+        self.assertTrue(replayed[1].startswith(f"id: {message_ids[2]}\n"))
+        self.assertFalse(self.app_module.chat_broadcast.has_subscribers())
+
+    def test_chat_stream_replays_past_the_replay_page_size(self):
+        import asyncio
+
+        import asgi
+
+        asgi_module = importlib.reload(asgi)
+        with self.app.app_context():
+            owner = self.create_user("owner", "방장", "owner@example.com")
+            study = self.Study(
+                title="오래 비운 채팅",
+                category="웹 개발",
+                member_count=4,
+                content="재생 페이지보다 많이 놓친 경우",
+                writer=owner["nickname"],
+                author_id=owner["id"],
+            )
+            self.db.session.add(study)
+            self.db.session.commit()
+            study_id = study.id
+            started = datetime(2026, 1, 1, 9, 0)
+            messages = [
+                self.ChatMessage(
+                    content=f"놓친 메시지 {index}",
+                    study_id=study_id,
+                    user_id=owner["id"],
+                    date=started + timedelta(seconds=index),
+                )
+                for index in range(self.app_module.CHAT_REPLAY_LIMIT * 2 + 5)
+            ]
+            self.db.session.add_all(messages)
+            self.db.session.commit()
+            message_ids = [message.id for message in messages]
+
+        self.login_as(owner)
+        response = self.client.get(
+            f"/study/{study_id}/chat/stream",
+            headers={"Last-Event-ID": str(message_ids[0])},
+            buffered=False,
+        )
+        chunks = iter(response.response)
+        replayed = [int(next(chunks).decode("utf-8").split("\n", 1)[0][4:]) for _ in message_ids[1:]]
+        response.close()
+        self.assertEqual(replayed, message_ids[1:])
+
+        cookie = self.client.get_cookie("session").value
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": f"/study/{study_id}/chat/stream",
+            "headers": [
+                (b"cookie", f"session={cookie}".encode("latin-1")),
+                (b"last-event-id", str(message_ids[0]).encode("latin-1")),
+            ],
+        }
+
+        async def drive():
+            incoming = asyncio.Queue()
+            sent = []
+
+            async def send(message):
+                sent.append(message)
+
+            stream = asyncio.create_task(asgi_module.application(scope, incoming.get, send))
+            while len(sent) < len(message_ids):
+                await asyncio.sleep(0.01)
+            await incoming.put({"type": "http.disconnect"})
+            await asyncio.wait_for(stream, 2)
+            return sent
+
+        sent = asyncio.run(drive())
+        asgi_replayed = [int(message["body"].decode("utf-8").split("\n", 1)[0][4:]) for message in sent[1:]]
+        self.assertEqual(asgi_replayed, message_ids[1:])
+
+    def test_chat_replay_skips_unknown_anchor_and_caps_with_resync(self):
+        import asyncio
+        from unittest import mock
+
+        with self.app.app_context():
+            owner = self.create_user("owner", "방장", "owner@example.com")
+            study = self.Study(
+                title="알 수 없는 기준점",
+                category="웹 개발",
+                member_count=4,
+                content="없는 Last-Event-ID 재생",
+                writer=owner["nickname"],
+                author_id=owner["id"],
+            )
+            self.db.session.add(study)
+            self.db.session.commit()
+            study_id = study.id
+            started = datetime(2026, 1, 1, 9, 0)
+            messages = [
+                self.ChatMessage(
+                    content=f"메시지 {index}",
+                    study_id=study_id,
+                    user_id=owner["id"],
+                    date=started + timedelta(seconds=index),
+                )
+                for index in range(self.app_module.CHAT_REPLAY_LIMIT + 5)
+            ]
+            self.db.session.add_all(messages)
+            self.db.session.commit()
+            message_ids = [message.id for message in messages]
+            self.assertEqual(list(self.app_module.iter_chat_replay(study_id, 999999)), [])
+            self.db.session.delete(messages[-3])
+            self.db.session.commit()
+            replayed = self.app_module.iter_chat_replay(study_id, message_ids[-3])
+            self.assertEqual([payload["id"] for payload in replayed], message_ids[-2:])
+
+        self.login_as(owner)
+        response = self.client.get(f"/study/{study_id}/chat/messages?after_id=999999")
+        self.assertEqual(response.get_json()["messages"], [])
+
+        with mock.patch.object(self.app_module, "CHAT_REPLAY_MAX_PAGES", 1):
+            response = self.client.get(
+                f"/study/{study_id}/chat/stream",
+                headers={"Last-Event-ID": str(message_ids[0])},
+                buffered=False,
+            )
+            chunks = [chunk.decode("utf-8") for chunk in response.response]
+            response.close()
+        self.assertEqual(len(chunks), self.app_module.CHAT_REPLAY_LIMIT + 1)
+        self.assertEqual(chunks[-1], self.app_module.CHAT_STREAM_RESYNC)
+
+        worker_routes, scenarios, cf_worker = self.load_worker_modules()
+        env = worker_routes.BenchEnv()
+        env.DB.connection.executescript(
+            """
+            INSERT INTO user (userid, password, nickname, email) VALUES ('owner', 'x', '방장', 'owner@example.com');
+            INSERT INTO study (title, category, member_count, content, date, writer, author_id, last_activity_at)
+            VALUES ('알 수 없는 기준점', '웹 개발', 4, '없는 기준점', '2026-01-01T00:00:00', '방장', 1, '2026-01-01T00:00:00');
+            INSERT INTO chat_message (content, date, study_id, user_id) VALUES ('첫 메시지', '2026-01-01T09:00:00', 1, 1);
+            INSERT INTO chat_message (content, date, study_id, user_id) VALUES ('둘째 메시지', '2026-01-01T09:00:01', 1, 1);
+            INSERT INTO chat_message (content, date, study_id, user_id) VALUES ('셋째 메시지', '2026-01-01T09:00:02', 1, 1);
+            DELETE FROM chat_message WHERE id = 2;
+            """
+        )
+
+        def fetch_after(after_id):
+            query = cf_worker.chat_messages_query(1, limit=50, after_id=after_id)
+            return [message["id"] for message in asyncio.run(cf_worker.d1_fetch(env, query))]
+
+        self.assertEqual(fetch_after(1), [3])
+        self.assertEqual(fetch_after(2), [3])
+        self.assertEqual(fetch_after(999999), [])
+
+    def test_chat_history_pages_backwards_with_before_id(self):
+        with self.app.app_context():
+            owner = self.create_user("owner", "방장", "owner@example.com")
+            study = self.Study(
+                title="긴 채팅",
+                category="웹 개발",
+                member_count=4,
+                content="이전 메시지 페이지 테스트",
+                writer=owner["nickname"],
+                author_id=owner["id"],
+            )
+            self.db.session.add(study)
+            self.db.session.commit()
+            study_id = study.id
+            started = datetime(2026, 1, 1, 9, 0)
+            for index in range(85):
+                self.db.session.add(
+                    self.ChatMessage(
+                        content=f"메시지 {index}",
+                        study_id=study_id,
+                        user_id=owner["id"],
+                        date=started + timedelta(minutes=index),
+                    )
+                )
+            self.db.session.commit()
+            message_ids = [
+                message.id
+                for message in self.ChatMessage.query.order_by(self.ChatMessage.date).all()
+            ]
+
+        self.login_as(owner)
+        html = self.client.get(f"/study/{study_id}/chat").get_data(as_text=True)
+        self.assertIn("chat-load-older", html)
+        self.assertIn("메시지 84", html)
+        self.assertNotIn("메시지 4<", html)
+
+        page = self.client.get(
+            f"/study/{study_id}/chat/messages?before_id={message_ids[5]}"
+        ).get_json()
+        self.assertEqual([message["id"] for message in page["messages"]], message_ids[:5])
+        self.assertFalse(page["has_more"])
+
+        page = self.client.get(
+            f"/study/{study_id}/chat/messages?before_id={message_ids[10]}"
+        ).get_json()
+        self.assertEqual(len(page["messages"]), 10)
+
+    def test_archived_chat_history_stays_readable(self):
+        with self.app.app_context():
+            owner = self.create_user("owner", "방장", "owner@example.com")
+            study = self.Study(
+                title="오래된 채팅",
+                category="웹 개발",
+                member_count=4,
+                content="보관 테스트",
+                writer=owner["nickname"],
+                author_id=owner["id"],
+            )
+            self.db.session.add(study)
+            self.db.session.commit()
+            study_id = study.id
+            old_start = datetime(2020, 1, 1, 9, 0)
+            recent_start = datetime.utcnow()
+            for index in range(9):
+                started = old_start if index < 6 else recent_start
+                self.db.session.add(
+                    self.ChatMessage(
+                        content=f"기록 {index}",
+                        study_id=study_id,
+                        user_id=owner["id"],
+                        date=started + timedelta(minutes=index),
+                    )
+                )
+            self.db.session.commit()
+            message_ids = [
+                message.id
+                for message in self.ChatMessage.query.order_by(self.ChatMessage.date).all()
+            ]
+            self.db.session.remove()
+            self.db.engine.dispose()
+
+        script = os.path.join(os.path.dirname(os.path.dirname(__file__)), "cloudflare", "archive_chat_messages.py")
+        subprocess.run([sys.executable, script, self.db_path, "--days", "30"], check=True, capture_output=True)
+
+        with self.app.app_context():
+            self.assertEqual(self.ChatMessage.query.count(), 3)
+            self.assertEqual(self.app_module.ChatArchive.query.count(), 1)
+
+            messages, has_more = self.app_module.get_chat_history(study_id, limit=4)
+            self.assertEqual([message.id for message in messages], message_ids[5:])
+            self.assertEqual(messages[0].user.nickname, "방장")
+            self.assertTrue(has_more)
+
+            messages, has_more = self.app_module.get_chat_history(study_id, message_ids[5], limit=4)
+            self.assertEqual([message.id for message in messages], message_ids[1:5])
+            self.assertTrue(has_more)
+
+        self.login_as(owner)
+        page = self.client.get(
+            f"/study/{study_id}/chat/messages?before_id={message_ids[1]}"
+        ).get_json()
+        self.assertEqual([message["id"] for message in page["messages"]], message_ids[:1])
+        self.assertEqual(page["messages"][0]["content"], "기록 0")
+        self.assertFalse(page["has_more"])
+
+    def test_study_delete_drops_chat_archives_without_loading_them(self):
+        with self.app.app_context():
+            owner = self.create_user("owner", "방장", "owner@example.com")
+            study = self.Study(
+                title="보관된 채팅방",
+                category="웹 개발",
+                member_count=4,
+                content="삭제 테스트",
+                writer=owner["nickname"],
+                author_id=owner["id"],
+            )
+            self.db.session.add(study)
+            self.db.session.commit()
+            study_id = study.id
+            archived_at = datetime(2020, 1, 1, 9, 0)
+            self.db.session.add_all(
+                [
+                    self.app_module.ChatArchive(
+                        study_id=study_id,
+                        first_message_id=index * 10 + 1,
+                        last_message_id=index * 10 + 10,
+                        first_date=archived_at,
+                        last_date=archived_at,
+                        message_count=10,
+                        payload="압축된 메시지",
+                    )
+                    for index in range(3)
+                ]
+            )
+            self.db.session.commit()
+
+        statements = []
+        record = lambda conn, cursor, statement, *args: statements.append(statement)
+        self.login_as(owner)
+        with self.app.app_context():
+            self.app_module.event.listen(self.db.engine, "before_cursor_execute", record)
+        try:
+            response = self.client.post(f"/study/{study_id}/delete", data={"_csrf_token": "test-token"})
+        finally:
+            with self.app.app_context():
+                self.app_module.event.remove(self.db.engine, "before_cursor_execute", record)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse([statement for statement in statements if "chat_archive.payload" in statement])
+        with self.app.app_context():
+            self.assertEqual(self.app_module.ChatArchive.query.count(), 0)
+            self.assertIsNone(self.db.session.get(self.Study, study_id))
+
+    def test_chat_broadcast_bounds_slow_subscribers(self):
+        from chat_broadcast import CHAT_SUBSCRIBER_EVICTED, LocalChatBroadcast
+
+        dropping = LocalChatBroadcast(queue_size=2, overflow="drop")
+        slow = dropping.subscribe(1)
+        for message_id in range(5):
+            dropping.publish(1, {"id": message_id})
+        self.assertEqual([slow.get_nowait()["id"], slow.get_nowait()["id"]], [0, 1])
+        self.assertEqual(dropping.stats, {"dropped_messages": 3, "evicted_subscribers": 0})
+
+        evicting = LocalChatBroadcast(queue_size=2, overflow="evict")
+        slow = evicting.subscribe(1)
+        healthy = evicting.subscribe(1)
+        evicting.publish(1, {"id": 1})
+        evicting.publish(1, {"id": 2})
+        healthy.get_nowait()
+        evicting.publish(1, {"id": 3})
+
+        self.assertIs(slow.get_nowait(), CHAT_SUBSCRIBER_EVICTED)
+        self.assertTrue(slow.empty())
+        self.assertEqual(evicting.subscribers[1], {healthy})
+        self.assertEqual(evicting.stats, {"dropped_messages": 0, "evicted_subscribers": 1})
+
+    def test_group_commit_batches_concurrent_chat_posts(self):
+        import threading
+
+        from group_commit import GroupCommitQueue
+
+        with self.app.app_context():
+            owner = self.create_user("owner", "방장", "owner@example.com")
+            study = self.Study(
+                title="그룹 커밋",
+                category="웹 개발",
+                member_count=4,
+                content="묶어서 커밋되는 채팅",
+                writer=owner["nickname"],
+                author_id=owner["id"],
+            )
+            self.db.session.add(study)
+            self.db.session.commit()
+            study_id = study.id
+
+        queue = GroupCommitQueue(self.app_module.commit_chat_messages, window_seconds=0.05)
+        self.app_module.chat_group_commit = queue
+        clients = []
+        for _ in range(6):
+            self.client = self.app.test_client()
+            self.login_as(owner)
+            clients.append(self.client)
+
+        responses = []
+
+        def post(client, index):
+            responses.append(
+                client.post(
+                    f"/study/{study_id}/chat",
+                    json={"content": f"메시지 {index}"},
+                    headers={"X-CSRFToken": "test-token"},
+                )
+            )
+
+        threads = [threading.Thread(target=post, args=(client, index)) for index, client in enumerate(clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with self.app.app_context():
+            message_ids = [message.id for message in self.ChatMessage.query.filter_by(study_id=study_id)]
+            study = self.db.session.get(self.Study, study_id)
+            message_count = study.message_count
+            last_message_id = study.last_message_id
+
+        acknowledged = sorted(json.loads(response.get_data(as_text=True))["message"]["id"] for response in responses)
+        self.assertEqual([response.status_code for response in responses], [200] * 6)
+        self.assertEqual(acknowledged, sorted(message_ids))
+        self.assertEqual(message_count, 6)
+        self.assertEqual(last_message_id, max(message_ids))
+        self.assertEqual(queue.stats["items"], 6)
+        self.assertLess(queue.stats["batches"], 6)
+
+    def test_route_benchmark_covers_every_route_on_both_backends(self):
+        root = os.path.dirname(os.path.dirname(__file__))
+        summary_path = os.path.join(os.path.dirname(self.db_path), "bench_summary.json")
+        self.addCleanup(lambda: os.path.exists(summary_path) and os.remove(summary_path))
+        subprocess.run(
+            [sys.executable, os.path.join(root, "benchmarks", "routes.py"), "--iterations", "2", "--json", summary_path],
+            check=True,
+            capture_output=True,
+        )
+        with open(summary_path, encoding="utf-8") as handle:
+            summary = json.load(handle)
+
+        flask_endpoints = {row["route"].split()[1].split("?")[0] for row in summary["flask"]}
+        expected_endpoints = {rule.endpoint for rule in self.app.url_map.iter_rules()} - {"static"}
+        self.assertEqual(flask_endpoints, expected_endpoints)
+        self.assertIn("GET study_chat_socket", {row["route"] for row in summary["worker"]})
+        for backend, rows in summary.items():
+            for row in rows:
+                self.assertTrue(all(status < 400 for status in row["statuses"]), (backend, row))
+                self.assertEqual(row["requests"], 2)
+
+    def test_worker_long_poll_waits_on_chat_room_and_wakes_on_post(self):
+        root = os.path.dirname(os.path.dirname(__file__))
+        summary_path = os.path.join(os.path.dirname(self.db_path), "long_poll_summary.json")
+        self.addCleanup(lambda: os.path.exists(summary_path) and os.remove(summary_path))
+        subprocess.run(
+            [
+                sys.executable,
+                os.path.join(root, "benchmarks", "chat_long_poll.py"),
+                "--time-scale",
+                "0.02",
+                "--json",
+                summary_path,
+            ],
+            check=True,
+            capture_output=True,
+        )
+        with open(summary_path, encoding="utf-8") as handle:
+            summary = json.load(handle)
+
+        self.assertEqual(summary["long_poll_idle"]["status"], 304)
+        self.assertLessEqual(summary["long_poll_idle"]["queries"], 2.5)
+        self.assertLess(summary["long_poll_idle"]["queries"] * 8, summary["short_poll"]["queries"])
+        self.assertEqual(summary["long_poll_woken"]["status"], 200)
+        self.assertLess(summary["long_poll_woken"]["seconds_after_post"], summary["window_seconds"] / 4)
+
+    def test_worker_chat_version_only_moves_forward_without_chat_room(self):
+        import asyncio
+        from unittest import mock
+
+        worker_routes, scenarios, cf_worker = self.load_worker_modules()
+        env = worker_routes.BenchEnv()
+        connection = env.DB.connection
+        connection.executescript(
+            """
+            INSERT INTO user (userid, password, nickname, email) VALUES ('owner', 'x', '방장', 'owner@example.com');
+            INSERT INTO study (title, category, member_count, content, date, writer, author_id, last_activity_at)
+            VALUES ('버전 확인', '웹 개발', 4, '롱 폴링', '2026-01-01T00:00:00', '방장', 1, '2026-01-01T00:00:00');
+            """
+        )
+        cf_worker.chat_version_cache.clear()
+        self.addCleanup(cf_worker.chat_version_cache.clear)
+
+        self.assertEqual(cf_worker.remember_chat_version(1, 5), 5)
+        self.assertEqual(cf_worker.remember_chat_version(1, 3), 5)
+        self.assertEqual(cf_worker.chat_version_cache[1][1], 5)
+        cf_worker.chat_version_cache.clear()
+
+        async def insert_later():
+            await asyncio.sleep(0.05)
+            connection.execute(
+                "INSERT INTO chat_message (content, date, study_id, user_id) VALUES ('다른 isolate', '2026-01-01T09:00:00', 1, 1)"
+            )
+            connection.commit()
+
+        async def wait_with_insert():
+            inserting = asyncio.ensure_future(insert_later())
+            version = await cf_worker.wait_for_chat_version(env, 1, 0, True)
+            await inserting
+            return version
+
+        with mock.patch.object(cf_worker, "CHAT_LONG_POLL_INTERVAL", 0.02), mock.patch.object(
+            cf_worker, "CHAT_VERSION_CACHE_SECONDS", 0
+        ), mock.patch.object(cf_worker, "CHAT_LONG_POLL_SECONDS", 1):
+            self.assertEqual(asyncio.run(wait_with_insert()), 1)
+            self.assertEqual(asyncio.run(cf_worker.wait_for_chat_version(env, 1, 1, True)), 1)
+
+    def test_worker_chat_post_reaches_socket_subscribers(self):
+        import asyncio
+        import contextlib
+        import io
+
+        worker_routes, scenarios, cf_worker = self.load_worker_modules()
+        bench_request = scenarios.bench_request
+        owner = {"userid": "owner", "nickname": "방장"}
+        member = {"userid": "member", "nickname": "멤버"}
+        cf_worker.local_chat_rooms.rooms.clear()
+        self.addCleanup(cf_worker.local_chat_rooms.rooms.clear)
+
+        def seeded_env(*args):
+            env = worker_routes.BenchEnv(*args)
+            env.DB.connection.executescript(
+                """
+                INSERT INTO user (userid, password, nickname, email) VALUES ('owner', 'x', '방장', 'owner@example.com');
+                INSERT INTO user (userid, password, nickname, email) VALUES ('member', 'x', '멤버', 'member@example.com');
+                INSERT INTO study (title, category, member_count, content, date, writer, author_id, last_activity_at)
+                VALUES ('실시간 채팅', '웹 개발', 4, '소켓 전달 테스트', '2026-01-01T00:00:00', '방장', 1, '2026-01-01T00:00:00');
+                INSERT INTO enrollment (user_id, study_id, status, date) VALUES (2, 1, 1, '2026-01-02T00:00:00');
+                """
+            )
+            return env
+
+        def fetch(env, method, spec):
+            request = worker_routes.build_request(cf_worker, method, spec)
+            with contextlib.redirect_stdout(io.StringIO()):
+                return asyncio.run(cf_worker.Default(None, env).fetch(request))
+
+        def connect(env, user):
+            response = fetch(env, "GET", bench_request("/study/1/chat/socket", user, headers={"Upgrade": "websocket"}))
+            self.assertEqual(response.status, 101)
+            return response.web_socket
+
+        def post(env, content):
+            response = fetch(env, "POST", bench_request("/study/1/chat", owner, json={"content": content}))
+            self.assertEqual(response.status, 200)
+
+        for env in (seeded_env(cf_worker.ChatRoom), seeded_env()):
+            owner_socket = connect(env, owner)
+            member_socket = connect(env, member)
+            post(env, "소켓으로 전달")
+            self.assertEqual(json.loads(owner_socket.received[-1])["content"], "소켓으로 전달")
+            self.assertEqual(json.loads(member_socket.received[-1])["content"], "소켓으로 전달")
+
+            member_socket.close()
+            self.assertNotIn(member_socket.peer, cf_worker.local_chat_rooms.rooms.get(1, {}))
+            member_socket = connect(env, member)
+
+            asyncio.run(cf_worker.revoke_chat_access(env, 1, 2))
+            self.assertEqual(member_socket.peer.closed[0], 1008)
+            self.assertIsNone(owner_socket.peer.closed)
+            post(env, "멤버 제외 후 전달")
+            self.assertEqual(json.loads(owner_socket.received[-1])["content"], "멤버 제외 후 전달")
+            self.assertEqual(member_socket.received, [])
+
+            asyncio.run(cf_worker.revoke_chat_access(env, 1))
+            self.assertEqual(owner_socket.peer.closed[0], 1008)
+            self.assertNotIn(1, cf_worker.local_chat_rooms.rooms)
+
+        env = seeded_env()
+        env.CHAT_ROOM = object()
+        with self.assertLogs("studymate.chat", level="WARNING") as captured:
+            post(env, "전달 실패")
+        self.assertEqual(json.loads(captured.records[-1].getMessage())["event"], "chat_publish_failed")
+
+    def test_worker_home_sample_stays_uniform_when_probes_miss(self):
+        import asyncio
+
+        worker_routes, _, cf_worker = self.load_worker_modules()
+        env = worker_routes.BenchEnv()
+        study_ids = [1, 2, 3, 4, 5, 6, 100000]
+        env.DB.connection.executemany(
+            "INSERT INTO study (id, title, category, member_count, content, date, writer, last_activity_at) "
+            "VALUES (?, '희소 스터디', '웹 개발', 4, '내용', '2026-01-01T00:00:00', '방장', '2026-01-01T00:00:00')",
+            [(study_id,) for study_id in study_ids],
+        )
+        env.DB.connection.commit()
+
+        picked_counts = dict.fromkeys(study_ids, 0)
+        cf_worker.random.seed(7)
+        for _ in range(300):
+            picked_ids = [study["id"] for study in asyncio.run(cf_worker.sample_random_studies(env))]
+            self.assertEqual(len(set(picked_ids)), 4)
+            for study_id in picked_ids:
+                picked_counts[study_id] += 1
+
+        expected = 300 * 4 / len(study_ids)
+        for study_id, count in picked_counts.items():
+            self.assertLess(abs(count - expected), expected * 0.25, (study_id, picked_counts))
+
+    def test_worker_loads_enrollments_in_chunks_of_bound_params(self):
+        import asyncio
+
+        worker_routes, _, cf_worker = self.load_worker_modules()
+        env = worker_routes.BenchEnv()
+        chunk_size = cf_worker.D1_MAX_BOUND_PARAMS
+        study_count = chunk_size * 2 + 1
+        connection = env.DB.connection
+        connection.execute(
+            "INSERT INTO user (userid, password, nickname, email) VALUES ('member', 'x', '멤버', 'member@example.com')"
+        )
+        connection.executemany(
+            "INSERT INTO study (title, category, member_count, content, date, writer, last_activity_at) "
+            "VALUES (?, '웹 개발', 4, '내용', ?2, '방장', ?2)",
+            [(f"스터디 {index}", f"2026-01-01T00:00:{index % 60:02d}") for index in range(study_count)],
+        )
+        connection.executemany(
+            "INSERT INTO enrollment (user_id, study_id, status, date) VALUES (1, ?, ?, '2026-01-02T00:00:00')",
+            [(study_id, study_id % 2) for study_id in range(1, study_count + 1)],
+        )
+        connection.commit()
+
+        for requested in ([], list(range(1, chunk_size + 1)), list(range(1, chunk_size + 2)), list(range(1, study_count + 2))):
+            env.DB.reset_counters()
+            enrollments = asyncio.run(cf_worker.fetch_enrollments_by_study(env, requested))
+            chunks = -(-len(requested) // chunk_size)
+            self.assertEqual(list(enrollments), requested)
+            self.assertEqual((env.DB.statements, env.DB.round_trips), (chunks, min(chunks, 1)))
+            for study_id, rows in enrollments.items():
+                expected = [] if study_id > study_count else [(1, study_id % 2)]
+                self.assertEqual([(row["user_id"], row["status"]) for row in rows], expected)
+                self.assertTrue(all(row["study_id"] == study_id for row in rows))
+
+    def test_worker_batch_returns_results_in_query_order(self):
+        import asyncio
+
+        worker_routes, _, cf_worker = self.load_worker_modules()
+        env = worker_routes.BenchEnv()
+        env.DB.connection.executescript(
+            """
+            INSERT INTO user (userid, password, nickname, email) VALUES ('owner', 'x', '방장', 'owner@example.com');
+            INSERT INTO user (userid, password, nickname, email) VALUES ('guest', 'x', '참여자', 'guest@example.com');
+            """
+        )
+
+        self.assertEqual(asyncio.run(cf_worker.D1Batch(env).run()), [])
+        self.assertEqual(env.DB.round_trips, 0)
+
+        batch = cf_worker.D1Batch(env)
+        indexes = [
+            batch.add(cf_worker.D1Query("SELECT nickname FROM user ORDER BY id DESC")),
+            batch.add(cf_worker.D1Query("SELECT id FROM user WHERE userid = ?", ["missing"])),
+            batch.add(
+                cf_worker.D1Query("SELECT COUNT(*) AS total FROM user", build=lambda rows: rows[0]["total"])
+            ),
+            batch.add(cf_worker.study_by_id_query(1)),
+        ]
+        results = asyncio.run(batch.run())
+
+        self.assertEqual(indexes, [0, 1, 2, 3])
+        self.assertEqual(results, [[{"nickname": "참여자"}, {"nickname": "방장"}], [], 2, None])
+        self.assertEqual((env.DB.statements, env.DB.round_trips), (4, 1))
+        self.assertEqual(
+            asyncio.run(cf_worker.d1_fetch(env, cf_worker.D1Query("SELECT userid FROM user WHERE id = ?", [2]))),
+            [{"userid": "guest"}],
+        )
+
+        batch = cf_worker.D1Batch(env)
+        batch.add(cf_worker.D1Query("SELECT id FROM user"))
+        batch.add(cf_worker.D1Query("SELECT id FROM missing_table"))
+        with self.assertRaises(sqlite3.OperationalError):
+            asyncio.run(batch.run())
+        with self.assertRaises(sqlite3.OperationalError):
+            asyncio.run(cf_worker.d1_fetch(env, cf_worker.D1Query("SELECT id FROM missing_table")))
+
+    def test_worker_study_bundle_loads_only_requested_relations(self):
+        import asyncio
+
+        worker_routes, scenarios, cf_worker = self.load_worker_modules()
+        env = worker_routes.BenchEnv()
+        env.DB.connection.executescript(
+            """
+            INSERT INTO user (userid, password, nickname, email) VALUES ('owner', 'x', '방장', 'owner@example.com');
+            INSERT INTO user (userid, password, nickname, email) VALUES ('guest', 'x', '참여자', 'guest@example.com');
+            INSERT INTO study (title, category, member_count, content, date, writer, author_id, last_activity_at)
+            VALUES ('묶음 로딩', '웹 개발', 4, '필요한 관계만 읽습니다.', '2026-01-01T00:00:00', '방장', 1, '2026-01-01T00:00:00');
+            INSERT INTO enrollment (user_id, study_id, status, date) VALUES (2, 1, 1, '2026-01-02T00:00:00');
+            INSERT INTO comment (content, date, writer, author_id, study_id) VALUES ('첫 댓글', '2026-01-03T00:00:00', '참여자', 2, 1);
+            """
+        )
+
+        def load(user, *names, **queries):
+            request = worker_routes.build_request(cf_worker, "GET", scenarios.bench_request("/study/1", user))
+            ctx = cf_worker.RequestContext(env, request, "study_detail", {"study_id": "1"})
+            asyncio.run(ctx.load_user())
+            env.DB.reset_counters()
+            study = asyncio.run(cf_worker.load_study_bundle(ctx, *names, **queries))
+            return study, (env.DB.statements, env.DB.round_trips)
+
+        guest = {"userid": "guest", "nickname": "참여자"}
+        study, counts = load(guest, 1, "enrollments")
+        self.assertEqual(counts, (2, 1))
+        self.assertEqual([enrollment["user"]["nickname"] for enrollment in study["enrollments"]], ["참여자"])
+        self.assertFalse({"comments", "liked_comments", "viewer_enrollment", "chat_history"} & set(study))
+
+        study, counts = load(None, 1, "comments", "viewer_enrollment", "liked_comments")
+        self.assertEqual(counts, (2, 1))
+        self.assertEqual([comment["content"] for comment in study["comments"]], ["첫 댓글"])
+        self.assertIsNone(study["viewer_enrollment"])
+        self.assertIsNone(study["liked_comments"])
+
+        study, counts = load(guest, 1, "viewer_enrollment", total=cf_worker.D1Query("SELECT COUNT(*) AS total FROM user"))
+        self.assertEqual(counts, (3, 1))
+        self.assertEqual(study["viewer_enrollment"]["status"], 1)
+        self.assertEqual(study["total"], [{"total": 2}])
+
+        with self.assertRaises(cf_worker.HTTPError):
+            load(guest, 2, "comments")
+        with self.assertRaises(KeyError):
+            load(guest, 1, "unknown")
+
+    def test_worker_chat_access_cache_keeps_only_fresh_grants(self):
+        import asyncio
+        import contextlib
+        import io
+        from unittest import mock
+
+        worker_routes, scenarios, cf_worker = self.load_worker_modules()
+        env = worker_routes.BenchEnv()
+        connection = env.DB.connection
+        connection.executescript(
+            """
+            INSERT INTO user (userid, password, nickname, email) VALUES ('owner', 'x', '방장', 'owner@example.com');
+            INSERT INTO user (userid, password, nickname, email) VALUES ('member', 'x', '멤버', 'member@example.com');
+            INSERT INTO study (title, category, member_count, content, date, writer, author_id, last_activity_at)
+            VALUES ('권한 캐시', '웹 개발', 4, '권한 확인', '2026-01-01T00:00:00', '방장', 1, '2026-01-01T00:00:00');
+            INSERT INTO enrollment (user_id, study_id, status, date) VALUES (2, 1, 1, '2026-01-02T00:00:00');
+            """
+        )
+        member = {"userid": "member", "nickname": "멤버"}
+        cf_worker.chat_access_cache.clear()
+        self.addCleanup(cf_worker.chat_access_cache.clear)
+
+        def fetch(method, spec):
+            request = worker_routes.build_request(cf_worker, method, spec)
+            with contextlib.redirect_stdout(io.StringIO()):
+                return asyncio.run(cf_worker.Default(None, env).fetch(request)).status
+
+        def poll(wait=False):
+            query = {"after_id": 0, "wait": 1} if wait else {"after_id": 0}
+            return fetch("GET", scenarios.bench_request("/study/1/chat/messages", member, query=query))
+
+        def post(content):
+            return fetch("POST", scenarios.bench_request("/study/1/chat", member, json={"content": content}))
+
+        def message_count():
+            return connection.execute("SELECT COUNT(*) FROM chat_message").fetchone()[0]
+
+        self.assertEqual(post("승인된 멤버"), 200)
+        self.assertLess(poll(), 400)
+        self.assertIn((2, 1), cf_worker.chat_access_cache)
+
+        connection.execute("UPDATE enrollment SET status = 2 WHERE user_id = 2")
+        connection.commit()
+        self.assertLess(poll(), 400)
+        self.assertEqual(post("거절 후 전송"), 302)
+        self.assertEqual(message_count(), 1)
+        self.assertNotIn((2, 1), cf_worker.chat_access_cache)
+        self.assertEqual(poll(wait=True), 403)
+
+        connection.execute("UPDATE enrollment SET status = 1 WHERE user_id = 2")
+        connection.commit()
+        self.assertLess(poll(), 400)
+        connection.execute("UPDATE enrollment SET status = 2 WHERE user_id = 2")
+        connection.commit()
+        expired = cf_worker.time.monotonic() + cf_worker.CHAT_ACCESS_CACHE_SECONDS + 1
+        with mock.patch.object(cf_worker.time, "monotonic", return_value=expired):
+            self.assertEqual(poll(), 403)
+
+        connection.execute("UPDATE enrollment SET status = 1 WHERE user_id = 2")
+        connection.commit()
+        cf_worker.remember_chat_access(1, 1, True)
+        cf_worker.remember_chat_access(2, 1, True)
+        cf_worker.remember_chat_access(2, 2, True)
+        cf_worker.invalidate_chat_access(1, user_id=2)
+        self.assertEqual(set(cf_worker.chat_access_cache), {(1, 1), (2, 2)})
+        cf_worker.invalidate_chat_access(1)
+        self.assertEqual(set(cf_worker.chat_access_cache), {(2, 2)})
+
+        self.assertLess(poll(), 400)
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.execute("DELETE FROM study WHERE id = 1")
+        connection.commit()
+        self.assertEqual(post("삭제된 방"), 404)
+        self.assertEqual(message_count(), 0)
+
+    def test_requests_report_query_counts_in_server_timing_and_logs(self):
+        with self.app.app_context():
+            owner = self.create_user("owner", "방장", "owner@example.com")
+            study = self.Study(
+                title="계측 테스트",
+                category="웹 개발",
+                member_count=4,
+                content="쿼리 수를 보고합니다.",
+                writer=owner["nickname"],
+                author_id=owner["id"],
+            )
+            self.db.session.add(study)
+            self.db.session.commit()
+            study_id = study.id
+
+        self.login_as(owner)
+        with self.assertLogs("studymate.requests", level="INFO") as captured:
+            response = self.client.get(f"/study/{study_id}")
+
+        record = json.loads(captured.records[-1].getMessage())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(record["endpoint"], "study_detail")
+        self.assertEqual(record["status"], 200)
+        self.assertGreater(record["db_queries"], 0)
+        self.assertLessEqual(len(record["slowest"]), 3)
+        self.assertIn(f'desc="{record["db_queries"]} queries"', response.headers["Server-Timing"])
+
+    def test_study_detail_loads_comment_tree_with_constant_queries(self):
+        with self.app.app_context():
+            owner = self.create_user("owner", "방장", "owner@example.com")
+            guest = self.create_user("guest", "손님", "guest@example.com")
+            study = self.Study(
+                title="댓글 트리",
+                category="웹 개발",
+                member_count=4,
+                content="댓글과 좋아요를 한 번에 불러옵니다.",
+                writer=owner["nickname"],
+                author_id=owner["id"],
+            )
+            self.db.session.add(study)
+            self.db.session.commit()
+            study_id = study.id
+            owner_user = self.db.session.get(self.User, owner["id"])
+            guest_user = self.db.session.get(self.User, guest["id"])
+
+            def add_thread(index):
+                root = self.Comment(
+                    content=f"루트 댓글 {index}",
+                    writer=guest["nickname"],
+                    author_id=guest["id"],
+                    study_id=study_id,
+                )
+                self.db.session.add(root)
+                self.db.session.flush()
+                reply = self.Comment(
+                    content=f"답글 {index}",
+                    writer=owner["nickname"],
+                    author_id=owner["id"],
+                    study_id=study_id,
+                    parent_id=root.id,
+                )
+                root.likers.extend([owner_user, guest_user])
+                reply.likers.append(guest_user)
+                self.db.session.add(reply)
+                self.db.session.commit()
+
+            add_thread(0)
+
+        self.login_as(owner)
+        response = self.client.get(f"/study/{study_id}")
+        html = response.get_data(as_text=True)
+        queries = response.headers["Server-Timing"]
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("답글 0", html)
+        self.assertIn("댓글 2", html)
+        self.assertEqual(html.count('class="comment-like-btn liked"'), 1)
+        self.assertRegex(html, r"♥\s+2")
+        self.assertRegex(html, r"♡\s+1")
+
+        with self.app.app_context():
+            owner_user = self.db.session.get(self.User, owner["id"])
+            guest_user = self.db.session.get(self.User, guest["id"])
+            for index in range(1, 6):
+                add_thread(index)
+
+        response = self.client.get(f"/study/{study_id}")
+        self.assertIn("답글 5", response.get_data(as_text=True))
+        self.assertEqual(
+            response.headers["Server-Timing"].split(";desc=")[1].split(",")[0],
+            queries.split(";desc=")[1].split(",")[0],
+        )
+
+    def test_comment_like_toggle_maintains_like_count(self):
+        with self.app.app_context():
+            owner = self.create_user("owner", "방장", "owner@example.com")
+            fans = [self.create_user(f"fan{index}", f"팬{index}", f"fan{index}@example.com") for index in range(5)]
+            study = self.Study(
+                title="좋아요 토글",
+                category="웹 개발",
+                member_count=4,
+                content="좋아요 수를 컬럼으로 유지합니다.",
+                writer=owner["nickname"],
+                author_id=owner["id"],
+            )
+            self.db.session.add(study)
+            self.db.session.commit()
+            comment = self.Comment(
+                content="인기 댓글",
+                writer=owner["nickname"],
+                author_id=owner["id"],
+                study_id=study.id,
+            )
+            comment.likers.extend(self.db.session.get(self.User, fan["id"]) for fan in fans)
+            self.db.session.add(comment)
+            self.db.session.commit()
+            comment_id = comment.id
+
+        def like_state():
+            with self.app.app_context():
+                like_count = self.db.session.get(self.Comment, comment_id).like_count
+                rows = self.db.session.execute(
+                    self.app_module.comment_likes.select().where(
+                        self.app_module.comment_likes.c.comment_id == comment_id
+                    )
+                ).all()
+                return like_count, len(rows)
+
+        self.assertEqual(like_state(), (5, 5))
+        self.login_as(owner)
+        liked = self.client.post(f"/comment/like/{comment_id}", data={"_csrf_token": "test-token"})
+        self.assertEqual(liked.status_code, 302)
+        self.assertEqual(like_state(), (6, 6))
+
+        unliked = self.client.post(f"/comment/like/{comment_id}", data={"_csrf_token": "test-token"})
+        self.assertEqual(unliked.status_code, 302)
+        self.assertEqual(like_state(), (5, 5))
+        self.assertIn('desc="4 queries"', unliked.headers["Server-Timing"])
+
+        missing = self.client.post("/comment/like/9999", data={"_csrf_token": "test-token"})
+        self.assertEqual(missing.status_code, 404)
+
+    def test_comment_like_toggle_and_trigger_setup_respect_the_dialect(self):
+        from unittest import mock
+
+        with self.app.app_context():
+            owner = self.create_user("owner", "방장", "owner@example.com")
+            study = self.Study(
+                title="다른 DB",
+                category="웹 개발",
+                member_count=4,
+                content="방언별 좋아요",
+                writer=owner["nickname"],
+                author_id=owner["id"],
+            )
+            self.db.session.add(study)
+            self.db.session.commit()
+            comment = self.Comment(
+                content="댓글",
+                writer=owner["nickname"],
+                author_id=owner["id"],
+                study_id=study.id,
+            )
+            self.db.session.add(comment)
+            self.db.session.commit()
+            user = self.db.session.get(self.User, owner["id"])
+
+            with mock.patch.dict(self.app_module.CONFLICT_INSERTS, clear=True):
+                self.assertTrue(self.app_module.toggle_comment_like(comment, user))
+                self.assertEqual(self.app_module.insert_comment_like(comment, user), 0)
+                self.db.session.commit()
+                self.assertFalse(self.app_module.toggle_comment_like(comment, user))
+            self.assertEqual(self.db.session.get(self.Comment, comment.id).like_count, 0)
+
+            statements = []
+            record = lambda conn, cursor, statement, *args: statements.append(statement)
+            self.app_module.event.listen(self.db.engine, "before_cursor_execute", record)
+            try:
+                with mock.patch.object(self.db.engine.dialect, "name", "postgresql"):
+                    self.app_module.ensure_comment_like_counts()
+                    self.app_module.ensure_study_category_counts()
+                    self.app_module.ensure_study_member_counts()
+                    self.app_module.ensure_study_chat_activity()
+                    self.app_module.ensure_study_search_index()
+            finally:
+                self.app_module.event.remove(self.db.engine, "before_cursor_execute", record)
+            self.assertEqual(statements, [])
+
+    def test_enrollment_changes_maintain_study_member_counts(self):
+        with self.app.app_context():
+            owner = self.create_user("owner", "방장", "owner@example.com")
+            applicants = [
+                self.create_user(f"applicant{index}", f"지원자{index}", f"applicant{index}@example.com")
+                for index in range(3)
+            ]
+            study = self.Study(
+                title="정원 카운트",
+                category="웹 개발",
+                member_count=1,
+                content="승인 인원을 컬럼으로 유지합니다.",
+                writer=owner["nickname"],
+                author_id=owner["id"],
+            )
+            self.db.session.add(study)
+            self.db.session.commit()
+            study_id = study.id
+
+        def member_state():
+            with self.app.app_context():
+                study = self.db.session.get(self.Study, study_id)
+                return study.approved_count, study.pending_count, study.is_closed
+
+        def enrollment_id(applicant):
+            with self.app.app_context():
+                return self.Enrollment.query.filter_by(user_id=applicant["id"], study_id=study_id).one().id
+
+        for applicant in applicants:
+            self.login_as(applicant)
+            self.client.post(f"/study/apply/{study_id}", data={"_csrf_token": "test-token"})
+        self.assertEqual(member_state(), (0, 3, False))
+
+        self.login_as(owner)
+        self.client.post(f"/enrollment/{enrollment_id(applicants[0])}/reject", data={"_csrf_token": "test-token"})
+        self.assertEqual(member_state(), (0, 2, False))
+
+        self.client.post(f"/enrollment/{enrollment_id(applicants[1])}/accept", data={"_csrf_token": "test-token"})
+        self.assertEqual(member_state(), (1, 1, True))
+
+        self.client.post(f"/enrollment/{enrollment_id(applicants[2])}/accept", data={"_csrf_token": "test-token"})
+        self.assertEqual(member_state(), (1, 1, True))
+
+        with self.app.app_context():
+            self.db.session.execute(self.app_module.text("UPDATE study SET approved_count = 7, pending_count = 0"))
+            self.app_module.reconcile_study_member_counts()
+            self.db.session.commit()
+        self.assertEqual(member_state(), (1, 1, True))
+
+    def test_asgi_chat_stream_delivers_messages_until_disconnect(self):
+        import asyncio
+
+        import asgi
+
+        asgi_module = importlib.reload(asgi)
+        with self.app.app_context():
+            owner = self.create_user("owner", "방장", "owner@example.com")
+            study = self.Study(
+                title="비동기 채팅",
+                category="웹 개발",
+                member_count=4,
+                content="ASGI 스트림 테스트",
+                writer=owner["nickname"],
+                author_id=owner["id"],
+            )
+            self.db.session.add(study)
+            self.db.session.commit()
+            study_id = study.id
+
+        self.login_as(owner)
+        cookie = self.client.get_cookie("session").value
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": f"/study/{study_id}/chat/stream",
+            "headers": [(b"cookie", f"session={cookie}".encode("latin-1"))],
+        }
+        broadcast = self.app_module.chat_broadcast
+
+        async def drive():
+            incoming = asyncio.Queue()
+            sent = []
+
+            async def send(message):
+                sent.append(message)
+
+            stream = asyncio.create_task(asgi_module.application(scope, incoming.get, send))
+            while not broadcast.has_subscribers():
+                await asyncio.sleep(0.01)
+            await asyncio.to_thread(
+                self.client.post,
+                f"/study/{study_id}/chat",
+                json={"content": "스레드 없이 받은 메시지"},
+                headers={"X-CSRFToken": "test-token"},
+            )
+            while len(sent) < 2:
+                await asyncio.sleep(0.01)
+            await incoming.put({"type": "http.disconnect"})
+            await asyncio.wait_for(stream, 2)
+            return sent
+
+        sent = asyncio.run(drive())
+        self.assertEqual(sent[0]["status"], 200)
+        self.assertIn("스레드 없이 받은 메시지", sent[1]["body"].decode("utf-8"))
+        self.assertFalse(broadcast.has_subscribers())
+
 
 if __name__ == "__main__":
     unittest.main()